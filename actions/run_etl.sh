@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+# Run the parse -> normalize -> load ETL pipeline.
+# Usage: ./actions/run_etl.sh [xml_file] [db_path]
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+python etl/run.py "$@"
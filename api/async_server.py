@@ -0,0 +1,353 @@
+"""
+Asyncio API Server
+==================
+
+Serves the same API as rest_api_server.py (endpoints, Basic auth, JSON
+responses) from a single asyncio event loop, so thousands of idle or
+polling keep-alive connections cost a socket and a coroutine each
+instead of a thread each.
+
+Connection I/O never blocks the loop: request heads and bodies are read
+with asyncio streams, and only a complete request is handed to
+TransactionAPIHandler, which reads it from memory. Both reads are bounded
+in size and time: a body over MAX_BODY_BYTES is refused with 413 before
+any of it is read, and a client that stops sending mid-request is
+dropped after KEEPALIVE_TIMEOUT.
+
+Store calls may block (SQLite), so handlers run on a small thread pool
+whose size does not depend on the number of connections, and their
+output is passed back to the loop as it is produced (streamed listings
+included). With --workers=0 handlers run directly on the loop instead,
+which is fastest for the memory store but buffers each response whole;
+credentials that are not in the authenticator's cache are then verified
+on a separate thread first, so a password hash never stalls the loop.
+
+Usage:
+    python async_server.py [xml_file] [port] [--memory] [--db=PATH]
+                           [--workers=N] [--backlog=N]
+                           [--compress-min=BYTES] [--no-compress]
+                           [--snapshot[=PATH]] [--no-snapshot]
+"""
+
+import asyncio
+import io
+import json
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from api.rest_api_server import TransactionAPIHandler, KEEPALIVE_TIMEOUT
+
+HANDLER_THREADS = 4         # Threads running request handlers (0 = run on the loop)
+AUTH_THREADS = 2            # Threads hashing credentials when handlers run on the loop
+LISTEN_BACKLOG = 1024       # Pending connections queued by the kernel
+MAX_HEADER_BYTES = 65536    # Largest request line + headers accepted
+MAX_BODY_BYTES = 16 * 1024 * 1024  # Largest request body accepted (bulk requests included)
+
+# BufferedRequestHandler authenticates the request itself
+UNVERIFIED = object()
+
+
+class BufferedRequestHandler(TransactionAPIHandler):
+    """
+    Runs one fully-read request through TransactionAPIHandler.
+
+    The socket is replaced by file objects: rfile holds the request
+    bytes, and the response goes to `wfile`, a LoopWriter when the
+    handler runs on a worker thread or an in-memory buffer when it runs
+    on the event loop.
+
+    Args:
+        request_bytes (bytes): Request line, headers and body
+        client_address: (host, port) of the client
+        wfile: Writable file object for the response
+        verified: Result of authenticating the request's Authorization
+            header beforehand (username or None), or UNVERIFIED to have
+            the handler authenticate it
+    """
+
+    def __init__(self, request_bytes, client_address, wfile, verified=UNVERIFIED):
+        self.client_address = client_address
+        self.rfile = io.BytesIO(request_bytes)
+        self.wfile = wfile
+        self.verified = verified
+        self.close_connection = True
+        self.handle_one_request()
+
+    def check_authentication(self):
+        if self.verified is UNVERIFIED:
+            return super().check_authentication()
+        return self.verified is not None
+
+
+class LoopWriter:
+    """
+    Response file for handlers running on a worker thread.
+
+    Writes are buffered up to `buffer_size` bytes (a whole response, for
+    most requests), then handed to the event loop; the thread waits
+    until the transport has drained them. A streamed response therefore
+    goes out as it is produced, and a slow client slows its handler down
+    instead of growing a buffer.
+    """
+
+    def __init__(self, writer, loop, buffer_size=api_server.STREAM_BUFFER_SIZE):
+        self.writer = writer
+        self.loop = loop
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def write(self, data):
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self.buffer_size:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if not self._size:
+            return
+        data = b''.join(self._parts)
+        self._parts = []
+        self._size = 0
+        asyncio.run_coroutine_threadsafe(self._send(data), self.loop).result()
+
+    async def _send(self, data):
+        self.writer.write(data)
+        await self.writer.drain()
+
+
+def handle_request(request_bytes, client_address, wfile, verified=UNVERIFIED):
+    """
+    Run a request through the API handler, writing the response to wfile.
+
+    Returns:
+        bool: True if the connection must be closed
+    """
+    handler = BufferedRequestHandler(request_bytes, client_address, wfile, verified)
+    return handler.close_connection
+
+
+def header_value(head, header):
+    """
+    Read the first occurrence of a header from a raw request head.
+
+    Args:
+        head (bytes): Request line and headers
+        header (bytes): Lowercase header name
+
+    Returns:
+        bytes: The stripped value, or None if the header is absent
+    """
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == header:
+            return value.strip()
+    return None
+
+
+def content_length(head):
+    """
+    Read Content-Length from a raw request head.
+
+    Returns:
+        int: Body length (0 if absent), or None if the header is invalid
+    """
+    value = header_value(head, b'content-length')
+    if value is None:
+        return 0
+    try:
+        length = int(value)
+    except ValueError:
+        return None
+    return length if length >= 0 else None
+
+
+def error_response(status, reason, message):
+    """
+    A complete JSON error response that closes the connection, for
+    requests refused before they reach the handler.
+
+    Returns:
+        bytes: Status line, headers and body
+    """
+    payload = json.dumps({'error': reason, 'message': message}).encode('utf-8')
+    head = (f'HTTP/1.1 {status} {reason}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(payload)}\r\n'
+            f'Connection: close\r\n\r\n')
+    return head.encode('latin-1') + payload
+
+
+class AsyncAPIServer:
+    """
+    Event-loop HTTP/1.1 server for TransactionAPIHandler.
+
+    Args:
+        workers (int): Handler threads (0 = run handlers on the event loop)
+        backlog (int): Listen backlog passed to listen()
+    """
+
+    def __init__(self, workers=HANDLER_THREADS, backlog=LISTEN_BACKLOG):
+        self.backlog = backlog
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='api-handler') if workers > 0 else None
+        self.auth_executor = (ThreadPoolExecutor(AUTH_THREADS, thread_name_prefix='api-auth')
+                              if workers <= 0 else None)
+        self.connections = 0
+
+    async def serve(self, port):
+        server = await asyncio.start_server(
+            self.handle_connection, port=port, backlog=self.backlog, limit=MAX_HEADER_BYTES)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve requests on one connection until either side closes it.
+        """
+        client_address = writer.get_extra_info('peername')
+        loop = asyncio.get_running_loop()
+        self.connections += 1
+
+        try:
+            while True:
+                # An idle keep-alive connection is dropped after the timeout
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ConnectionError):
+                    break
+
+                length = content_length(head)
+                if length is None:
+                    break
+                if length > MAX_BODY_BYTES:
+                    # The body is never read, so the connection cannot be reused
+                    writer.write(error_response(
+                        413, 'Payload Too Large',
+                        f'Request bodies are limited to {MAX_BODY_BYTES} bytes'))
+                    await writer.drain()
+                    break
+                try:
+                    body = (await asyncio.wait_for(reader.readexactly(length), KEEPALIVE_TIMEOUT)
+                            if length else b'')
+                except asyncio.TimeoutError:
+                    break
+
+                if self.executor is None:
+                    verified = await self.authenticate(head, client_address)
+                    # On the loop the handler cannot wait for the socket,
+                    # so its response is buffered and sent afterwards
+                    response = io.BytesIO()
+                    close = handle_request(head + body, client_address, response, verified)
+                    writer.write(response.getvalue())
+                else:
+                    close = await loop.run_in_executor(
+                        self.executor, handle_request, head + body, client_address,
+                        LoopWriter(writer, loop))
+                await writer.drain()
+
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def authenticate(self, head, client_address):
+        """
+        Authenticate a request for a handler running on the loop.
+
+        Cached credentials are answered on the loop; anything that needs
+        a password hash is verified on the auth threads.
+
+        Returns:
+            str: The authenticated username, or None
+        """
+        value = header_value(head, b'authorization')
+        header = value.decode('latin-1') if value is not None else None
+        authenticator = api_server.authenticator
+        known, username = authenticator.cached(header)
+        if known:
+            return username
+        client = client_address[0] if client_address else None
+        return await asyncio.get_running_loop().run_in_executor(
+            self.auth_executor, authenticator.authenticate, header, client)
+
+    def close(self):
+        for executor in (self.executor, self.auth_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+
+def raise_open_file_limit():
+    """
+    Raise the soft open-file limit to the hard limit (one fd per connection).
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def run_server(port=8000, xml_file=None, storage='sqlite', db_path=api_server.etl_config.DB_PATH,
+               workers=HANDLER_THREADS, backlog=LISTEN_BACKLOG,
+               compress_min=api_server.COMPRESS_MIN_SIZE,
+               snapshot_path=None):
+    """
+    Initialize and start the asyncio API server.
+
+    Args:
+        port (int): Port number to run server on
+        xml_file (str): Path to XML file with transaction data
+        storage (str): 'sqlite' (persistent, default) or 'memory'
+        db_path (str): SQLite database path
+        workers (int): Handler threads (0 = run handlers on the event loop)
+        backlog (int): Listen backlog for pending connections
+        compress_min (int): Smallest body compressed (None = never compress)
+        snapshot_path (str): Dataset snapshot for --memory (None = always parse the XML)
+    """
+    api_server.print_banner()
+
+    # The handler reads its settings and store from rest_api_server's module globals
+    api_server.COMPRESS_MIN_SIZE = compress_min
+    api_server.store = api_server.create_store(storage, xml_file, db_path, snapshot_path)
+    raise_open_file_limit()
+
+    server = AsyncAPIServer(workers, backlog)
+    handlers = f"{workers} handler threads" if workers > 0 else "handlers on the loop"
+    api_server.print_server_info(port, storage, f"asyncio event loop, {handlers} (backlog {backlog})")
+
+    try:
+        asyncio.run(server.serve(port))
+    except KeyboardInterrupt:
+        print("\n\nShutting down server...")
+        server.close()
+        api_server.store.close()
+        print("Server stopped successfully\n")
+
+
+if __name__ == '__main__':
+    settings = api_server.parse_command_line(sys.argv[1:])
+
+    # Same options as rest_api_server.py, with asyncio defaults
+    options = [arg.split('=', 1)[0] for arg in sys.argv[1:]]
+    if '--workers' not in options:
+        settings['workers'] = HANDLER_THREADS
+    if '--backlog' not in options:
+        settings['backlog'] = LISTEN_BACKLOG
+
+    run_server(**settings)
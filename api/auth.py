@@ -0,0 +1,327 @@
+"""
+API Authentication
+==================
+
+Basic Authentication for api/rest_api_server.py against hashed
+credentials.
+
+Passwords are stored as PBKDF2-SHA256 hashes in the form
+
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+and read from the environment (see .env.example):
+
+    API_USERS         Comma-separated "username:hash" entries
+    API_USERS_FILE    File with one "username:hash" entry per line
+
+If neither is set, the built-in development account (admin /
+password123) is used, stored as a hash like any other.
+
+Hashing is deliberately slow, so it must not run on every request. An
+Authorization header that verifies successfully is cached, for at most
+AUTH_CACHE_TTL seconds and AUTH_CACHE_SIZE headers, and a repeated
+request with the same header costs a single dictionary lookup.
+
+Failures are bounded too, so that unauthenticated clients cannot keep
+every handler thread busy hashing:
+
+    - a header that failed is remembered for FAILURE_CACHE_TTL seconds
+      (at most FAILURE_CACHE_SIZE headers) and rejected without a hash
+    - a client (IP address) with MAX_FAILURES failed attempts within
+      FAILURE_WINDOW seconds is rejected without hashing until the
+      window ends; a successful login clears its count
+
+An unknown username still pays for a full hash, so response times do
+not reveal which usernames exist.
+
+Create a hash with:
+    python auth.py [username]
+"""
+
+import base64
+import binascii
+import getpass
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+ALGORITHM = 'pbkdf2_sha256'
+ITERATIONS = 260000         # PBKDF2 rounds for new hashes
+SALT_BYTES = 16
+
+AUTH_CACHE_SIZE = 1024      # Verified Authorization headers kept
+AUTH_CACHE_TTL = 300        # Seconds a verified header is trusted without re-hashing
+
+FAILURE_CACHE_SIZE = 4096   # Rejected Authorization headers kept
+FAILURE_CACHE_TTL = 60      # Seconds a rejected header is refused without re-hashing
+MAX_FAILURES = 10           # Failed attempts per client within FAILURE_WINDOW
+FAILURE_WINDOW = 60         # Seconds a client's failures are counted
+FAILURE_CLIENTS = 4096      # Clients whose failures are tracked
+
+# Development account used when no credentials are configured (only the
+# hash is checked; the password is kept for the server's startup banner)
+DEFAULT_USERNAME = 'admin'
+DEFAULT_PASSWORD = 'password123'
+DEFAULT_USERS = {
+    DEFAULT_USERNAME: 'pbkdf2_sha256$260000$G3Drziw5HYZVEYLu7o5hVQ$wDyiwLpZa/X8JAzO7dY0n8jKlePOcFfI0fKpjGYtdTA',
+}
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def hash_password(password, salt=None, iterations=ITERATIONS):
+    """
+    Hash a password for storage.
+
+    Returns:
+        str: "pbkdf2_sha256$<iterations>$<salt>$<hash>"
+    """
+    salt = os.urandom(SALT_BYTES) if salt is None else salt
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f'{ALGORITHM}${iterations}${_b64encode(salt)}${_b64encode(digest)}'
+
+
+def verify_password(password, encoded):
+    """
+    Check a password against a stored hash (constant-time comparison).
+
+    Returns:
+        bool: True if the password matches
+    """
+    try:
+        algorithm, iterations, salt, expected = encoded.split('$')
+        if algorithm != ALGORITHM:
+            return False
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'),
+                                     _b64decode(salt), int(iterations))
+        return hmac.compare_digest(digest, _b64decode(expected))
+    except (ValueError, binascii.Error):
+        return False
+
+
+def parse_users(entries):
+    """
+    Parse "username:hash" entries, skipping blanks and # comments.
+
+    Args:
+        entries: Iterable of entry strings
+
+    Returns:
+        dict: username -> encoded hash
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    users = {}
+    for entry in entries:
+        entry = entry.strip()
+        if not entry or entry.startswith('#'):
+            continue
+        username, separator, encoded = entry.partition(':')
+        if not separator or not username or not encoded.startswith(ALGORITHM + '$'):
+            raise ValueError(f"Invalid credential entry for '{username}' (expected username:{ALGORITHM}$...)")
+        users[username] = encoded
+    return users
+
+
+def load_users():
+    """
+    Read the configured credentials.
+
+    Returns:
+        tuple: (dict of username -> hash, True if the defaults are used)
+    """
+    users = {}
+    path = os.environ.get('API_USERS_FILE')
+    if path:
+        with open(path, encoding='utf-8') as users_file:
+            users.update(parse_users(users_file))
+    if os.environ.get('API_USERS'):
+        users.update(parse_users(os.environ['API_USERS'].split(',')))
+
+    if users:
+        return users, False
+    return dict(DEFAULT_USERS), True
+
+
+class Authenticator:
+    """
+    Verifies Basic Authorization headers against hashed credentials.
+
+    Args:
+        users (dict): username -> encoded hash (see hash_password)
+        cache_size (int): Most verified headers kept (0 disables the cache)
+        ttl (float): Seconds a verified header stays cached
+        failure_cache_size (int): Most rejected headers kept (0 disables)
+        failure_ttl (float): Seconds a rejected header stays cached
+        max_failures (int): Failed attempts allowed per client and window
+            (0 disables the throttle)
+        failure_window (float): Seconds a client's failures are counted
+    """
+
+    def __init__(self, users, cache_size=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL,
+                 failure_cache_size=FAILURE_CACHE_SIZE, failure_ttl=FAILURE_CACHE_TTL,
+                 max_failures=MAX_FAILURES, failure_window=FAILURE_WINDOW):
+        self.users = dict(users)
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.failure_cache_size = failure_cache_size
+        self.failure_ttl = failure_ttl
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+
+        # header -> (username or None, expiry); None marks a rejected header
+        self._verified = OrderedDict()
+        self._rejected = OrderedDict()
+        self._failures = OrderedDict()  # client -> (failed attempts, window end)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected_hits = 0
+        self.throttled = 0
+
+    def cached(self, header):
+        """
+        Look a header up without hashing.
+
+        Returns:
+            tuple: (True, username or None) if the outcome is known (cached,
+            or no header), otherwise (False, None)
+        """
+        if not header:
+            return True, None
+
+        now = time.monotonic()
+        with self._lock:
+            for entries in (self._verified, self._rejected):
+                entry = entries.get(header)
+                if entry is not None and entry[1] > now:
+                    if entries is self._verified:
+                        self.hits += 1
+                    else:
+                        self.rejected_hits += 1
+                    return True, entry[0]
+        return False, None
+
+    def authenticate(self, header, client=None):
+        """
+        Check an Authorization header.
+
+        Args:
+            header (str): Value of the Authorization header (or None)
+            client: Client identity for the failure throttle, e.g. the
+                IP address (None = not throttled)
+
+        Returns:
+            str: The authenticated username, or None
+        """
+        known, username = self.cached(header)
+        if known:
+            return username
+
+        with self._lock:
+            self.misses += 1
+            if client is not None and self._is_throttled(client):
+                self.throttled += 1
+                return None
+
+        username = self._verify(header)
+
+        now = time.monotonic()
+        with self._lock:
+            if username is not None:
+                self._remember(self._verified, header, username, now + self.ttl, self.cache_size)
+                self._failures.pop(client, None)
+            else:
+                self._remember(self._rejected, header, None, now + self.failure_ttl,
+                               self.failure_cache_size)
+                if client is not None:
+                    self._count_failure(client, now)
+        return username
+
+    def _remember(self, entries, header, username, expiry, size):
+        if size <= 0:
+            return
+        entries.pop(header, None)
+        entries[header] = (username, expiry)
+        while len(entries) > size:
+            entries.popitem(last=False)
+            if entries is self._verified:
+                self.evictions += 1
+
+    def _is_throttled(self, client):
+        entry = self._failures.get(client)
+        if entry is None or self.max_failures <= 0:
+            return False
+        if entry[1] <= time.monotonic():
+            del self._failures[client]
+            return False
+        return entry[0] >= self.max_failures
+
+    def _count_failure(self, client, now):
+        if self.max_failures <= 0:
+            return
+        count, window_end = self._failures.pop(client, (0, 0))
+        if window_end <= now:
+            count, window_end = 0, now + self.failure_window
+        self._failures[client] = (count + 1, window_end)
+        while len(self._failures) > FAILURE_CLIENTS:
+            self._failures.popitem(last=False)
+
+    def _verify(self, header):
+        """Decode and verify a header with a full password hash."""
+        auth_type, _, encoded = header.partition(' ')
+        if auth_type.lower() != 'basic':
+            return None
+
+        try:
+            decoded = base64.b64decode(encoded.strip(), validate=True).decode('utf-8')
+        except (binascii.Error, UnicodeDecodeError):
+            return None
+        username, separator, password = decoded.partition(':')
+        if not separator:
+            return None
+
+        # Unknown users are checked against a dummy hash so that the
+        # response time does not reveal which usernames exist
+        stored = self.users.get(username)
+        valid = verify_password(password, stored or DEFAULT_USERS[DEFAULT_USERNAME])
+        return username if valid and stored is not None else None
+
+    def stats(self):
+        """Return the cache and throttle counters and current sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._verified),
+                'max_entries': self.cache_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'rejected_entries': len(self._rejected),
+                'rejected_hits': self.rejected_hits,
+                'throttled': self.throttled,
+            }
+
+
+if __name__ == '__main__':
+    # Usage: python auth.py [username]  (prints an API_USERS entry)
+    name = sys.argv[1] if len(sys.argv) > 1 else input('Username: ')
+    secret = getpass.getpass('Password: ')
+    if secret != getpass.getpass('Repeat password: '):
+        sys.exit('Passwords do not match')
+    print(f'{name}:{hash_password(secret)}')
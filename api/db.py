@@ -0,0 +1,801 @@
+"""
+Transaction Storage
+===================
+
+Storage backends for api/rest_api_server.py. Both expose the same
+methods and return transactions as dictionaries in the API's JSON
+shape (records loaded from XML are dsa.xml_parser.Transaction, a compact
+read-only Mapping; anything written through the API is a plain dict):
+
+    count()                 Number of stored transactions
+    get(id)                 One transaction, or None
+    filter(filters)         Transactions matching parsed query filters
+    query(filters, limit, after)
+                            (matches, total) read from one consistent snapshot;
+                            at most `limit` matches with id > `after`
+    create(data)            Insert and return the new transaction
+    update(id, data)        Merge fields into a transaction, or None
+    delete(id)              True if the transaction existed
+    bulk(operations)        Apply many creates/updates/deletes at once
+    encode(transaction)     Compact JSON bytes of a stored transaction
+    version()               Dataset version; changes whenever the data does
+                            (`modified` holds the time of the last change)
+
+SQLiteTransactionStore is the default: it reads data/db.sqlite3 (filled
+by the ETL pipeline), so the server starts without re-parsing XML and the
+dataset is not limited by RAM. MemoryTransactionStore keeps everything
+in a dictionary keyed by id, loaded from XML as the original server did.
+
+Both stores are safe to share between request threads, and a reader
+never observes a half-applied write: SQLite reads run against a WAL
+snapshot, and the memory store serializes access with a lock and
+replaces (never mutates) transaction dictionaries it has handed out.
+
+The memory store also caches each transaction's encoded JSON, so list
+responses are assembled by joining cached bytes instead of re-encoding
+every record on every request.
+"""
+
+import heapq
+import json
+import queue
+import sqlite3
+import sys
+import os
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from etl.load_db import connect as connect_for_load
+from dsa.xml_parser import json_default
+from api.indexes import GRAM_SIZE, HashIndex, SortedIndex, NameIndex, ids_after
+
+# Fields of a parsed transaction and the column each one is stored in
+FIELD_COLUMNS = (
+    ('transaction_id', 'transaction_id'),
+    ('type', 'type'),
+    ('amount', 'amount'),
+    ('sender', 'sender'),
+    ('recipient', 'recipient'),
+    ('phone_number', 'phone_number'),
+    ('fee', 'fee_amount'),
+    ('new_balance', 'balance_after'),
+    ('timestamp', 'timestamp'),
+    ('readable_date', 'readable_date'),
+    ('raw_message', 'raw_message'),
+)
+FIELDS = tuple(field for field, _ in FIELD_COLUMNS)
+
+# Fields covered by MemoryTransactionStore's secondary indexes
+INDEXED_FIELDS = ('type', 'amount', 'sender', 'recipient')
+
+# Secondary indexes used by GET /transactions filters
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type)',
+    'CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount)',
+    'CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp)',
+)
+
+# Trigram full-text index over party names for ?sender= / ?recipient=.
+# It reads names from the transactions table (external content) and is
+# kept current by triggers, including during ETL loads.
+NAME_INDEX_TABLE = 'transaction_names'
+NAME_INDEX = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {NAME_INDEX_TABLE} USING fts5(
+        sender, recipient, content='transactions', content_rowid='id', tokenize='trigram')""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_names_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO {NAME_INDEX_TABLE} (rowid, sender, recipient)
+        VALUES (new.id, new.sender, new.recipient);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_names_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO {NAME_INDEX_TABLE} ({NAME_INDEX_TABLE}, rowid, sender, recipient)
+        VALUES ('delete', old.id, old.sender, old.recipient);
+    END""",
+    # API updates rewrite every column, so only reindex names that changed
+    'DROP TRIGGER IF EXISTS transactions_names_update',
+    f"""CREATE TRIGGER transactions_names_update
+    AFTER UPDATE OF sender, recipient ON transactions
+    WHEN old.sender IS NOT new.sender OR old.recipient IS NOT new.recipient BEGIN
+        INSERT INTO {NAME_INDEX_TABLE} ({NAME_INDEX_TABLE}, rowid, sender, recipient)
+        VALUES ('delete', old.id, old.sender, old.recipient);
+        INSERT INTO {NAME_INDEX_TABLE} (rowid, sender, recipient)
+        VALUES (new.id, new.sender, new.recipient);
+    END""",
+)
+
+# Applied to every pooled connection
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -32768',       # 32 MB page cache per connection
+    'PRAGMA mmap_size = 268435456',     # 256 MB memory-mapped I/O
+    'PRAGMA busy_timeout = 5000',
+)
+
+_COLUMNS = ', '.join(column for _, column in FIELD_COLUMNS)
+
+SELECT_SQL = f'SELECT id, {_COLUMNS}, extra FROM transactions'
+GET_SQL = f'{SELECT_SQL} WHERE id = ?'
+COUNT_SQL = 'SELECT count(*) FROM transactions'
+INSERT_SQL = f"""
+INSERT INTO transactions (source_key, category_id, {_COLUMNS}, extra)
+VALUES ('api:' || lower(hex(randomblob(16))),
+        (SELECT id FROM transaction_categories WHERE category_code = ?),
+        {', '.join('?' for _ in FIELD_COLUMNS)}, ?)
+"""
+UPDATE_SQL = f"""
+UPDATE transactions SET
+    category_id = (SELECT id FROM transaction_categories WHERE category_code = ?),
+    {', '.join(f'{column} = ?' for _, column in FIELD_COLUMNS)},
+    extra = ?
+WHERE id = ?
+"""
+DELETE_SQL = 'DELETE FROM transactions WHERE id = ?'
+
+# WHERE clause for each supported filter
+FILTER_CLAUSES = (
+    ('type', 'type = ?'),
+    ('amount_min', 'amount >= ?'),
+    ('amount_max', 'amount <= ?'),
+    ('sender', 'instr(fold_name(sender), ?) > 0'),
+    ('recipient', 'instr(fold_name(recipient), ?) > 0'),
+)
+
+# Narrows a sender/recipient filter to trigram index hits before the
+# exact instr() check; trigrams need at least GRAM_SIZE characters
+NAME_MATCH_CLAUSE = f'id IN (SELECT rowid FROM {NAME_INDEX_TABLE} WHERE {NAME_INDEX_TABLE} MATCH ?)'
+NAME_FILTERS = ('sender', 'recipient')
+
+# Encoded transactions kept by MemoryTransactionStore (oldest evicted first)
+RECORD_CACHE_SIZE = 250000
+
+
+def _is_scalar(value):
+    """True for values that can live in a typed column."""
+    return value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool))
+
+
+def split_fields(data):
+    """
+    Separate column-backed fields from free-form extra fields.
+
+    Args:
+        data (dict): Transaction fields (the 'id' key is ignored)
+
+    Returns:
+        tuple: (columns dict keyed by API field, extra dict)
+    """
+    columns = {}
+    extra = {}
+    for key, value in data.items():
+        if key == 'id':
+            continue
+        if key in FIELDS and _is_scalar(value):
+            columns[key] = value
+        else:
+            extra[key] = value
+    return columns, extra
+
+
+def fold_name(name):
+    """
+    Lowercase a party name for ?sender= / ?recipient= matching.
+
+    Registered as the SQL function fold_name() on pooled connections:
+    SQLite's lower() only folds ASCII, while filter values are lowered
+    with Python's Unicode rules, as the memory store's names are.
+    """
+    return name.lower() if isinstance(name, str) else name
+
+
+def encode_transaction(transaction):
+    """
+    Encode a transaction as compact UTF-8 JSON (no whitespace).
+    """
+    return json.dumps(transaction, ensure_ascii=False, separators=(',', ':'),
+                      default=json_default).encode('utf-8')
+
+
+def row_to_transaction(row):
+    """
+    Convert a SELECT_SQL row to the API's transaction dictionary.
+    """
+    transaction = {'id': row[0]}
+    for field, value in zip(FIELDS, row[1:-1]):
+        transaction[field] = value
+
+    # Timestamps are served as strings, exactly as they appear in the XML
+    if transaction['timestamp'] is not None:
+        transaction['timestamp'] = str(transaction['timestamp'])
+
+    if row[-1]:
+        transaction.update(json.loads(row[-1]))
+    return transaction
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared between request threads.
+
+    Connections are opened once with the store's pragmas; statements run
+    on them are compiled once and reused from each connection's statement
+    cache.
+    """
+
+    def __init__(self, db_path, size=4):
+        self._connections = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(db_path, isolation_level=None,
+                                   check_same_thread=False, cached_statements=256)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            conn.create_function('fold_name', 1, fold_name, deterministic=True)
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block."""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection and run the with-block in a write transaction."""
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class SQLiteTransactionStore:
+    """
+    Transaction storage over the SQLite database written by the ETL.
+    """
+
+    def __init__(self, db_path, pool_size=4):
+        self.db_path = db_path
+        self.name_index = self.initialize(db_path)
+        self.pool = ConnectionPool(db_path, pool_size)
+
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._signature = self._file_signature()
+        self.modified = max((mtime for mtime, _ in filter(None, self._signature)),
+                            default=time.time_ns()) / 1e9
+
+    @staticmethod
+    def initialize(db_path):
+        """
+        Create the schema (shared with the ETL loader) and API indexes.
+
+        Returns:
+            bool: True if the trigram name index is available (needs
+            SQLite 3.34+ built with FTS5)
+        """
+        conn = connect_for_load(db_path)   # migrates older schemas
+        try:
+            for index in INDEXES:
+                conn.execute(index)
+
+            exists = conn.execute('SELECT 1 FROM sqlite_master WHERE name = ?',
+                                  (NAME_INDEX_TABLE,)).fetchone()
+            try:
+                conn.execute('BEGIN')
+                for statement in NAME_INDEX:
+                    conn.execute(statement)
+                if not exists:
+                    # Index the rows loaded before the table existed
+                    conn.execute(f"INSERT INTO {NAME_INDEX_TABLE} ({NAME_INDEX_TABLE}) VALUES ('rebuild')")
+                conn.execute('COMMIT')
+            except sqlite3.OperationalError:
+                conn.execute('ROLLBACK')
+                return False
+            return True
+        finally:
+            conn.close()
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute(COUNT_SQL).fetchone()[0]
+
+    def get(self, transaction_id):
+        with self.pool.connection() as conn:
+            row = conn.execute(GET_SQL, (transaction_id,)).fetchone()
+        return row_to_transaction(row) if row else None
+
+    def filter(self, filters):
+        """
+        Return transactions matching all given filters, ordered by id.
+
+        Args:
+            filters (dict): Parsed filters (type, amount_min, amount_max,
+                sender, recipient); sender/recipient must be lowercase
+        """
+        with self.pool.connection() as conn:
+            return self._filter(conn, filters)
+
+    def query(self, filters, limit=None, after=None):
+        """
+        Return (matching transactions, total count) from one read snapshot.
+
+        Args:
+            filters (dict): Parsed filters, as for filter()
+            limit (int): Maximum number of matches (None = all)
+            after (int): Only return transactions with a larger id (keyset cursor)
+        """
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN')
+            try:
+                matches = self._filter(conn, filters, limit, after)
+                total = conn.execute(COUNT_SQL).fetchone()[0]
+            finally:
+                conn.execute('COMMIT')
+        return matches, total
+
+    def _filter(self, conn, filters, limit=None, after=None):
+        clauses = []
+        params = []
+        for name, clause in FILTER_CLAUSES:
+            if name in filters:
+                clauses.append(clause)
+                params.append(filters[name])
+
+                if name in NAME_FILTERS and self.name_index and len(filters[name]) >= GRAM_SIZE:
+                    clauses.append(NAME_MATCH_CLAUSE)
+                    params.append(_name_query(name, filters[name]))
+
+        if after is not None:
+            clauses.append('id > ?')
+            params.append(after)
+
+        sql = SELECT_SQL
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        return [row_to_transaction(row) for row in conn.execute(sql, params)]
+
+    def create(self, data):
+        with self.pool.transaction() as conn:
+            new_id = self._create(conn, data)
+            row = conn.execute(GET_SQL, (new_id,)).fetchone()
+        self._changed()
+        return row_to_transaction(row)
+
+    def update(self, transaction_id, data):
+        with self.pool.transaction() as conn:
+            if not self._update(conn, transaction_id, data):
+                return None
+            row = conn.execute(GET_SQL, (transaction_id,)).fetchone()
+        self._changed()
+        return row_to_transaction(row)
+
+    def delete(self, transaction_id):
+        with self.pool.transaction() as conn:
+            deleted = self._delete(conn, transaction_id)
+        if deleted:
+            self._changed()
+        return deleted
+
+    def bulk(self, operations):
+        """
+        Apply many writes in one database transaction.
+
+        Args:
+            operations: Sequence of (op, transaction_id, data) tuples, op
+                being 'create' (id ignored), 'update' or 'delete' (data
+                ignored); applied in order
+
+        Returns:
+            list: Per operation, the id of the created, updated or
+            deleted transaction, or None if it did not exist
+        """
+        results = []
+        with self.pool.transaction() as conn:
+            for op, transaction_id, data in operations:
+                if op == 'create':
+                    results.append(self._create(conn, data))
+                elif op == 'update':
+                    results.append(transaction_id if self._update(conn, transaction_id, data) else None)
+                else:
+                    results.append(transaction_id if self._delete(conn, transaction_id) else None)
+        if any(result is not None for result in results):
+            self._changed()
+        return results
+
+    @staticmethod
+    def _row_params(transaction):
+        columns, extra = split_fields(transaction)
+        params = [columns.get('type')]
+        params.extend(columns.get(field) for field in FIELDS)
+        params.append(json.dumps(extra) if extra else None)
+        return params
+
+    def _create(self, conn, data):
+        return conn.execute(INSERT_SQL, self._row_params(data)).lastrowid
+
+    def _update(self, conn, transaction_id, data):
+        row = conn.execute(GET_SQL, (transaction_id,)).fetchone()
+        if row is None:
+            return False
+
+        current = row_to_transaction(row)
+        current.update((key, value) for key, value in data.items() if key != 'id')
+        conn.execute(UPDATE_SQL, self._row_params(current) + [transaction_id])
+        return True
+
+    def _delete(self, conn, transaction_id):
+        return conn.execute(DELETE_SQL, (transaction_id,)).rowcount > 0
+
+    def encode(self, transaction):
+        # Not cached: the ETL can rewrite rows behind the server's back
+        return encode_transaction(transaction)
+
+    def version(self):
+        """
+        Return the dataset version without querying the database.
+
+        The version counts writes made through this store, and also
+        moves when the database or WAL file changes on disk (an ETL run
+        or another process), which is detected with a stat() per call.
+        """
+        signature = self._file_signature()
+        with self._version_lock:
+            if signature != self._signature:
+                self._signature = signature
+                self._version += 1
+                self.modified = time.time()
+            return self._version
+
+    def _changed(self):
+        with self._version_lock:
+            self._signature = self._file_signature()
+            self._version += 1
+            self.modified = time.time()
+
+    def _file_signature(self):
+        """(mtime_ns, size) of the database and WAL files (None if missing)."""
+        signature = []
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def close(self):
+        self.pool.close()
+
+
+class MemoryTransactionStore:
+    """
+    Transaction storage in a Python dictionary (no persistence).
+
+    Transactions are kept in a dict keyed by id, which preserves insertion
+    order, so lookup, update and delete by id are constant time and
+    listings still come back in id order.
+
+    Filters are answered from secondary indexes (see api/indexes.py): a
+    hash index on type, a sorted index on amount and name indexes on
+    sender and recipient. Each filter's candidate count is known from its
+    index; the smallest candidate set is read in id order and narrowed by
+    the remaining filters, so a query touches at most that many records,
+    and a page (limit/after) stops as soon as it is full.
+
+    All access goes through one lock. Updates build a new dictionary
+    instead of editing the stored one, so a transaction returned to a
+    request thread never changes while it is being serialized.
+
+    encode() caches the JSON bytes of up to `cache_size` transactions,
+    each tagged with the dictionary it was encoded from. Update and
+    delete drop the entry, and a stale entry (encoded from a replaced
+    dictionary) is never returned.
+
+    Every create, update and delete increments the dataset version.
+    """
+
+    def __init__(self, transactions=None, cache_size=RECORD_CACHE_SIZE):
+        self.transactions = {t['id']: t for t in transactions or []}
+        self.next_id = max(self.transactions, default=0) + 1
+        self._lock = threading.Lock()
+
+        self.cache_size = cache_size
+        self._encoded = {}
+        self._encoded_lock = threading.Lock()
+
+        self._version = 0
+        self.modified = time.time()
+
+        self._by_type = HashIndex()
+        self._by_sender = NameIndex()
+        self._by_recipient = NameIndex()
+        amounts = []
+        for transaction in self.transactions.values():
+            amount = self._index(transaction, sorted_amounts=False)
+            if amount is not None:
+                amounts.append((amount, transaction['id']))
+        self._by_amount = SortedIndex(amounts)
+
+    def count(self):
+        with self._lock:
+            return len(self.transactions)
+
+    def get(self, transaction_id):
+        with self._lock:
+            return self.transactions.get(transaction_id)
+
+    def filter(self, filters):
+        with self._lock:
+            return self._filter(filters)
+
+    def query(self, filters, limit=None, after=None):
+        with self._lock:
+            return self._filter(filters, limit, after), len(self.transactions)
+
+    def _filter(self, filters, limit=None, after=None):
+        plans = self._plan(filters)
+        if not plans:
+            return self._scan(limit, after)
+
+        plans.sort(key=lambda plan: plan[0])
+        size, candidates, _ = plans[0]
+        if size == 0:
+            return []
+
+        # Lazy and in id order, so a page stops reading records once it is full
+        transactions = (self.transactions[i] for i in candidates(after))
+        for _, _, matches in plans[1:]:
+            transactions = filter(matches, transactions)
+        return list(islice(transactions, limit))
+
+    def _scan(self, limit=None, after=None):
+        """
+        Unfiltered page in id order.
+
+        Ids are assigned in increasing order, so a page starting after a
+        cursor is read by probing the following ids; its cost depends on
+        the page size (plus any deleted ids it skips), not the dataset.
+        """
+        if after is None and limit is None:
+            return list(self.transactions.values())
+
+        start = 1 if after is None else max(after + 1, 1)
+        found = (self.transactions[i] for i in range(start, self.next_id) if i in self.transactions)
+        return list(islice(found, limit))
+
+    def _plan(self, filters):
+        """
+        Describe how each filter can be answered.
+
+        Returns:
+            list: (candidate count, function(after) iterating the candidate
+            ids in increasing order, predicate for a single transaction)
+            per filter
+        """
+        plans = []
+
+        if 'type' in filters:
+            trans_type = filters['type']
+            ids = self._by_type.lookup(trans_type)
+            plans.append((len(ids), lambda after: ids_after(ids, after),
+                          lambda t: t.get('type') == trans_type))
+
+        if 'amount_min' in filters or 'amount_max' in filters:
+            low = filters.get('amount_min')
+            high = filters.get('amount_max')
+            plans.append((self._by_amount.count(low, high),
+                          lambda after: self._by_amount.ids_after(low, high, after),
+                          lambda t: _amount_in_range(t.get('amount'), low, high)))
+
+        for field, index in (('sender', self._by_sender), ('recipient', self._by_recipient)):
+            if field in filters:
+                substring = filters[field]
+                postings = index.lookup(substring)
+                # A transaction has one name per field, so the merge has no duplicates
+                plans.append((sum(len(ids) for ids in postings),
+                              lambda after, postings=postings:
+                                  heapq.merge(*(ids_after(ids, after) for ids in postings)),
+                              lambda t, field=field, substring=substring:
+                                  _name_contains(t.get(field), substring)))
+
+        return plans
+
+    def _index(self, transaction, sorted_amounts=True):
+        """
+        Add a transaction to the secondary indexes.
+
+        Returns:
+            The indexed amount, or None if the amount is not a number
+        """
+        transaction_id = transaction['id']
+        trans_type = transaction.get('type')
+        if isinstance(trans_type, str):
+            self._by_type.add(trans_type, transaction_id)
+
+        for field, index in (('sender', self._by_sender), ('recipient', self._by_recipient)):
+            name = transaction.get(field)
+            if isinstance(name, str) and name:
+                index.add(name, transaction_id)
+
+        amount = transaction.get('amount')
+        if not _is_number(amount) or amount != amount:  # NaN never matches a range
+            return None
+        if sorted_amounts:
+            self._by_amount.add(amount, transaction_id)
+        return amount
+
+    def _unindex(self, transaction):
+        """Remove a transaction from the secondary indexes."""
+        transaction_id = transaction['id']
+        trans_type = transaction.get('type')
+        if isinstance(trans_type, str):
+            self._by_type.remove(trans_type, transaction_id)
+
+        for field, index in (('sender', self._by_sender), ('recipient', self._by_recipient)):
+            name = transaction.get(field)
+            if isinstance(name, str) and name:
+                index.remove(name, transaction_id)
+
+        amount = transaction.get('amount')
+        if _is_number(amount) and amount == amount:
+            self._by_amount.remove(amount, transaction_id)
+
+    def create(self, data):
+        with self._lock:
+            transaction = self._create(data)
+            self._changed()
+            return transaction
+
+    def update(self, transaction_id, data):
+        with self._lock:
+            transaction = self._update(transaction_id, data)
+            if transaction is None:
+                return None
+            self._changed()
+        self._forget(transaction_id)
+        return transaction
+
+    def delete(self, transaction_id):
+        with self._lock:
+            if self._delete(transaction_id) is None:
+                return False
+            self._changed()
+        self._forget(transaction_id)
+        return True
+
+    def bulk(self, operations):
+        """
+        Apply many writes under one lock acquisition and one version bump.
+
+        Args:
+            operations: Sequence of (op, transaction_id, data) tuples, as
+                for SQLiteTransactionStore.bulk
+
+        Returns:
+            list: Per operation, the id of the created, updated or
+            deleted transaction, or None if it did not exist
+        """
+        results = []
+        with self._lock:
+            for op, transaction_id, data in operations:
+                if op == 'create':
+                    results.append(self._create(data)['id'])
+                    continue
+                if op == 'update':
+                    found = self._update(transaction_id, data)
+                else:
+                    found = self._delete(transaction_id)
+                results.append(transaction_id if found is not None else None)
+            if any(result is not None for result in results):
+                self._changed()
+
+        for (op, transaction_id, _), result in zip(operations, results):
+            if op != 'create' and result is not None:
+                self._forget(transaction_id)
+        return results
+
+    def _create(self, data):
+        # Called with the store lock held (as are _update and _delete)
+        transaction = dict(data)
+        transaction['id'] = self.next_id
+        self.next_id += 1
+        self.transactions[transaction['id']] = transaction
+        self._index(transaction)
+        return transaction
+
+    def _update(self, transaction_id, data):
+        current = self.transactions.get(transaction_id)
+        if current is None:
+            return None
+
+        # Copy-on-write: readers holding the old dict are unaffected
+        transaction = dict(current)
+        for key, value in data.items():
+            if key != 'id':  # Never allow ID change
+                transaction[key] = value
+        self.transactions[transaction_id] = transaction
+
+        if any(current.get(field) != transaction.get(field) for field in INDEXED_FIELDS):
+            self._unindex(current)
+            self._index(transaction)
+        return transaction
+
+    def _delete(self, transaction_id):
+        transaction = self.transactions.pop(transaction_id, None)
+        if transaction is not None:
+            self._unindex(transaction)
+        return transaction
+
+    def encode(self, transaction):
+        """
+        Return the compact JSON bytes of a transaction from this store.
+
+        Args:
+            transaction (dict): A transaction returned by get/filter/query
+        """
+        transaction_id = transaction.get('id')
+        cached = self._encoded.get(transaction_id)
+        if cached is not None and cached[0] is transaction:
+            return cached[1]
+
+        encoded = encode_transaction(transaction)
+        if self.cache_size > 0:
+            with self._encoded_lock:
+                if len(self._encoded) >= self.cache_size and transaction_id not in self._encoded:
+                    del self._encoded[next(iter(self._encoded))]
+                self._encoded[transaction_id] = (transaction, encoded)
+        return encoded
+
+    def version(self):
+        return self._version
+
+    def _changed(self):
+        # Called with the store lock held
+        self._version += 1
+        self.modified = time.time()
+
+    def _forget(self, transaction_id):
+        with self._encoded_lock:
+            self._encoded.pop(transaction_id, None)
+
+    def close(self):
+        pass
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _amount_in_range(amount, low, high):
+    return (_is_number(amount)
+            and (low is None or amount >= low)
+            and (high is None or amount <= high))
+
+
+def _name_query(column, substring):
+    """FTS5 query matching `substring` anywhere in one name column."""
+    return '%s : "%s"' % (column, substring.replace('"', '""'))
+
+
+def _name_contains(name, substring):
+    return isinstance(name, str) and bool(name) and substring in name.lower()
@@ -0,0 +1,297 @@
+"""
+In-Memory Secondary Indexes
+===========================
+
+Indexes used by api.db.MemoryTransactionStore to answer GET /transactions
+filters without scanning every transaction:
+
+    HashIndex       exact value -> ids                  (?type=)
+    SortedIndex     sorted (value, id) pairs, bisected  (?amount_min= / ?amount_max=)
+    NameIndex       n-grams -> names -> ids             (?sender= / ?recipient=)
+
+Each index stores transaction ids only; the store keeps the records.
+Indexes are updated by the store on every create, update and delete.
+
+Posting lists are SortedLists of ids. New transactions get the largest
+id, so adding one is an append, and a page of results after a cursor
+starts with a binary search instead of a sort.
+"""
+
+import bisect
+
+# Longest n-gram indexed by NameIndex (trigrams)
+GRAM_SIZE = 3
+
+# Target bucket length of SortedList (buckets split at twice this)
+BUCKET_SIZE = 1000
+
+# Id-ordered ranges kept by SortedIndex between writes
+RANGE_CACHE_SIZE = 16
+
+
+class SortedList:
+    """
+    Sorted sequence stored as a list of bounded, sorted buckets.
+
+    Adding or removing a value costs two binary searches and a shift
+    within one bucket, instead of a shift of the whole sequence, so
+    index maintenance stays cheap at millions of entries. Appending a
+    new largest value (the common case for ids) touches only the last
+    bucket.
+    """
+
+    def __init__(self, values=()):
+        values = sorted(values)
+        self._buckets = [values[i:i + BUCKET_SIZE] for i in range(0, len(values), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(values)
+
+    def __len__(self):
+        return self._len
+
+    def add(self, value):
+        if not self._buckets:
+            self._buckets.append([value])
+            self._maxes.append(value)
+            self._len = 1
+            return
+
+        position = bisect.bisect_left(self._maxes, value)
+        if position == len(self._maxes):
+            position -= 1
+            self._buckets[position].append(value)
+            self._maxes[position] = value
+        else:
+            bisect.insort(self._buckets[position], value)
+
+        bucket = self._buckets[position]
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self._buckets[position:position + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[position:position + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+        self._len += 1
+
+    def remove(self, value):
+        """
+        Remove one occurrence of `value`.
+
+        Returns:
+            bool: False if the value was not present
+        """
+        position = bisect.bisect_left(self._maxes, value)
+        if position == len(self._maxes):
+            return False
+
+        bucket = self._buckets[position]
+        index = bisect.bisect_left(bucket, value)
+        if bucket[index] != value:
+            return False
+
+        del bucket[index]
+        self._len -= 1
+        if bucket:
+            self._maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del self._maxes[position]
+        return True
+
+    def rank(self, value, right=False):
+        """
+        Number of values below `value` (or not above it, if `right`).
+        """
+        search = bisect.bisect_right if right else bisect.bisect_left
+        position = search(self._maxes, value)
+        if position == len(self._maxes):
+            return self._len
+        before = sum(len(bucket) for bucket in self._buckets[:position])
+        return before + search(self._buckets[position], value)
+
+    def irange(self, minimum=None, maximum=None):
+        """
+        Iterate, in order, the values with minimum <= value <= maximum.
+        """
+        position = index = 0
+        if minimum is not None:
+            position = bisect.bisect_left(self._maxes, minimum)
+            if position < len(self._buckets):
+                index = bisect.bisect_left(self._buckets[position], minimum)
+
+        for bucket in self._buckets[position:]:
+            for value in bucket[index:] if index else bucket:
+                if maximum is not None and value > maximum:
+                    return
+                yield value
+            index = 0
+
+
+def ids_after(ids, after=None):
+    """
+    Iterate a posting list (SortedList of ids) from the first id greater
+    than `after`.
+    """
+    return ids.irange(None if after is None else after + 1)
+
+
+class HashIndex:
+    """
+    Sorted posting lists of ids per exact value.
+    """
+
+    def __init__(self):
+        self.postings = {}
+
+    def add(self, value, transaction_id):
+        ids = self.postings.get(value)
+        if ids is None:
+            ids = self.postings[value] = SortedList()
+        ids.add(transaction_id)
+
+    def remove(self, value, transaction_id):
+        ids = self.postings.get(value)
+        if ids is not None:
+            ids.remove(transaction_id)
+            if not ids:
+                del self.postings[value]
+
+    def lookup(self, value):
+        """Return the sorted ids with this value (do not modify them)."""
+        return self.postings.get(value, _EMPTY)
+
+
+class SortedIndex:
+    """
+    (value, id) pairs kept in sorted order for range queries.
+
+    Ranges are located by binary search, so their size is known before
+    any id is read.
+
+    Entries are in value order, but listings are in id order, so a range
+    read by id has to be sorted once. The sorted ids of the last
+    RANGE_CACHE_SIZE ranges are kept until the next add or remove, so
+    the following pages of the same listing bisect to their cursor
+    instead of sorting the range again.
+    """
+
+    def __init__(self, pairs=()):
+        self.entries = SortedList(pairs)
+        self._ranges = {}
+
+    def add(self, value, transaction_id):
+        self.entries.add((value, transaction_id))
+        self._ranges.clear()
+
+    def remove(self, value, transaction_id):
+        self.entries.remove((value, transaction_id))
+        self._ranges.clear()
+
+    def count(self, low=None, high=None):
+        """Number of entries with low <= value <= high."""
+        start = 0 if low is None else self.entries.rank((low,))
+        stop = len(self.entries) if high is None else self.entries.rank((high, float('inf')), right=True)
+        return max(0, stop - start)
+
+    def ids(self, low=None, high=None):
+        """Set of ids whose value is in [low, high]."""
+        entries = self.entries.irange(None if low is None else (low,),
+                                      None if high is None else (high, float('inf')))
+        return {transaction_id for _, transaction_id in entries}
+
+    def sorted_ids(self, low=None, high=None):
+        """Tuple of the ids whose value is in [low, high], in increasing order."""
+        key = (low, high)
+        ids = self._ranges.pop(key, None)
+        if ids is None:
+            ids = tuple(sorted(self.ids(low, high)))
+            if len(self._ranges) >= RANGE_CACHE_SIZE:
+                del self._ranges[next(iter(self._ranges))]
+        self._ranges[key] = ids     # most recently used last
+        return ids
+
+    def ids_after(self, low=None, high=None, after=None):
+        """
+        Iterate the ids whose value is in [low, high] in increasing
+        order, from the first id greater than `after`.
+        """
+        ids = self.sorted_ids(low, high)
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        return map(ids.__getitem__, range(start, len(ids)))
+
+
+class NameIndex:
+    """
+    Substring index over lowercased names.
+
+    Keeps a sorted posting list of ids per distinct name, plus an n-gram
+    index mapping every 1-, 2- and 3-character substring of a name to
+    the names containing it. A query of up to three characters is a
+    single n-gram lookup; a longer one intersects the name sets of its
+    trigrams (smallest first) and confirms the few survivors with `in`.
+    Only the distinct names are indexed, and only when a name is first
+    seen or last removed, so writes of known names cost one list update.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.grams = {}
+
+    def add(self, name, transaction_id):
+        key = name.lower()
+        ids = self.postings.get(key)
+        if ids is None:
+            ids = self.postings[key] = SortedList()
+            for gram in _ngrams(key):
+                self.grams.setdefault(gram, set()).add(key)
+        ids.add(transaction_id)
+
+    def remove(self, name, transaction_id):
+        key = name.lower()
+        ids = self.postings.get(key)
+        if ids is None:
+            return
+        ids.remove(transaction_id)
+        if not ids:
+            del self.postings[key]
+            for gram in _ngrams(key):
+                names = self.grams[gram]
+                names.discard(key)
+                if not names:
+                    del self.grams[gram]
+
+    def names(self, substring):
+        """
+        Return the indexed names containing `substring`.
+
+        Args:
+            substring (str): Lowercase text to look for
+        """
+        if not substring:
+            return self.postings.keys()
+        if len(substring) <= GRAM_SIZE:
+            return self.grams.get(substring, ())
+
+        candidates = sorted((self.grams.get(substring[i:i + GRAM_SIZE], ())
+                             for i in range(len(substring) - GRAM_SIZE + 1)), key=len)
+        names = set(candidates[0]).intersection(*candidates[1:])
+        return [name for name in names if substring in name]
+
+    def lookup(self, substring):
+        """
+        Return the posting lists of every name containing `substring`.
+
+        Args:
+            substring (str): Lowercase text to look for
+
+        Returns:
+            list: SortedLists of ids (do not modify them)
+        """
+        return [self.postings[name] for name in self.names(substring)]
+
+
+_EMPTY = SortedList()
+
+
+def _ngrams(text):
+    """All distinct substrings of `text` with 1 to GRAM_SIZE characters."""
+    return {text[i:i + size]
+            for size in range(1, GRAM_SIZE + 1)
+            for i in range(len(text) - size + 1)}
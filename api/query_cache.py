@@ -0,0 +1,122 @@
+"""
+Query Result Cache
+==================
+
+LRU cache of serialized GET /transactions responses, used by
+api/rest_api_server.py so that popular filter combinations (?type=payment,
+amount bands, the dashboard's listing) are answered without querying the
+store or encoding a single record.
+
+Entries are keyed on the normalized query parameters and tagged with the
+store's dataset version (see api/db.py). A write increments the version,
+and the first lookup that sees the new version drops every entry: each
+was computed from the old data, and nothing else is ever invalidated.
+
+The cache is bounded both by number of entries and by total bytes, and
+counts hits, misses, evictions and invalidations.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Default bounds
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of response bodies, bounded by count and size.
+
+    Args:
+        max_entries (int): Most responses kept (0 disables the cache)
+        max_bytes (int): Most body bytes kept across all entries
+        max_entry_bytes (int): Largest single body accepted
+            (default: an eighth of max_bytes, so one listing cannot
+            flush the whole cache)
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, max_entry_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 8 if max_entry_bytes is None else max_entry_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_entry_bytes > 0
+
+    def get(self, key, version):
+        """
+        Return the response cached for `key` at this dataset version.
+
+        Returns:
+            tuple: (body bytes, content type, headers dict), or None
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, body, content_type, headers=None):
+        """
+        Cache a response computed from the data at `version`.
+
+        Bodies larger than max_entry_bytes are not cached.
+        """
+        if not self.enabled or len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if version != self._version:
+                return  # Computed before a write that has since been seen
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = (body, content_type, headers or {})
+            self._bytes += len(body)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _check_version(self, version):
+        # Called with the lock held. Versions only grow, so an older
+        # one (from a request that started before a write) is ignored.
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def stats(self):
+        """Return the cache counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
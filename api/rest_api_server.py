@@ -1,27 +1,216 @@
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import json
-import base64
+import queue
+import sqlite3
 import sys
 import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from email.utils import formatdate
 from urllib.parse import urlparse, parse_qs
 
 # Add parent directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from dsa.xml_parser import parse_xml_to_json
+from dsa.xml_parser import json_default
+from api.db import SQLiteTransactionStore, MemoryTransactionStore
+from api.query_cache import QueryCache
+from api.auth import Authenticator, load_users, DEFAULT_USERNAME, DEFAULT_PASSWORD
+from etl import config as etl_config
+from etl.run import run_pipeline
+from etl.snapshot import load_transactions
 
 # ============================================================================
 # GLOBAL CONFIGURATION
 # ============================================================================
 
-# In-memory data storage
-transactions = []
-next_id = 1
+# Transaction storage (SQLiteTransactionStore or MemoryTransactionStore),
+# set up by run_server()
+store = MemoryTransactionStore()
 
-# Authentication credentials
-# WARNING: Hardcoding credentials is INSECURE!
-# In production, use environment variables and hashed passwords
-VALID_USERNAME = "admin"
-VALID_PASSWORD = "password123"
+# Serialized GET /transactions responses, tagged with the store version
+query_cache = QueryCache()
+
+# Authentication: hashed credentials from API_USERS / API_USERS_FILE
+# (see api/auth.py). Without them the development account
+# admin/password123 is used.
+USERS, DEFAULT_CREDENTIALS = load_users()
+authenticator = Authenticator(USERS)
+AUTH_HINT = (f'Valid credentials required. Use username: {DEFAULT_USERNAME}, password: {DEFAULT_PASSWORD}'
+             if DEFAULT_CREDENTIALS else 'Valid credentials required')
+
+# Concurrency settings
+WORKER_THREADS = 16         # Connections served at the same time
+LISTEN_BACKLOG = 128        # Pending connections queued by the kernel
+KEEPALIVE_TIMEOUT = 15      # Seconds an idle keep-alive connection stays open
+
+# Pagination settings
+MAX_PAGE_SIZE = 1000        # Largest accepted ?limit=
+
+# Bulk endpoint settings (POST /transactions/bulk)
+MAX_BULK_OPERATIONS = 10000 # Most operations accepted in one request
+BULK_OPS = ('create', 'update', 'delete')
+
+# Streaming settings (GET /transactions without ?limit=)
+STREAM_BATCH_SIZE = 500     # Transactions read from the store at a time
+STREAM_BUFFER_SIZE = 65536  # Bytes collected before a chunk is written
+NDJSON_TYPE = 'application/x-ndjson'
+
+# Responses are compact unless the client asks for ?pretty=1
+COMPACT_SEPARATORS = (',', ':')
+
+# Compression settings (Accept-Encoding: gzip / deflate)
+COMPRESS_MIN_SIZE = 1024    # Smallest body compressed (None = never compress)
+COMPRESS_LEVEL = 6          # zlib level (1 = fastest, 9 = smallest)
+
+# zlib window bits per Content-Encoding (gzip header / zlib header)
+ENCODING_WBITS = {'gzip': 31, 'deflate': 15}
+
+# Prefix of every ETag, unique to this server process, so a restarted
+# server (whose version counter starts again) never matches an old ETag
+INSTANCE_TAG = format(time.time_ns(), 'x')
+
+
+def json_object(members):
+    """
+    Assemble a JSON object from already-encoded member values.
+    
+    Args:
+        members: (key, encoded JSON value bytes) pairs, in output order
+    
+    Returns:
+        bytes: Compact JSON object
+    """
+    return b'{' + b','.join(b'"%s":%s' % (key.encode('utf-8'), value)
+                            for key, value in members) + b'}'
+
+
+class ChunkedWriter:
+    """
+    Writes a streamed response body in chunks of about `buffer_size` bytes.
+    
+    HTTP/1.1 clients get Transfer-Encoding: chunked framing. HTTP/1.0
+    clients get the raw body, and the connection is closed to mark its end.
+    
+    With an `encoding`, each buffer is compressed as it is flushed, so
+    neither the plain nor the compressed body is ever held whole.
+    
+    Args:
+        wfile: Socket file of the request handler
+        chunked (bool): Use chunked transfer encoding
+        buffer_size (int): Bytes to collect before writing a chunk
+        encoding (str): Content-Encoding to apply ('gzip', 'deflate' or None)
+        keep (int): Also keep a copy of the body (before compression) while
+            it is at most this many bytes; see body()
+    """
+    
+    def __init__(self, wfile, chunked=True, buffer_size=STREAM_BUFFER_SIZE, encoding=None, keep=0):
+        self.wfile = wfile
+        self.chunked = chunked
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+        self._compressor = compressor(encoding) if encoding else None
+        self._kept = [] if keep > 0 else None
+        self._kept_size = 0
+        self._keep = keep
+    
+    def write(self, data):
+        if self._kept is not None:
+            self._kept_size += len(data)
+            if self._kept_size <= self._keep:
+                self._kept.append(data)
+            else:
+                self._kept = None  # Too large, stop copying
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        if not self._size:
+            return
+        data = b''.join(self._parts)
+        self._parts = []
+        self._size = 0
+        if self._compressor:
+            data = self._compressor.compress(data)
+        self._send(data)
+    
+    def _send(self, data):
+        if not data:  # An empty chunk would end the body
+            return
+        if self.chunked:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        else:
+            self.wfile.write(data)
+    
+    def close(self):
+        """Write any buffered data and the end-of-body marker."""
+        self.flush()
+        if self._compressor:
+            self._send(self._compressor.flush())
+        if self.chunked:
+            self.wfile.write(b'0\r\n\r\n')
+    
+    def body(self):
+        """The whole body written so far, or None if it exceeded `keep`."""
+        return b''.join(self._kept) if self._kept is not None else None
+
+
+def etag_matches(if_none_match, etag):
+    """
+    True if an If-None-Match header value matches `etag` (weak comparison).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def compressor(encoding):
+    """
+    Return a zlib compressor producing the given Content-Encoding.
+    
+    Args:
+        encoding (str): 'gzip' or 'deflate' (zlib format, as HTTP defines it)
+    """
+    return zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, ENCODING_WBITS[encoding])
+
+
+def compress(data, encoding):
+    """Compress a whole body with the given Content-Encoding."""
+    engine = compressor(encoding)
+    return engine.compress(data) + engine.flush()
+
+
+def iter_transaction_batches(filters, after=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Read every transaction matching `filters` from the store in id order,
+    one keyset page at a time.
+    
+    Each batch is a consistent snapshot; the store is not held between
+    batches, so a slow client never blocks writers.
+    
+    Yields:
+        tuple: (list of transactions, total transactions in the store)
+    """
+    while True:
+        batch, total = store.query(filters, batch_size, after)
+        yield batch, total
+        if len(batch) < batch_size:
+            return
+        after = batch[-1]['id']
 
 
 # ============================================================================
@@ -37,8 +226,74 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         do_POST: Handle POST requests
         do_PUT: Handle PUT requests
         do_DELETE: Handle DELETE requests
+    
+    Speaks HTTP/1.1, so clients can reuse one connection for many
+    requests. Every response therefore carries a Content-Length, and any
+    request body is consumed before responding.
     """
     
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    
+    # Headers and body go out in separate writes; with Nagle enabled the
+    # body of a keep-alive response waits for the client's delayed ACK
+    disable_nagle_algorithm = True
+    
+    def parse_request(self):
+        """
+        Reset per-request state (the handler lives as long as the connection).
+        """
+        self._request_body = None
+        self.pretty = False
+        self.cache_headers = {}
+        if not super().parse_request():
+            return False
+        
+        # ?pretty=1 asks for indented JSON (any endpoint)
+        pretty = parse_qs(urlparse(self.path).query).get('pretty', ['0'])[0]
+        self.pretty = pretty.lower() in ('1', 'true', 'yes')
+        return True
+    
+    def dumps(self, data):
+        """
+        Encode data as JSON bytes, compact or indented as requested.
+        """
+        if self.pretty:
+            text = json.dumps(data, indent=2, ensure_ascii=False, default=json_default)
+        else:
+            text = json.dumps(data, separators=COMPACT_SEPARATORS, ensure_ascii=False,
+                              default=json_default)
+        return text.encode('utf-8')
+    
+    def transaction_bytes(self, transaction, fields=None):
+        """
+        Encoded JSON of one transaction.
+        
+        Whole transactions in compact form come from the store, which may
+        cache them; projections and pretty output are encoded here.
+        """
+        if fields:
+            transaction = {name: transaction[name] for name in fields if name in transaction}
+        elif not self.pretty:
+            return store.encode(transaction)
+        return self.dumps(transaction)
+    
+    def read_body(self):
+        """
+        Read the request body once and cache it.
+        
+        Returns:
+            bytes: Request body (empty if there is none)
+        """
+        if self._request_body is None:
+            try:
+                content_length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                content_length = 0
+                self.close_connection = True
+            self._request_body = self.rfile.read(content_length) if content_length > 0 else b''
+        return self._request_body
+    
     def log_message(self, format, *args):
         """
         Override to add colored logging.
@@ -57,15 +312,23 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         
         print(f"{color}[{self.log_date_time_string()}] {format % args}{reset}")
     
-    def do_AUTHHEAD(self):
+    def do_AUTHHEAD(self, data=None):
         """
         Send authentication challenge to client.
         Called when authentication fails.
+        
+        Args:
+            data: Optional dictionary sent as the JSON error body
         """
+        payload = self.dumps(data) if data is not None else b''
+        self.read_body()
+        
         self.send_response(401)
         self.send_header('WWW-Authenticate', 'Basic realm="Transaction API"')
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
         self.end_headers()
+        self.wfile.write(payload)
     
     def check_authentication(self):
         """
@@ -74,7 +337,12 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         Basic Auth Process:
             1. Client sends: Authorization: Basic <base64(username:password)>
             2. Server decodes the base64 string
-            3. Server checks if credentials match
+            3. Server checks the password against the stored hash
+        
+        A header that has been verified (or rejected) recently is found
+        in the authenticator's cache, so steps 2-3 only run for new
+        credentials, and a client with too many recent failures is
+        rejected without them.
         
         Returns:
             bool: True if authenticated, False otherwise
@@ -83,31 +351,8 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             Basic Auth sends credentials in base64 (NOT encrypted!)
             This can be decoded easily. Always use HTTPS in production.
         """
-        auth_header = self.headers.get('Authorization')
-        
-        if auth_header is None:
-            return False
-        
-        try:
-            # Split "Basic" and the encoded credentials
-            auth_type, auth_string = auth_header.split(' ', 1)
-            
-            if auth_type.lower() != 'basic':
-                return False
-            
-            # Decode base64
-            decoded_bytes = base64.b64decode(auth_string)
-            decoded_string = decoded_bytes.decode('utf-8')
-            
-            # Split username and password
-            username, password = decoded_string.split(':', 1)
-            
-            # Verify credentials
-            return username == VALID_USERNAME and password == VALID_PASSWORD
-            
-        except Exception as e:
-            print(f"Authentication error: {e}")
-            return False
+        client = self.client_address[0] if self.client_address else None
+        return authenticator.authenticate(self.headers.get('Authorization'), client) is not None
     
     def send_json_response(self, data, status_code=200):
         """
@@ -117,13 +362,235 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             data: Dictionary or list to send as JSON
             status_code: HTTP status code (default 200)
         """
+        self.send_json_bytes(self.dumps(data), status_code)
+    
+    def send_json_bytes(self, payload, status_code=200):
+        """
+        Send an already-encoded JSON body.
+        
+        Args:
+            payload: JSON bytes
+            status_code: HTTP status code (default 200)
+        """
+        self.send_body(payload, 'application/json', status_code)
+    
+    def send_body(self, payload, content_type, status_code=200, headers=None):
+        """
+        Send a complete response body, compressed if the client accepts it
+        and it is at least COMPRESS_MIN_SIZE bytes.
+        
+        Args:
+            payload: Body bytes
+            content_type: Content-Type of the body
+            status_code: HTTP status code (default 200)
+            headers: Optional dictionary of extra headers
+        """
+        self.read_body()
+        
+        encoding = None
+        if COMPRESS_MIN_SIZE is not None and len(payload) >= COMPRESS_MIN_SIZE:
+            encoding = self.accepted_encoding()
+            if encoding:
+                payload = compress(payload, encoding)
+        
+        if status_code == 200:
+            headers = {**self.cache_headers, **(headers or {})}
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if COMPRESS_MIN_SIZE is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.send_header('Access-Control-Allow-Origin', '*')  # CORS
         self.end_headers()
         
-        response_json = json.dumps(data, indent=2, ensure_ascii=False)
-        self.wfile.write(response_json.encode('utf-8'))
+        self.wfile.write(payload)
+    
+    def accepted_encoding(self):
+        """
+        Pick the response Content-Encoding from the Accept-Encoding header.
+        
+        Returns:
+            str: 'gzip' or 'deflate' (gzip preferred at equal quality), or
+                None if the client accepts neither
+        """
+        best, best_quality = None, 0.0
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            coding, _, params = item.partition(';')
+            coding = coding.strip().lower()
+            if coding == '*':
+                coding = 'gzip'
+            if coding not in ENCODING_WBITS:
+                continue
+            
+            quality = 1.0
+            params = params.strip().lower()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    continue
+            if quality <= 0:  # q=0 means "not acceptable"
+                continue
+            if quality > best_quality or (quality == best_quality and coding == 'gzip'):
+                best, best_quality = coding, quality
+        return best
+    
+    def start_stream(self, content_type, headers=None, keep=0):
+        """
+        Send a 200 status line and headers for a body of unknown length.
+        
+        Args:
+            content_type: Content-Type of the body
+            headers: Optional dictionary of extra headers
+            keep (int): Keep a copy of the body up to this size (ChunkedWriter)
+        
+        Returns:
+            ChunkedWriter: Writer for the body (call close() when done)
+        """
+        chunked = self.request_version == self.protocol_version == 'HTTP/1.1'
+        self.read_body()
+        
+        # The size is unknown, so a stream is compressed whenever accepted
+        encoding = self.accepted_encoding() if COMPRESS_MIN_SIZE is not None else None
+        
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if COMPRESS_MIN_SIZE is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        for name, value in {**self.cache_headers, **(headers or {})}.items():
+            self.send_header(name, value)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        return ChunkedWriter(self.wfile, chunked, encoding=encoding, keep=keep)
+    
+    def set_validators(self):
+        """
+        Set the validators (ETag, Last-Modified) of a GET response.
+        
+        Only the store's version counter is read, so polling an
+        unchanged dataset costs no query and no serialization. Call this
+        before reading the data: a write racing the request can then only
+        leave the ETag older than the body, which costs the client one
+        extra download, never a missed change.
+        
+        Returns:
+            str: The response's ETag
+        """
+        self.version = store.version()
+        etag = 'W/"%s-%d"' % (INSTANCE_TAG, self.version)
+        self.cache_headers = {
+            'ETag': etag,
+            'Last-Modified': formatdate(store.modified, usegmt=True),
+            'Cache-Control': 'private, no-cache',  # Revalidate on every use
+        }
+        return etag
+    
+    def not_modified(self, etag):
+        """
+        Answer 304 if the client's If-None-Match matches `etag` (from
+        set_validators; only call this for a resource that exists).
+        
+        Returns:
+            bool: True if a 304 Not Modified response was sent
+        """
+        if not etag_matches(self.headers.get('If-None-Match'), etag):
+            return False
+        
+        self.read_body()
+        self.send_response(304)
+        for name, value in self.cache_headers.items():
+            self.send_header(name, value)
+        if COMPRESS_MIN_SIZE is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        return True
+    
+    def wants_ndjson(self, query_params):
+        """
+        True if the client asked for newline-delimited JSON, with
+        ?format=ndjson or an Accept header naming application/x-ndjson.
+        """
+        if 'format' in query_params:
+            return query_params['format'][0].lower() == 'ndjson'
+        return NDJSON_TYPE in self.headers.get('Accept', '')
+    
+    def stream_transactions(self, filters, query_params, cursor=None, fields=None,
+                            ndjson=False, cache_key=None):
+        """
+        Stream every matching transaction without holding the result set.
+        
+        JSON responses keep the usual envelope, with 'count' and
+        'next_cursor' written after the transactions (the count is only
+        known at the end). NDJSON responses are one transaction per line;
+        the store total is sent in an X-Total-Count header.
+        
+        With a `cache_key`, a body small enough for the query cache is
+        copied as it is written and cached once complete.
+        """
+        batches = iter_transaction_batches(filters, cursor)
+        batch, total = next(batches)
+        keep = query_cache.max_entry_bytes if cache_key is not None and query_cache.enabled else 0
+        
+        if ndjson:
+            content_type, headers = NDJSON_TYPE, {'X-Total-Count': str(total)}
+        else:
+            content_type, headers = 'application/json', None
+        out = self.start_stream(content_type, headers, keep)
+        if not ndjson:
+            out.write(b'{"success":true,"total":%d,"filters":%s,"transactions":[' % (
+                total, self.dumps(query_params if query_params else None)))
+        
+        count = 0
+        try:
+            while batch:
+                for transaction in batch:
+                    encoded = self.transaction_bytes(transaction, fields)
+                    if ndjson:
+                        out.write(encoded + b'\n')
+                    else:
+                        out.write(encoded if count == 0 else b',' + encoded)
+                    count += 1
+                batch, _ = next(batches, ([], total))
+        except Exception as e:
+            # Headers are gone; drop the connection so the client sees a
+            # truncated body instead of a well-formed partial one
+            print(f"Streaming error: {e}")
+            self.close_connection = True
+            return
+        
+        if not ndjson:
+            out.write(b'],"count":%d,"next_cursor":null}' % count)
+        out.close()
+        
+        body = out.body()
+        if body is not None and cache_key is not None:
+            query_cache.put(cache_key, self.version, body, content_type, headers)
+    
+    def send_listing(self, cache_key, payload, content_type, headers=None):
+        """
+        Cache a complete GET /transactions response body, then send it.
+        
+        Args:
+            cache_key: Query cache key of the request
+            payload: Body bytes (uncompressed)
+            content_type: Content-Type of the body
+            headers: Optional dictionary of extra headers
+        """
+        query_cache.put(cache_key, self.version, payload, content_type, headers)
+        self.send_body(payload, content_type, headers=headers)
     
     def parse_path(self):
         """
@@ -152,7 +619,76 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         
         return base_path, resource_id, query_params
     
-    def filter_transactions(self, transactions, query_params):
+    def parse_filters(self, query_params):
+        """
+        Convert query parameters into typed filters for the store.
+        
+        Raises:
+            ValueError: If amount_min/amount_max is not an integer
+        """
+        filters = {}
+        
+        if 'type' in query_params:
+            filters['type'] = query_params['type'][0]
+        
+        if 'amount_min' in query_params:
+            filters['amount_min'] = int(query_params['amount_min'][0])
+        
+        if 'amount_max' in query_params:
+            filters['amount_max'] = int(query_params['amount_max'][0])
+        
+        # Name filters are case-insensitive substring matches
+        if 'sender' in query_params:
+            filters['sender'] = query_params['sender'][0].lower()
+        
+        if 'recipient' in query_params:
+            filters['recipient'] = query_params['recipient'][0].lower()
+        
+        return filters
+    
+    def parse_page(self, query_params):
+        """
+        Read pagination and projection parameters.
+        
+        Supported parameters:
+            ?limit=100              At most 100 transactions per response
+            ?cursor=1234            Only transactions with id > 1234 (keyset);
+                                    pass the previous response's next_cursor
+            ?fields=id,type,amount  Only these fields of each transaction
+        
+        Returns:
+            tuple: (limit or None, cursor or None, list of fields or None)
+            
+        Raises:
+            ValueError: If a parameter is invalid (message is sent to the client)
+        """
+        limit = None
+        cursor = None
+        fields = None
+        
+        if 'limit' in query_params:
+            try:
+                limit = int(query_params['limit'][0])
+            except ValueError:
+                limit = 0
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise ValueError(f'limit must be an integer between 1 and {MAX_PAGE_SIZE}')
+        
+        if 'cursor' in query_params:
+            try:
+                cursor = int(query_params['cursor'][0])
+            except ValueError:
+                raise ValueError('cursor must be a transaction id from next_cursor') from None
+        
+        if 'fields' in query_params:
+            fields = [name.strip() for value in query_params['fields']
+                      for name in value.split(',') if name.strip()]
+            # The id is always returned; clients need it to page and fetch
+            fields = ['id'] + [name for name in fields if name != 'id']
+        
+        return limit, cursor, fields
+    
+    def filter_transactions(self, query_params):
         """
         Filter transactions based on query parameters.
         
@@ -164,41 +700,12 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             ?recipient=John
         
         Args:
-            transactions: List of transactions
             query_params: Dictionary of query parameters
             
         Returns:
             list: Filtered transactions
         """
-        filtered = transactions
-        
-        # Filter by type
-        if 'type' in query_params:
-            trans_type = query_params['type'][0]
-            filtered = [t for t in filtered if t.get('type') == trans_type]
-        
-        # Filter by amount range
-        if 'amount_min' in query_params:
-            min_amount = int(query_params['amount_min'][0])
-            filtered = [t for t in filtered if t.get('amount', 0) >= min_amount]
-        
-        if 'amount_max' in query_params:
-            max_amount = int(query_params['amount_max'][0])
-            filtered = [t for t in filtered if t.get('amount', 0) <= max_amount]
-        
-        # Filter by sender
-        if 'sender' in query_params:
-            sender = query_params['sender'][0].lower()
-            filtered = [t for t in filtered 
-                       if t.get('sender') and sender in t['sender'].lower()]
-        
-        # Filter by recipient
-        if 'recipient' in query_params:
-            recipient = query_params['recipient'][0].lower()
-            filtered = [t for t in filtered 
-                       if t.get('recipient') and recipient in t['recipient'].lower()]
-        
-        return filtered
+        return store.filter(self.parse_filters(query_params))
     
     # ========================================================================
     # HTTP METHOD HANDLERS
@@ -209,20 +716,33 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         Handle GET requests.
         
         Endpoints:
-            GET /transactions → List all (with optional filters)
+            GET /transactions → List all (with optional filters, pages
+                                 and field projection)
             GET /transactions/{id} → Get specific transaction
+            GET /stats → Query and auth cache hit/miss/eviction counters
+        
+        Transaction responses carry an ETag from the dataset version; a
+        request whose If-None-Match still matches gets 304 Not Modified.
         """
         # Check authentication
         if not self.check_authentication():
-            self.do_AUTHHEAD()
-            self.wfile.write(json.dumps({
+            self.do_AUTHHEAD({
                 'error': 'Unauthorized',
-                'message': 'Valid credentials required. Use username: admin, password: password123'
-            }).encode())
+                'message': AUTH_HINT
+            })
             return
         
         base_path, resource_id, query_params = self.parse_path()
         
+        # GET /stats - Server cache counters
+        if base_path == '/stats' and resource_id is None:
+            self.send_json_response({
+                'success': True,
+                'query_cache': query_cache.stats(),
+                'auth_cache': authenticator.stats()
+            })
+            return
+        
         # Validate endpoint
         if base_path != '/transactions':
             self.send_json_response({
@@ -231,39 +751,120 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             }, 404)
             return
         
+        # Listing parameters are validated first: a bad request gets its
+        # 400 even when the client's If-None-Match matches
+        if resource_id is None:
+            try:
+                filters = self.parse_filters(query_params)
+            except ValueError:
+                self.send_json_response({
+                    'error': 'Bad Request',
+                    'message': 'amount_min and amount_max must be integers'
+                }, 400)
+                return
+            
+            try:
+                limit, cursor, fields = self.parse_page(query_params)
+            except ValueError as e:
+                self.send_json_response({
+                    'error': 'Bad Request',
+                    'message': str(e)
+                }, 400)
+                return
+        
+        # Validators are read before the data (see set_validators)
+        etag = self.set_validators()
+        
         # GET /transactions/{id} - Get specific transaction
         if resource_id is not None:
-            transaction = next((t for t in transactions if t['id'] == resource_id), None)
+            transaction = store.get(resource_id)
             
-            if transaction:
-                self.send_json_response({
-                    'success': True,
-                    'transaction': transaction
-                })
-            else:
+            if transaction is None:
                 self.send_json_response({
                     'error': 'Not Found',
                     'message': f'Transaction with ID {resource_id} does not exist'
                 }, 404)
+            
+            # Conditional GET: nothing changed since the client's copy
+            # (only answered for a transaction that exists)
+            elif not self.not_modified(etag):
+                if self.pretty:
+                    self.send_json_response({'success': True, 'transaction': transaction})
+                else:
+                    self.send_json_bytes(json_object((
+                        ('success', b'true'),
+                        ('transaction', store.encode(transaction)),
+                    )))
         
-        # GET /transactions - List all (with optional filters)
-        else:
-            filtered = self.filter_transactions(transactions, query_params)
+        # GET /transactions - List all (with optional filters), unless the
+        # client's copy is current
+        elif not self.not_modified(etag):
+            ndjson = self.wants_ndjson(query_params)
             
-            self.send_json_response({
-                'success': True,
-                'count': len(filtered),
-                'total': len(transactions),
-                'filters': query_params if query_params else None,
-                'transactions': filtered
-            })
+            # Repeated queries are answered with the response cached for
+            # the same parameters at the current dataset version
+            cache_key = (ndjson, tuple(sorted((name, tuple(values))
+                                              for name, values in query_params.items())))
+            cached = query_cache.get(cache_key, self.version)
+            if cached is not None:
+                payload, content_type, headers = cached
+                self.send_body(payload, content_type, headers=headers)
+                return
+            
+            # Without a page size the result can be any size: stream it
+            if limit is None:
+                self.stream_transactions(filters, query_params, cursor, fields, ndjson, cache_key)
+                return
+            
+            # Matches and total come from the same snapshot, ordered by id.
+            # One extra match tells whether there is a next page.
+            filtered, total = store.query(filters, limit + 1, cursor)
+            
+            next_cursor = None
+            if len(filtered) > limit:
+                filtered = filtered[:limit]
+                next_cursor = filtered[-1]['id']
+            
+            if self.pretty and not ndjson:
+                if fields:
+                    filtered = [{name: t[name] for name in fields if name in t} for t in filtered]
+                self.send_listing(cache_key, self.dumps({
+                    'success': True,
+                    'count': len(filtered),
+                    'total': total,
+                    'filters': query_params if query_params else None,
+                    'next_cursor': next_cursor,
+                    'transactions': filtered
+                }), 'application/json')
+                return
+            
+            # Compact responses are joined from per-transaction fragments
+            encoded = [self.transaction_bytes(t, fields) for t in filtered]
+            
+            if ndjson:
+                headers = {'X-Total-Count': str(total)}
+                if next_cursor is not None:
+                    headers['X-Next-Cursor'] = str(next_cursor)
+                self.send_listing(cache_key, b''.join(line + b'\n' for line in encoded),
+                                  NDJSON_TYPE, headers)
+                return
+            
+            self.send_listing(cache_key, json_object((
+                ('success', b'true'),
+                ('count', b'%d' % len(encoded)),
+                ('total', b'%d' % total),
+                ('filters', self.dumps(query_params if query_params else None)),
+                ('next_cursor', self.dumps(next_cursor)),
+                ('transactions', b'[' + b','.join(encoded) + b']'),
+            )), 'application/json')
     
     def do_POST(self):
         """
         Handle POST requests (Create new transaction).
         
-        Endpoint:
+        Endpoints:
             POST /transactions
+            POST /transactions/bulk (see bulk_operations)
         
         Request Body:
             {
@@ -275,8 +876,12 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         """
         # Check authentication
         if not self.check_authentication():
-            self.do_AUTHHEAD()
-            self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode())
+            self.do_AUTHHEAD({'error': 'Unauthorized'})
+            return
+        
+        # POST /transactions/bulk - Many operations in one request
+        if urlparse(self.path).path.rstrip('/') == '/transactions/bulk':
+            self.bulk_operations()
             return
         
         base_path, _, _ = self.parse_path()
@@ -286,38 +891,36 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             return
         
         # Read request body
-        content_length = int(self.headers.get('Content-Length', 0))
-        if content_length == 0:
+        body = self.read_body().decode('utf-8')
+        if not body:
             self.send_json_response({
                 'error': 'Bad Request',
                 'message': 'Request body is required'
             }, 400)
             return
         
-        body = self.rfile.read(content_length).decode('utf-8')
-        
         try:
             new_transaction = json.loads(body)
-            
-            # Validate required fields
-            if 'type' not in new_transaction:
-                self.send_json_response({
-                    'error': 'Bad Request',
-                    'message': 'Field "type" is required'
-                }, 400)
-                return
-            
-            # Assign new ID
-            global next_id
-            new_transaction['id'] = next_id
-            next_id += 1
-            
+            self.check_transaction_data(new_transaction, creating=True)
+        except json.JSONDecodeError:
+            self.send_json_response({
+                'error': 'Bad Request',
+                'message': 'Invalid JSON in request body'
+            }, 400)
+            return
+        except ValueError as e:
+            self.send_json_response({
+                'error': 'Bad Request',
+                'message': str(e)
+            }, 400)
+            return
+        
+        try:
             # Add timestamp
-            from datetime import datetime
             new_transaction['created_at'] = datetime.now().isoformat()
             
-            # Add to storage
-            transactions.append(new_transaction)
+            # Add to storage (assigns the new ID)
+            new_transaction = store.create(new_transaction)
             
             self.send_json_response({
                 'success': True,
@@ -325,16 +928,182 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
                 'transaction': new_transaction
             }, 201)
             
-        except json.JSONDecodeError:
+        except sqlite3.IntegrityError:
+            self.send_constraint_error()
+        except Exception as e:
+            self.send_json_response({
+                'error': 'Internal Server Error',
+                'message': str(e)
+            }, 500)
+    
+    def bulk_operations(self):
+        """
+        Apply many creates, updates and deletes from one request.
+        
+        Endpoint:
+            POST /transactions/bulk
+        
+        Request Body (JSON array, or NDJSON with one operation per line):
+            [
+                {"op": "create", "data": {"type": "payment", "amount": 5000}},
+                {"op": "update", "id": 12, "data": {"amount": 7500}},
+                {"op": "delete", "id": 13}
+            ]
+        
+        Valid operations are applied in order by a single store call (one
+        lock acquisition or one database transaction, one version bump).
+        Every item gets its own result with an HTTP-style status; an
+        invalid item or a missing id does not stop the others.
+        """
+        body = self.read_body()
+        if not body.strip():
             self.send_json_response({
                 'error': 'Bad Request',
-                'message': 'Invalid JSON in request body'
+                'message': 'Request body is required'
             }, 400)
+            return
+        
+        try:
+            items = self.parse_bulk_body(body)
+        except ValueError:
+            self.send_json_response({
+                'error': 'Bad Request',
+                'message': 'Body must be a JSON array or NDJSON of operations'
+            }, 400)
+            return
+        
+        if len(items) > MAX_BULK_OPERATIONS:
+            self.send_json_response({
+                'error': 'Payload Too Large',
+                'message': f'At most {MAX_BULK_OPERATIONS} operations per request'
+            }, 413)
+            return
+        
+        now = datetime.now().isoformat()
+        results = [None] * len(items)
+        operations = []
+        positions = []
+        for index, item in enumerate(items):
+            try:
+                operations.append(self.parse_bulk_item(item, now))
+                positions.append(index)
+            except ValueError as e:
+                results[index] = {'index': index, 'status': 400, 'error': str(e)}
+        
+        try:
+            applied = store.bulk(operations) if operations else []
+        except sqlite3.IntegrityError:
+            self.send_constraint_error()
+            return
         except Exception as e:
             self.send_json_response({
                 'error': 'Internal Server Error',
                 'message': str(e)
             }, 500)
+            return
+        
+        for index, (op, transaction_id, _), result in zip(positions, operations, applied):
+            if result is None:
+                results[index] = {'index': index, 'op': op, 'id': transaction_id, 'status': 404,
+                                  'error': f'Transaction {transaction_id} does not exist'}
+            else:
+                results[index] = {'index': index, 'op': op, 'id': result,
+                                  'status': 201 if op == 'create' else 200}
+        
+        errors = sum(1 for result in results if result['status'] >= 400)
+        self.send_json_response({
+            'success': errors == 0,
+            'count': len(results),
+            'errors': errors,
+            'results': results
+        })
+    
+    def parse_bulk_body(self, body):
+        """
+        Split a bulk request body into items.
+        
+        Returns:
+            list: Parsed objects (JSON array) or raw lines (NDJSON, parsed
+                per item so that one bad line only fails that item)
+        
+        Raises:
+            ValueError: If the body is neither a JSON array nor text lines
+        """
+        text = body.decode('utf-8')
+        if text.lstrip().startswith('['):
+            items = json.loads(text)
+            if not isinstance(items, list):
+                raise ValueError('Expected a JSON array')
+            return items
+        return [line for line in text.splitlines() if line.strip()]
+    
+    def parse_bulk_item(self, item, now):
+        """
+        Validate one bulk item.
+        
+        Args:
+            item: Parsed object, or an NDJSON line
+            now (str): Timestamp recorded as created_at / updated_at
+        
+        Returns:
+            tuple: (op, transaction_id, data) for store.bulk()
+        
+        Raises:
+            ValueError: If the item is invalid (message goes in its result)
+        """
+        if isinstance(item, str):
+            try:
+                item = json.loads(item)
+            except json.JSONDecodeError:
+                raise ValueError('Invalid JSON')
+        if not isinstance(item, dict):
+            raise ValueError('Each operation must be a JSON object')
+        
+        op = item.get('op')
+        if op not in BULK_OPS:
+            raise ValueError('"op" must be create, update or delete')
+        
+        data = item.get('data')
+        if op != 'delete':
+            self.check_transaction_data(data, creating=op == 'create', name='"data"')
+        if op == 'create':
+            return op, None, {**data, 'created_at': now}
+        
+        transaction_id = item.get('id')
+        if not isinstance(transaction_id, int) or isinstance(transaction_id, bool):
+            raise ValueError('"id" must be an integer')
+        if op == 'update':
+            return op, transaction_id, {**data, 'updated_at': now}
+        return op, transaction_id, None
+    
+    def check_transaction_data(self, data, creating, name='Request body'):
+        """
+        Validate the fields of a transaction to create or update (POST,
+        PUT and bulk items alike).
+        
+        Args:
+            data: Parsed JSON
+            creating (bool): True for a new transaction ("type" required)
+            name (str): How the data is called in error messages
+        
+        Raises:
+            ValueError: If the data is invalid (message is sent to the client)
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f'{name} must be a JSON object')
+        if creating and 'type' not in data:
+            raise ValueError('Field "type" is required')
+        if 'type' in data and not isinstance(data['type'], str):
+            raise ValueError('Field "type" must be a string')  # NOT NULL in SQLite
+    
+    def send_constraint_error(self):
+        """
+        Answer a write the SQLite store refused with a constraint error.
+        """
+        self.send_json_response({
+            'error': 'Bad Request',
+            'message': 'Transaction violates a storage constraint'
+        }, 400)
     
     def do_PUT(self):
         """
@@ -351,8 +1120,7 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         """
         # Check authentication
         if not self.check_authentication():
-            self.do_AUTHHEAD()
-            self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode())
+            self.do_AUTHHEAD({'error': 'Unauthorized'})
             return
         
         base_path, resource_id, _ = self.parse_path()
@@ -365,9 +1133,7 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             return
         
         # Find existing transaction
-        transaction = next((t for t in transactions if t['id'] == resource_id), None)
-        
-        if not transaction:
+        if store.get(resource_id) is None:
             self.send_json_response({
                 'error': 'Not Found',
                 'message': f'Transaction {resource_id} does not exist'
@@ -375,27 +1141,42 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             return
         
         # Read update data
-        content_length = int(self.headers.get('Content-Length', 0))
-        if content_length == 0:
+        body = self.read_body().decode('utf-8')
+        if not body:
             self.send_json_response({
                 'error': 'Bad Request',
                 'message': 'Request body is required'
             }, 400)
             return
         
-        body = self.rfile.read(content_length).decode('utf-8')
-        
         try:
             update_data = json.loads(body)
-            
-            # Update fields (preserve ID)
-            for key, value in update_data.items():
-                if key != 'id':  # Never allow ID change
-                    transaction[key] = value
-            
+            self.check_transaction_data(update_data, creating=False)
+        except json.JSONDecodeError:
+            self.send_json_response({
+                'error': 'Bad Request',
+                'message': 'Invalid JSON'
+            }, 400)
+            return
+        except ValueError as e:
+            self.send_json_response({
+                'error': 'Bad Request',
+                'message': str(e)
+            }, 400)
+            return
+        
+        try:
             # Add update timestamp
-            from datetime import datetime
-            transaction['updated_at'] = datetime.now().isoformat()
+            update_data['updated_at'] = datetime.now().isoformat()
+            
+            # Update fields (the store never changes the ID)
+            transaction = store.update(resource_id, update_data)
+            if transaction is None:
+                self.send_json_response({
+                    'error': 'Not Found',
+                    'message': f'Transaction {resource_id} does not exist'
+                }, 404)
+                return
             
             self.send_json_response({
                 'success': True,
@@ -403,11 +1184,8 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
                 'transaction': transaction
             })
             
-        except json.JSONDecodeError:
-            self.send_json_response({
-                'error': 'Bad Request',
-                'message': 'Invalid JSON'
-            }, 400)
+        except sqlite3.IntegrityError:
+            self.send_constraint_error()
     
     def do_DELETE(self):
         """
@@ -418,8 +1196,7 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         """
         # Check authentication
         if not self.check_authentication():
-            self.do_AUTHHEAD()
-            self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode())
+            self.do_AUTHHEAD({'error': 'Unauthorized'})
             return
         
         base_path, resource_id, _ = self.parse_path()
@@ -432,11 +1209,7 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             return
         
         # Find and remove
-        global transactions
-        initial_count = len(transactions)
-        transactions = [t for t in transactions if t['id'] != resource_id]
-        
-        if len(transactions) < initial_count:
+        if store.delete(resource_id):
             self.send_json_response({
                 'success': True,
                 'message': f'Transaction {resource_id} deleted successfully'
@@ -455,9 +1228,61 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
 
+class SerialAPIHandler(TransactionAPIHandler):
+    """
+    TransactionAPIHandler for the single-threaded server (--workers=1).
+    
+    Answers with HTTP/1.0, which closes the connection after every
+    response as the original server did: with keep-alive, one idle
+    client would hold the only thread for up to KEEPALIVE_TIMEOUT.
+    """
+    
+    protocol_version = 'HTTP/1.0'
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that serves connections on a fixed pool of worker threads.
+    
+    Accepted connections wait in a bounded hand-off queue. When every
+    worker is busy and the queue is full, the accept loop blocks and new
+    clients wait in the kernel's listen backlog instead of spawning more
+    threads, so load never grows the thread count.
+    
+    Args:
+        server_address: (host, port) tuple
+        handler_class: Request handler class
+        workers (int): Number of worker threads
+        backlog (int): Listen backlog passed to listen()
+    """
+    
+    def __init__(self, server_address, handler_class, workers=WORKER_THREADS, backlog=LISTEN_BACKLOG):
+        self.request_queue_size = backlog
+        self._pending = queue.Queue(maxsize=workers)
+        super().__init__(server_address, handler_class)
+        
+        for n in range(workers):
+            threading.Thread(target=self._worker, name=f'api-worker-{n}', daemon=True).start()
+    
+    def process_request(self, request, client_address):
+        """Hand the connection to a worker (blocks while all are busy)."""
+        self._pending.put((request, client_address))
+    
+    def _worker(self):
+        while True:
+            request, client_address = self._pending.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+
 # ============================================================================
 # SERVER STARTUP
 # ============================================================================
@@ -477,40 +1302,23 @@ def print_banner():
     print(banner)
 
 
-def run_server(port=8000, xml_file=None):
+def print_server_info(port, storage, concurrency):
     """
-    Initialize and start the API server.
+    Print address, endpoints and credentials once the store is ready.
     
     Args:
-        port (int): Port number to run server on
-        xml_file (str): Path to XML file with transaction data
+        port (int): Port the server listens on
+        storage (str): 'sqlite' or 'memory'
+        concurrency (str): How connections are served, e.g. "16 threads"
     """
-    global transactions, next_id
-    
-    print_banner()
-    
-    # Load data from XML if provided
-    if xml_file and os.path.exists(xml_file):
-        print(f"Loading data from: {xml_file}")
-        transactions = parse_xml_to_json(xml_file)
-        next_id = len(transactions) + 1
-        print(f"Loaded {len(transactions)} transactions\n")
-    else:
-        print("No XML file provided. Starting with empty database.\n")
-        transactions = []
-        next_id = 1
-    
-    # Server configuration
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, TransactionAPIHandler)
-    
-    # Print server information
     print("="*65)
     print("SERVER INFORMATION")
     print("="*65)
     print(f"   Address:        http://localhost:{port}")
     print(f"   Status:         Running")
-    print(f"   Transactions:   {len(transactions)}")
+    print(f"   Storage:        {storage}")
+    print(f"   Concurrency:    {concurrency}")
+    print(f"   Transactions:   {store.count()}")
     print("="*65)
     print("\nAVAILABLE ENDPOINTS")
     print("="*65)
@@ -519,17 +1327,115 @@ def run_server(port=8000, xml_file=None):
     print("   POST   /transactions          Create new transaction")
     print("   PUT    /transactions/{id}     Update transaction")
     print("   DELETE /transactions/{id}     Delete transaction")
+    print("   POST   /transactions/bulk     Bulk create/update/delete")
+    print("   GET    /stats                 Cache statistics")
     print("="*65)
     print("\nAUTHENTICATION")
     print("="*65)
-    print(f"   Username:  {VALID_USERNAME}")
-    print(f"   Password:  {VALID_PASSWORD}")
+    if DEFAULT_CREDENTIALS:
+        print(f"   Username:  {DEFAULT_USERNAME}")
+        print(f"   Password:  {DEFAULT_PASSWORD}")
+        print("   (development account; set API_USERS or API_USERS_FILE)")
+        example = f"{DEFAULT_USERNAME}:{DEFAULT_PASSWORD}"
+    else:
+        print(f"   Users:     {', '.join(sorted(USERS))} (hashed, from configuration)")
+        example = f"{min(USERS)}:PASSWORD"
     print("="*65)
     print("\nEXAMPLE USAGE")
     print("="*65)
-    print(f"   curl -u {VALID_USERNAME}:{VALID_PASSWORD} http://localhost:{port}/transactions")
+    print(f"   curl -u {example} http://localhost:{port}/transactions")
     print("="*65)
     print("\nPress Ctrl+C to stop the server\n")
+
+
+def create_store(storage='sqlite', xml_file=None, db_path=etl_config.DB_PATH,
+                 snapshot_path=None):
+    """
+    Build the transaction store the server will use.
+    
+    Args:
+        storage (str): 'sqlite' (persistent, default) or 'memory'
+        xml_file (str): Optional XML backup to import at startup
+        db_path (str): SQLite database path (sqlite storage only)
+        snapshot_path (str): Parsed-dataset snapshot used instead of
+            re-parsing the XML while it is current (memory storage only;
+            None = always parse)
+        
+    Returns:
+        SQLiteTransactionStore or MemoryTransactionStore
+    """
+    has_xml = xml_file and os.path.exists(xml_file)
+    
+    if storage == 'memory':
+        # Load data from XML if provided
+        if has_xml:
+            print(f"Loading data from: {xml_file}")
+            transactions, from_snapshot = load_transactions(xml_file, snapshot_path)
+            if from_snapshot:
+                print(f"Read snapshot: {snapshot_path}")
+            memory_store = MemoryTransactionStore(transactions)
+            print(f"Loaded {memory_store.count()} transactions\n")
+            return memory_store
+        print("No XML file provided. Starting with empty database.\n")
+        return MemoryTransactionStore()
+    
+    # Incremental ETL: only messages newer than the last import are parsed
+    if has_xml:
+        print(f"Importing new messages from: {xml_file}")
+        summary = run_pipeline(xml_file, db_path)
+        print(f"Imported {summary['stages']['load']['records']} new/updated transactions")
+    
+    sqlite_store = SQLiteTransactionStore(db_path)
+    print(f"Using SQLite database: {db_path}\n")
+    return sqlite_store
+
+
+def create_server(server_address, workers=WORKER_THREADS, backlog=LISTEN_BACKLOG):
+    """
+    Create the HTTP server for run_server().
+    
+    Args:
+        server_address: (host, port) tuple
+        workers (int): Worker threads; 1 gives the original single-threaded
+            server (one request per connection)
+        backlog (int): Listen backlog for pending connections
+    
+    Returns:
+        HTTPServer: The server (not yet serving)
+    """
+    if workers > 1:
+        return PooledHTTPServer(server_address, TransactionAPIHandler, workers, backlog)
+    return HTTPServer(server_address, SerialAPIHandler)
+
+
+def run_server(port=8000, xml_file=None, storage='sqlite', db_path=etl_config.DB_PATH,
+               workers=WORKER_THREADS, backlog=LISTEN_BACKLOG, compress_min=COMPRESS_MIN_SIZE,
+               snapshot_path=None):
+    """
+    Initialize and start the API server.
+    
+    Args:
+        port (int): Port number to run server on
+        xml_file (str): Path to XML file with transaction data
+        storage (str): 'sqlite' (persistent, default) or 'memory'
+        db_path (str): SQLite database path
+        workers (int): Worker threads (1 = original single-threaded server)
+        backlog (int): Listen backlog for pending connections
+        compress_min (int): Smallest body compressed (None = never compress)
+        snapshot_path (str): Dataset snapshot for --memory (None = always parse the XML)
+    """
+    global store, COMPRESS_MIN_SIZE
+    
+    print_banner()
+    
+    COMPRESS_MIN_SIZE = compress_min
+    
+    store = create_store(storage, xml_file, db_path, snapshot_path)
+    
+    # Server configuration
+    httpd = create_server(('', port), workers, backlog)
+    
+    print_server_info(port, storage, f"{workers} threads (backlog {backlog})")
     
     # Start serving
     try:
@@ -537,22 +1443,72 @@ def run_server(port=8000, xml_file=None):
     except KeyboardInterrupt:
         print("\n\nShutting down server...")
         httpd.shutdown()
+        store.close()
         print("Server stopped successfully\n")
 
 
-if __name__ == '__main__':
-    # Get XML file path from command line arguments
-    xml_path = None
-    port = 8000
+def parse_command_line(argv):
+    """
+    Parse server command-line arguments.
+    
+    Usage: [xml_file] [port] [--memory] [--db=PATH] [--workers=N] [--backlog=N]
+           [--compress-min=BYTES] [--no-compress] [--snapshot[=PATH]] [--no-snapshot]
+    
+    The snapshot is off unless --snapshot (or ETL_SNAPSHOT=1) enables it;
+    --no-snapshot turns it off again.
     
-    if len(sys.argv) > 1:
-        xml_path = sys.argv[1]
+    Args:
+        argv (list): Arguments without the program name
+        
+    Returns:
+        dict: Keyword arguments for run_server()
+    """
+    options = [arg for arg in argv if arg.startswith('--')]
+    args = [arg for arg in argv if not arg.startswith('--')]
     
-    if len(sys.argv) > 2:
+    settings = {
+        'xml_file': None,
+        'port': 8000,
+        'storage': 'memory' if '--memory' in options else 'sqlite',
+        'db_path': etl_config.DB_PATH,
+        'workers': WORKER_THREADS,
+        'backlog': LISTEN_BACKLOG,
+        'compress_min': None if '--no-compress' in options else COMPRESS_MIN_SIZE,
+        'snapshot_path': etl_config.SNAPSHOT_PATH if etl_config.SNAPSHOT else None,
+    }
+    
+    for option in options:
+        if option.startswith('--db='):
+            settings['db_path'] = option.split('=', 1)[1]
+        elif option.startswith('--workers='):
+            settings['workers'] = int(option.split('=', 1)[1])
+        elif option.startswith('--backlog='):
+            settings['backlog'] = int(option.split('=', 1)[1])
+        elif option.startswith('--compress-min=') and settings['compress_min'] is not None:
+            settings['compress_min'] = int(option.split('=', 1)[1])
+        elif option == '--snapshot':
+            settings['snapshot_path'] = etl_config.SNAPSHOT_PATH
+        elif option.startswith('--snapshot='):
+            settings['snapshot_path'] = option.split('=', 1)[1]
+    
+    if '--no-snapshot' in options:
+        settings['snapshot_path'] = None
+    
+    if len(args) > 0:
+        settings['xml_file'] = args[0]
+    
+    if len(args) > 1:
         try:
-            port = int(sys.argv[2])
+            settings['port'] = int(args[1])
         except ValueError:
             print("Invalid port number. Using default port 8000.")
     
-    run_server(port=port, xml_file=xml_path)
+    return settings
+
 
+if __name__ == '__main__':
+    # Usage: python rest_api_server.py [xml_file] [port] [--memory] [--db=PATH]
+    #                                  [--workers=N] [--backlog=N]
+    #                                  [--compress-min=BYTES] [--no-compress]
+    #                                  [--snapshot[=PATH]] [--no-snapshot]
+    run_server(**parse_command_line(sys.argv[1:]))
@@ -0,0 +1,196 @@
+"""
+REST API Load Test
+==================
+
+Starts the API server in a subprocess and drives it with many concurrent
+clients for a fixed duration, reporting requests per second and latency
+percentiles. Four configurations are compared:
+
+    single      original single-threaded server, new connection per request
+    pooled      worker-pool server, new connection per request
+    keep-alive  worker-pool server, one persistent connection per client
+    asyncio     api/async_server.py, one persistent connection per client
+
+With more clients than worker threads the thread-pool server leaves the
+extra keep-alive clients waiting in the backlog, while the asyncio server
+keeps every connection open; try e.g. 1000 clients.
+
+Usage:
+    python bench_api_load.py [xml_file] [clients] [seconds] [--memory]
+
+Example:
+    python bench_api_load.py ../modified_sms_v2.xml 32 10
+"""
+
+import base64
+import http.client
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+SERVER_SCRIPT = os.path.join(API_DIR, 'rest_api_server.py')
+ASYNC_SERVER_SCRIPT = os.path.join(API_DIR, 'async_server.py')
+AUTH_HEADER = {'Authorization': 'Basic ' + base64.b64encode(b'admin:password123').decode()}
+
+# (path, weight) request mix: mostly single-record reads, some filtered lists
+REQUEST_MIX = (
+    ('/transactions/{id}', 9),
+    ('/transactions?type=airtime', 1),
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('localhost', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def client_loop(port, keep_alive, deadline, max_id, latencies):
+    """
+    Send requests until the deadline, appending each latency (seconds).
+    """
+    paths = [path for path, weight in REQUEST_MIX for _ in range(weight)]
+    headers = dict(AUTH_HEADER)
+    if not keep_alive:
+        headers['Connection'] = 'close'
+
+    conn = None
+    while time.perf_counter() < deadline:
+        path = random.choice(paths).format(id=random.randint(1, max_id))
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('localhost', port, timeout=30)
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            if conn is not None:
+                conn.close()
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - start)
+
+        if not keep_alive or response.will_close:
+            conn.close()
+            conn = None
+
+    if conn is not None:
+        conn.close()
+
+
+def client_process(args):
+    """
+    Run `threads` client loops in one process (spreads load beyond one GIL).
+    """
+    port, keep_alive, seconds, max_id, threads = args
+    deadline = time.perf_counter() + seconds
+    latencies = []
+    workers = [
+        threading.Thread(target=client_loop, args=(port, keep_alive, deadline, max_id, latencies))
+        for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies
+
+
+def run_load(port, clients, seconds, keep_alive, max_id):
+    """
+    Drive the server with `clients` concurrent connections.
+
+    Returns:
+        list: Latency of every completed request (seconds)
+    """
+    processes = max(1, min(clients, os.cpu_count() or 1))
+    per_process = [clients // processes + (1 if n < clients % processes else 0)
+                   for n in range(processes)]
+
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(client_process, [
+            (port, keep_alive, seconds, max_id, threads) for threads in per_process
+        ])
+    return [latency for result in results for latency in result]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_benchmark(xml_file, clients, seconds, storage):
+    """
+    Measure every server configuration and print a comparison table.
+    """
+    configurations = (
+        ('single', SERVER_SCRIPT, 1, False),
+        ('pooled', SERVER_SCRIPT, 16, False),
+        ('keep-alive', SERVER_SCRIPT, 16, True),
+        ('asyncio', ASYNC_SERVER_SCRIPT, 4, True),
+    )
+
+    print("\n" + "="*70)
+    print("REST API LOAD TEST")
+    print("="*70)
+    print(f"Clients: {clients}   Duration: {seconds}s   Storage: {storage}")
+    print("-"*70)
+    print(f"  {'Mode':<11} {'Requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, script, workers, keep_alive in configurations:
+            port = free_port()
+            command = [sys.executable, script, xml_file, str(port),
+                       f'--workers={workers}', f"--db={os.path.join(tmp, 'bench.sqlite3')}"]
+            if storage == 'memory':
+                command.append('--memory')
+
+            server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_for_port(port)
+                latencies = sorted(run_load(port, clients, seconds, keep_alive, max_id=1500))
+            finally:
+                server.terminate()
+                server.wait()
+
+            count = len(latencies)
+            print(f"  {label:<11} {count:>9,} {count / seconds:>9,.0f} "
+                  f"{statistics.median(latencies) * 1000 if latencies else 0:>8.2f} "
+                  f"{percentile(latencies, 0.99) * 1000:>8.2f} "
+                  f"{(latencies[-1] if latencies else 0) * 1000:>8.2f}")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    xml_path = os.path.abspath(args[0]) if len(args) > 0 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    client_count = int(args[1]) if len(args) > 1 else 32
+    duration = float(args[2]) if len(args) > 2 else 10
+
+    run_benchmark(xml_path, client_count, duration, 'memory' if '--memory' in options else 'sqlite')
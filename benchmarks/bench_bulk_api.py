@@ -0,0 +1,136 @@
+"""
+Bulk Write Benchmark
+====================
+
+Compares write throughput over HTTP for one request per record (POST,
+PUT and DELETE on /transactions) against POST /transactions/bulk with
+batches of operations, for both storage backends. The server runs in a
+subprocess and is driven over one keep-alive connection.
+
+Usage:
+    python bench_bulk_api.py [xml_file] [single_ops] [bulk_ops] [batch_size]
+
+Example:
+    python bench_bulk_api.py ../modified_sms_v2.xml 1000 100000 1000
+"""
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_api_load import AUTH_HEADER, SERVER_SCRIPT, free_port, wait_for_port
+
+HEADERS = dict(AUTH_HEADER, **{'Content-Type': 'application/json'})
+
+
+def new_record(n):
+    return {'type': 'payment', 'amount': 1000 + n, 'recipient': f'Bulk Client {n % 100}'}
+
+
+def request(conn, method, path, body=None):
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=HEADERS)
+    response = conn.getresponse()
+    data = response.read()
+    if response.status >= 300:
+        raise RuntimeError(f"{method} {path} -> {response.status}: {data[:200]!r}")
+    return json.loads(data)
+
+
+def single_requests(conn, count):
+    """Create, update and delete `count` records, one request each."""
+    timings = {}
+
+    start = time.perf_counter()
+    ids = [request(conn, 'POST', '/transactions', new_record(n))['transaction']['id']
+           for n in range(count)]
+    timings['create'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for transaction_id in ids:
+        request(conn, 'PUT', f'/transactions/{transaction_id}', {'amount': 1})
+    timings['update'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for transaction_id in ids:
+        request(conn, 'DELETE', f'/transactions/{transaction_id}')
+    timings['delete'] = time.perf_counter() - start
+    return timings
+
+
+def bulk_requests(conn, count, batch_size):
+    """Create, update and delete `count` records with bulk requests."""
+    def run(operations):
+        results = []
+        for i in range(0, len(operations), batch_size):
+            response = request(conn, 'POST', '/transactions/bulk', operations[i:i + batch_size])
+            if response['errors']:
+                raise RuntimeError(f"{response['errors']} bulk items failed")
+            results.extend(response['results'])
+        return results
+
+    timings = {}
+
+    start = time.perf_counter()
+    ids = [result['id'] for result in run([{'op': 'create', 'data': new_record(n)}
+                                           for n in range(count)])]
+    timings['create'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run([{'op': 'update', 'id': transaction_id, 'data': {'amount': 1}} for transaction_id in ids])
+    timings['update'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run([{'op': 'delete', 'id': transaction_id} for transaction_id in ids])
+    timings['delete'] = time.perf_counter() - start
+    return timings
+
+
+def run_benchmark(xml_file, single_ops, bulk_ops, batch_size):
+    print("\n" + "="*70)
+    print("BULK WRITE BENCHMARK")
+    print("="*70)
+    print(f"single: {single_ops} requests per operation   bulk: {bulk_ops} operations "
+          f"in batches of {batch_size}")
+    print("-"*70)
+    print(f"  {'Storage':<8} {'Operation':<10} {'single ops/s':>13} {'bulk ops/s':>12} {'Speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for storage in ('sqlite', 'memory'):
+            port = free_port()
+            command = [sys.executable, SERVER_SCRIPT, xml_file, str(port),
+                       f"--db={os.path.join(tmp, 'bench.sqlite3')}"]
+            if storage == 'memory':
+                command.append('--memory')
+
+            server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_for_port(port)
+                conn = http.client.HTTPConnection('localhost', port, timeout=300)
+                single = single_requests(conn, single_ops)
+                bulk = bulk_requests(conn, bulk_ops, batch_size)
+                conn.close()
+            finally:
+                server.terminate()
+                server.wait()
+
+            for operation in ('create', 'update', 'delete'):
+                single_rate = single_ops / single[operation]
+                bulk_rate = bulk_ops / bulk[operation]
+                print(f"  {storage:<8} {operation:<10} {single_rate:>13,.0f} {bulk_rate:>12,.0f} "
+                      f"{bulk_rate / single_rate:>8.0f}x")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    single_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    bulk_count = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+    batch = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+
+    run_benchmark(xml_path, single_count, bulk_count, batch)
@@ -0,0 +1,76 @@
+"""
+SQLite Bulk Load Benchmark
+==========================
+
+Times etl.load_db.load() for a large number of rows built from the
+messages of an SMS backup, then times a second (idempotent) run over
+the same rows to measure the upsert path.
+
+Usage:
+    python bench_bulk_load.py [xml_file] [rows]
+
+Example:
+    python bench_bulk_load.py ../modified_sms_v2.xml 1000000
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import iter_transactions
+from etl.clean_narmalize import normalize_transaction
+from etl.load_db import load
+
+
+def synthetic_rows(templates, rows):
+    """
+    Yield `rows` normalized transactions with distinct upsert keys.
+
+    Args:
+        templates (list): Normalized transactions to cycle through
+        rows (int): Number of transactions to produce
+    """
+    for n in range(rows):
+        record = dict(templates[n % len(templates)])
+        copy = n // len(templates)
+        if copy:
+            record['timestamp'] = (record['timestamp'] or 0) + copy
+            if record['transaction_id']:
+                record['transaction_id'] = f"{record['transaction_id']}-{copy}"
+        yield record
+
+
+def run_benchmark(xml_file, rows):
+    """
+    Load `rows` transactions into a fresh database twice and report timings.
+    """
+    templates = [normalize_transaction(t) for t in iter_transactions(xml_file)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.sqlite3')
+
+        print("\n" + "="*70)
+        print("SQLITE BULK LOAD BENCHMARK")
+        print("="*70)
+        print(f"Rows:  {rows:,} (built from {len(templates)} messages in {xml_file})")
+        print("-"*70)
+
+        for label in ('Initial load', 'Re-run (upsert)'):
+            start = time.perf_counter()
+            written = load(synthetic_rows(templates, rows), db_path)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<16} {written:>10,} rows  {elapsed:>7.2f}s  {written / elapsed:>12,.0f} rows/s")
+
+        print(f"  Database size:   {os.path.getsize(db_path) / 1e6:>10.1f} MB")
+        print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(__file__), '..', 'modified_sms_v2.xml')
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    run_benchmark(xml_path, row_count)
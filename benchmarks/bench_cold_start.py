@@ -0,0 +1,82 @@
+"""
+Cold Start Benchmark
+====================
+
+Measures how long the API server's memory store (--memory) takes to
+start on backups of several sizes:
+
+    xml         parse the XML backup (no snapshot), the original startup
+    first       parse the XML and write the dataset snapshot
+    snapshot    read the snapshot written by "first"
+
+Each time covers api.rest_api_server.create_store(), i.e. everything
+before the server accepts connections, including building the store's
+indexes. Backups are built with synthetic.py by repeating the source
+messages `factor` times.
+
+Usage:
+    python bench_cold_start.py [xml_file] [factors]
+
+Example:
+    python bench_cold_start.py ../modified_sms_v2.xml 1,60,600
+"""
+
+import contextlib
+import io
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from synthetic import expand_backup
+
+
+def start(xml_file, snapshot_path):
+    """Return (seconds, store) for one memory store startup."""
+    begin = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # loader progress lines
+        store = api_server.create_store('memory', xml_file, snapshot_path=snapshot_path)
+    return time.perf_counter() - begin, store
+
+
+def run_benchmark(xml_file, factors):
+    print("\n" + "="*72)
+    print("COLD START BENCHMARK")
+    print("="*72)
+    print(f"  {'Records':>10} {'XML MB':>8} {'Snap MB':>8} {'xml s':>8} {'first s':>8} "
+          f"{'snapshot s':>11} {'Speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for factor in factors:
+            backup = os.path.join(tmp, f'sms_x{factor}.xml')
+            snapshot = os.path.join(tmp, f'sms_x{factor}.snapshot')
+            expand_backup(xml_file, backup, factor)
+
+            parse_seconds, store = start(backup, None)
+            count = store.count()
+            del store
+            first_seconds, store = start(backup, snapshot)
+            del store
+            snapshot_seconds, store = start(backup, snapshot)
+            if store.count() != count:
+                raise RuntimeError("Snapshot returned a different number of records")
+            del store
+
+            print(f"  {count:>10,} {os.path.getsize(backup) / 1e6:>8.1f} "
+                  f"{os.path.getsize(snapshot) / 1e6:>8.1f} {parse_seconds:>8.2f} "
+                  f"{first_seconds:>8.2f} {snapshot_seconds:>11.2f} "
+                  f"{parse_seconds / snapshot_seconds:>7.1f}x")
+            os.remove(backup)
+
+    print("="*72 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    factor_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 60, 600]
+
+    run_benchmark(xml_path, factor_list)
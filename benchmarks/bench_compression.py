@@ -0,0 +1,110 @@
+"""
+Response Compression Benchmark
+==============================
+
+Measures GET /transactions response size and latency with compression
+off (identity) and on (gzip / deflate, Accept-Encoding negotiated), for
+the whole dataset loaded into the memory store:
+
+    page        ?limit=1000, sent with Content-Length
+    listing     full listing, streamed with chunked encoding
+    ndjson      full listing as NDJSON, streamed
+
+Requests run through TransactionAPIHandler in-process, so "server ms"
+is the time to produce (and compress) the response. "At N Mbit/s" adds
+the time needed to send those bytes over a link of that speed.
+
+Usage:
+    python bench_compression.py [xml_file] [repeats]
+
+Example:
+    python bench_compression.py ../modified_sms_v2.xml 10
+"""
+
+import base64
+import contextlib
+import io
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from api.async_server import BufferedRequestHandler
+from api.db import MemoryTransactionStore
+from api.query_cache import QueryCache
+from dsa.xml_parser import iter_transactions
+from bench_streaming import CountingSink
+
+# Measure encoding, not the response cache
+api_server.query_cache = QueryCache(max_entries=0)
+
+AUTHORIZATION = 'Basic ' + base64.b64encode(b'admin:password123').decode()
+
+REQUESTS = (
+    ('page', '/transactions?limit=1000'),
+    ('listing', '/transactions'),
+    ('ndjson', '/transactions?format=ndjson'),
+)
+
+MODES = (
+    # label, Accept-Encoding, zlib level
+    ('identity', None, None),
+    ('gzip-1', 'gzip', 1),
+    ('gzip-6', 'gzip', 6),
+    ('deflate-6', 'deflate', 6),
+)
+
+LINK_SPEEDS = (10, 100)  # Mbit/s
+
+
+def get(path, accept_encoding):
+    """Run GET `path` through the API handler and return the bytes sent."""
+    headers = f'Accept-Encoding: {accept_encoding}\r\n' if accept_encoding else ''
+    request = f'GET {path} HTTP/1.1\r\nAuthorization: {AUTHORIZATION}\r\n{headers}\r\n'.encode()
+    sink = CountingSink()
+    with contextlib.redirect_stdout(io.StringIO()):  # request log line
+        BufferedRequestHandler(request, ('127.0.0.1', 0), sink)
+    return sink.bytes
+
+
+def run_benchmark(xml_file, repeats):
+    api_server.store = MemoryTransactionStore(list(iter_transactions(xml_file)))
+    original_level = api_server.COMPRESS_LEVEL
+
+    print("\n" + "="*78)
+    print("RESPONSE COMPRESSION BENCHMARK")
+    print("="*78)
+    print(f"{api_server.store.count():,} transactions, memory store, best of {repeats} runs")
+    print("-"*78)
+    speeds = ''.join(f"{f'@{mbit} Mbit ms':>14}" for mbit in LINK_SPEEDS)
+    print(f"  {'Request':<9} {'Mode':<10} {'KB':>9} {'Ratio':>7} {'Server ms':>10}{speeds}")
+
+    for request, path in REQUESTS:
+        identity = None
+        for label, encoding, level in MODES:
+            api_server.COMPRESS_LEVEL = level or original_level
+            size = get(path, encoding)  # Warm-up (fills the record cache)
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                get(path, encoding)
+                best = min(best, time.perf_counter() - start)
+
+            identity = identity or size
+            transfer = ''.join(f"{(best + size * 8 / (mbit * 1e6)) * 1000:>14.1f}"
+                               for mbit in LINK_SPEEDS)
+            print(f"  {request:<9} {label:<10} {size / 1024:>9.1f} {identity / size:>6.1f}x "
+                  f"{best * 1000:>10.1f}{transfer}")
+
+    api_server.COMPRESS_LEVEL = original_level
+    print("="*78 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    repeat_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    run_benchmark(xml_path, repeat_count)
@@ -0,0 +1,114 @@
+"""
+Memory Store Filter Benchmark
+=============================
+
+Measures GET /transactions filter latency in api.db.MemoryTransactionStore
+(secondary indexes) against the original implementation, which made one
+list comprehension pass over all transactions per query parameter.
+
+Usage:
+    python bench_filters.py [xml_file] [sizes]
+
+Example:
+    python bench_filters.py ../modified_sms_v2.xml 100000,1000000
+"""
+
+import statistics
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api.db import MemoryTransactionStore, _is_number
+from dsa.xml_parser import iter_transactions
+from bench_store_ops import build_records
+
+# (label, filters) as produced by TransactionAPIHandler.parse_filters
+QUERIES = (
+    ('type', {'type': 'airtime'}),
+    ('amount range', {'amount_min': 90000, 'amount_max': 100000}),
+    ('type + amount', {'type': 'payment', 'amount_min': 1000, 'amount_max': 5000}),
+    ('sender', {'sender': 'jane'}),
+    ('four filters', {'type': 'received', 'amount_min': 1000, 'amount_max': 50000,
+                      'sender': 'smith'}),
+)
+
+
+def scan_filter(transactions, filters):
+    """
+    The original filter: one full pass per query parameter.
+    """
+    filtered = transactions
+
+    if 'type' in filters:
+        filtered = [t for t in filtered if t.get('type') == filters['type']]
+
+    if 'amount_min' in filters:
+        filtered = [t for t in filtered
+                    if _is_number(t.get('amount')) and t['amount'] >= filters['amount_min']]
+
+    if 'amount_max' in filters:
+        filtered = [t for t in filtered
+                    if _is_number(t.get('amount')) and t['amount'] <= filters['amount_max']]
+
+    if 'sender' in filters:
+        filtered = [t for t in filtered
+                    if t.get('sender') and filters['sender'] in t['sender'].lower()]
+
+    if 'recipient' in filters:
+        filtered = [t for t in filtered
+                    if t.get('recipient') and filters['recipient'] in t['recipient'].lower()]
+
+    return list(filtered)
+
+
+def median_ms(function, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000, len(result)
+
+
+def run_benchmark(xml_file, sizes, repeat=5):
+    """
+    Print median filter latency for the scan and the indexed store.
+    """
+    templates = list(iter_transactions(xml_file))
+
+    print("\n" + "="*70)
+    print("MEMORY STORE FILTER BENCHMARK")
+    print("="*70)
+    print(f"Templates: {len(templates)} transactions from {xml_file}")
+    print("Median latency per query (milliseconds)")
+    print("-"*70)
+    print(f"  {'Records':>10} {'Query':<15} {'Matches':>9} {'Scan':>10} {'Indexed':>10} {'Speedup':>8}")
+
+    for size in sizes:
+        records = build_records(templates, size)
+
+        start = time.perf_counter()
+        store = MemoryTransactionStore(records)
+        build_seconds = time.perf_counter() - start
+
+        for label, filters in QUERIES:
+            scan_ms, expected = median_ms(lambda: scan_filter(records, filters), repeat)
+            indexed_ms, matches = median_ms(lambda: store.filter(filters), repeat)
+            if matches != expected:
+                raise AssertionError(f"{label}: indexed {matches} != scan {expected}")
+            print(f"  {size:>10,} {label:<15} {matches:>9,} {scan_ms:>10.2f} "
+                  f"{indexed_ms:>10.2f} {scan_ms / indexed_ms:>7.1f}x")
+
+        print(f"  {size:>10,} {'(index build)':<15} {'':>9} {'':>10} {build_seconds * 1000:>10.0f}")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [100000, 1000000]
+
+    run_benchmark(xml_path, size_list)
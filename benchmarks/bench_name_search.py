@@ -0,0 +1,133 @@
+"""
+Name Substring Search Benchmark
+===============================
+
+Measures ?sender= substring queries with and without the name indexes:
+
+    memory  scan      original filter: `in` check on every transaction
+    memory  indexed   MemoryTransactionStore n-gram name index
+    sqlite  scan      instr(lower(sender), ?) over every row
+    sqlite  indexed   FTS5 trigram table (transaction_names) narrows rows first
+
+The sample backup names only a few hundred people, so records get
+generated names with about one distinct name per ten transactions.
+
+Usage:
+    python bench_name_search.py [sizes] [--no-sqlite]
+
+Example:
+    python bench_name_search.py 100000,1000000
+"""
+
+import random
+import statistics
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api.db import MemoryTransactionStore, SQLiteTransactionStore
+from etl.load_db import load
+
+SYLLABLES = ('ka', 'mu', 'ne', 'zi', 'ro', 'ba', 'te', 'li', 'sa', 'go', 'vi', 'da',
+             'ha', 'jo', 'ki', 'ma', 'nu', 'pe', 'ri', 'so', 'tu', 'wa', 'ye', 'fi')
+
+
+def make_names(count, rng):
+    """Return `count` distinct 'First Last' names built from syllables."""
+    names = set()
+    while len(names) < count:
+        first = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+        last = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 4)))
+        names.add(f"{first.title()} {last.title()}")
+    return sorted(names)
+
+
+def make_transactions(size, seed=0):
+    rng = random.Random(seed)
+    names = make_names(max(1, size // 10), rng)
+    return [{
+        'id': n + 1,
+        'transaction_id': str(10_000_000 + n),
+        'type': 'received',
+        'amount': rng.randint(100, 100000),
+        'sender': rng.choice(names),
+        'timestamp': 1715351458724 + n,
+        'raw_message': '',
+    } for n in range(size)], names
+
+
+def scan(transactions, substring):
+    """The original sender filter."""
+    return [t for t in transactions if t.get('sender') and substring in t['sender'].lower()]
+
+
+def median_ms(function, repeat=5):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000, len(result)
+
+
+def queries(names):
+    """(label, substring) pairs: a whole name, part of a surname, a short fragment."""
+    sample = names[len(names) // 2].lower()
+    surname = sample.split()[1]
+    return (
+        ('full name', sample),
+        ('surname part', surname[1:6]),
+        ('3 chars', surname[:3]),
+    )
+
+
+def run_benchmark(sizes, with_sqlite=True):
+    print("\n" + "="*70)
+    print("NAME SUBSTRING SEARCH BENCHMARK")
+    print("="*70)
+    print("Median latency per ?sender= query (milliseconds)")
+    print("-"*70)
+    print(f"  {'Records':>10} {'Store':<7} {'Query':<13} {'Matches':>8} {'Scan':>9} {'Indexed':>9} {'Speedup':>8}")
+
+    for size in sizes:
+        transactions, names = make_transactions(size)
+        memory = MemoryTransactionStore(transactions)
+
+        for label, substring in queries(names):
+            scan_ms, expected = median_ms(lambda: scan(transactions, substring))
+            indexed_ms, matches = median_ms(lambda: memory.filter({'sender': substring}))
+            assert matches == expected, (label, matches, expected)
+            print(f"  {size:>10,} {'memory':<7} {label:<13} {matches:>8,} {scan_ms:>9.2f} "
+                  f"{indexed_ms:>9.2f} {scan_ms / indexed_ms:>7.1f}x")
+
+        if not with_sqlite:
+            continue
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.sqlite3')
+            load(transactions, db_path)
+            store = SQLiteTransactionStore(db_path)
+            try:
+                for label, substring in queries(names):
+                    store.name_index = False
+                    scan_ms, expected = median_ms(lambda: store.filter({'sender': substring}))
+                    store.name_index = True
+                    indexed_ms, matches = median_ms(lambda: store.filter({'sender': substring}))
+                    assert matches == expected, (label, matches, expected)
+                    print(f"  {size:>10,} {'sqlite':<7} {label:<13} {matches:>8,} {scan_ms:>9.2f} "
+                          f"{indexed_ms:>9.2f} {scan_ms / indexed_ms:>7.1f}x")
+            finally:
+                store.close()
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    size_list = [int(n) for n in args[0].split(',')] if args else [100000, 1000000]
+    run_benchmark(size_list, with_sqlite='--no-sqlite' not in options)
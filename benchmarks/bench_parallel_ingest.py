@@ -0,0 +1,83 @@
+"""
+Parallel Ingestion Scaling Benchmark
+====================================
+
+Measures iter_transactions_parallel() throughput for 1..N worker
+processes on a synthetically expanded copy of the SMS backup.
+
+Usage:
+    python bench_parallel_ingest.py [xml_file] [max_workers] [factor] [chunk_size]
+
+Example:
+    python bench_parallel_ingest.py ../modified_sms_v2.xml 8 50 2000
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import iter_transactions_parallel, DEFAULT_CHUNK_SIZE
+from benchmarks.synthetic import expand_backup
+
+
+def worker_counts(max_workers):
+    """
+    Powers of two up to max_workers, always including max_workers itself.
+    """
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run_benchmark(xml_file, max_workers, factor, chunk_size):
+    """
+    Time a full parse of the expanded backup for each worker count.
+
+    Args:
+        xml_file (str): Path to the original XML backup
+        max_workers (int): Largest pool size to test
+        factor (int): Expansion factor for the synthetic backup
+        chunk_size (int): Messages per worker task
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        big_file = os.path.join(tmp, 'sms_expanded.xml')
+        total = expand_backup(xml_file, big_file, factor)
+
+        print("\n" + "="*70)
+        print("PARALLEL INGESTION SCALING")
+        print("="*70)
+        print(f"Messages:    {total:,} ({factor}x {xml_file})")
+        print(f"Chunk size:  {chunk_size}")
+        print(f"CPU count:   {os.cpu_count()}")
+        print("-"*70)
+        print(f"  {'Workers':>7}  {'Seconds':>9}  {'msg/s':>12}  {'Scaling':>8}")
+
+        baseline = None
+        for workers in worker_counts(max_workers):
+            start = time.perf_counter()
+            count = sum(1 for _ in iter_transactions_parallel(
+                big_file, workers=workers, chunk_size=chunk_size))
+            elapsed = time.perf_counter() - start
+
+            throughput = count / elapsed if elapsed > 0 else 0.0
+            baseline = baseline or throughput
+            print(f"  {workers:>7}  {elapsed:>9.2f}  {throughput:>12,.0f}  {throughput / baseline:>7.2f}x")
+
+        print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(__file__), '..', 'modified_sms_v2.xml')
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    factor = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    chunk_size = int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_CHUNK_SIZE
+
+    run_benchmark(xml_path, max_workers, factor, chunk_size)
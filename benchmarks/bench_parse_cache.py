@@ -0,0 +1,103 @@
+"""
+Parse Cache Benchmark
+=====================
+
+Times the ETL parse stage (etl.parse_xml.extract, whole file) on a
+re-exported backup that overlaps an earlier one, the way a phone export
+taken a few months later contains every old message plus new ones:
+
+    backup 1    `copies` copies of the source messages
+    backup 2    the same messages plus `new`% more
+
+    no cache    backup 2 parsed with every body run through the regexes
+    cold        backup 1 parsed into an empty parse cache (fill cost)
+    re-import   backup 2 parsed with the cache filled by backup 1
+
+Each copy's bodies get a distinct reference so that every message in a
+backup is unique and hits only come from the overlap.
+
+Usage:
+    python bench_parse_cache.py [xml_file] [copies] [new_percent]
+
+Example:
+    python bench_parse_cache.py ../modified_sms_v2.xml 60 25
+"""
+
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import iter_sms_elements
+from etl.parse_cache import ParseCache
+from etl.parse_xml import extract
+
+
+def write_backup(source_xml, output_xml, copies):
+    """Write `copies` copies of the source messages, each copy's bodies made unique."""
+    dates = [int(sms.get('date') or 0) for sms in iter_sms_elements(source_xml)]
+    span = max(dates) - min(dates) + 1
+
+    with open(output_xml, 'w', encoding='utf-8') as out:
+        out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        out.write(f'<smses count="{len(dates) * copies}" type="full">\n')
+        for copy in range(copies):
+            for sms in iter_sms_elements(source_xml):
+                if sms.get('date'):
+                    sms.set('date', str(int(sms.get('date')) + copy * span))
+                if copy and sms.get('body'):
+                    sms.set('body', f"{sms.get('body')} Ref {copy}.")
+                sms.tail = None
+                out.write('  ' + ET.tostring(sms, encoding='unicode') + '\n')
+        out.write('</smses>\n')
+
+
+def parse(xml_file, cache_path=None):
+    """Return (seconds, records, cache stats) for one parse stage run."""
+    start = time.perf_counter()
+    if cache_path is None:
+        count = sum(1 for _ in extract(xml_file, workers=1))
+        return time.perf_counter() - start, count, None
+    with ParseCache(cache_path) as cache:
+        count = sum(1 for _ in extract(xml_file, workers=1, parse_cache=cache))
+    return time.perf_counter() - start, count, cache.stats()
+
+
+def run_benchmark(xml_file, copies, new_percent):
+    print("\n" + "="*66)
+    print("PARSE CACHE BENCHMARK")
+    print("="*66)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first = os.path.join(tmp, 'backup1.xml')
+        second = os.path.join(tmp, 'backup2.xml')
+        cache_path = os.path.join(tmp, 'parse_cache.sqlite3')
+        write_backup(xml_file, first, copies)
+        write_backup(xml_file, second, copies + max(1, copies * new_percent // 100))
+
+        baseline, count, _ = parse(second)
+        runs = [('no cache', 'backup 2', baseline, count, None),
+                ('cold', 'backup 1') + parse(first, cache_path),
+                ('re-import', 'backup 2') + parse(second, cache_path)]
+
+        print(f"  {'Run':<10} {'Input':<9} {'Records':>10} {'Seconds':>8} {'msg/s':>9} "
+              f"{'Hit rate':>9} {'Speedup':>8}")
+        for label, source, seconds, records, stats in runs:
+            hit_rate = f"{stats['hit_rate']:.1%}" if stats else '-'
+            speedup = f"{baseline / seconds:.2f}x" if source == 'backup 2' else '-'
+            print(f"  {label:<10} {source:<9} {records:>10,} {seconds:>8.2f} "
+                  f"{records / seconds:>9,.0f} {hit_rate:>9} {speedup:>8}")
+
+    print("="*66 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    copy_count = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    new_share = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+
+    run_benchmark(xml_path, copy_count, new_share)
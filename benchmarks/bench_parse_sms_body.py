@@ -0,0 +1,163 @@
+"""
+SMS Body Classifier Microbenchmark
+==================================
+
+Compares the precompiled, single-pass parse_sms_body() against the
+original implementation (uncompiled re.search chain with repeated
+body.lower() calls) on every message of an SMS backup.
+
+Usage:
+    python bench_parse_sms_body.py [xml_file] [rounds]
+
+Example:
+    python bench_parse_sms_body.py ../modified_sms_v2.xml 20
+"""
+
+import re
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import iter_sms_elements, parse_sms_body
+
+
+def parse_sms_body_original(body):
+    """
+    Original parse_sms_body() kept verbatim as the baseline.
+    """
+    details = {
+        'transaction_id': None,
+        'amount': None,
+        'recipient': None,
+        'sender': None,
+        'type': None,
+        'fee': None,
+        'new_balance': None,
+        'phone_number': None
+    }
+
+    txid_match = re.search(r'TxId:?\s*(\d+)', body)
+    if txid_match:
+        details['transaction_id'] = txid_match.group(1)
+
+    fin_txid = re.search(r'Financial Transaction Id:\s*(\d+)', body)
+    if fin_txid:
+        details['transaction_id'] = fin_txid.group(1)
+
+    amount_match = re.search(r'(\d+(?:,\d+)*)\s*RWF', body)
+    if amount_match:
+        details['amount'] = int(amount_match.group(1).replace(',', ''))
+
+    if 'received' in body.lower():
+        details['type'] = 'received'
+        sender_match = re.search(r'from\s+([A-Za-z\s]+)\s*\(', body)
+        if sender_match:
+            details['sender'] = sender_match.group(1).strip()
+
+        phone_match = re.search(r'\(\*+(\d+)\)', body)
+        if phone_match:
+            details['phone_number'] = '*' * 9 + phone_match.group(1)
+
+    elif 'payment' in body.lower():
+        if 'Airtime' in body or 'airtime' in body:
+            details['type'] = 'airtime'
+            details['recipient'] = 'Airtime'
+        else:
+            details['type'] = 'payment'
+            recipient_match = re.search(r'to\s+([A-Za-z\s]+)\s+\d+', body)
+            if recipient_match:
+                details['recipient'] = recipient_match.group(1).strip()
+
+    elif 'transferred to' in body.lower():
+        details['type'] = 'transfer'
+        recipient_match = re.search(r'transferred to\s+([A-Za-z\s]+)\s*\((\d+)\)', body)
+        if recipient_match:
+            details['recipient'] = recipient_match.group(1).strip()
+            details['phone_number'] = recipient_match.group(2)
+
+    elif 'deposit' in body.lower():
+        details['type'] = 'deposit'
+        details['recipient'] = 'Bank Account'
+
+    else:
+        details['type'] = 'unknown'
+
+    fee_match = re.search(r'Fee was:?\s*(\d+(?:,\d+)*)\s*RWF', body, re.IGNORECASE)
+    if fee_match:
+        details['fee'] = int(fee_match.group(1).replace(',', ''))
+
+    balance_match = re.search(r'(?:new balance|NEW BALANCE)\s*:?\s*(\d+(?:,\d+)*)\s*RWF', body, re.IGNORECASE)
+    if balance_match:
+        details['new_balance'] = int(balance_match.group(1).replace(',', ''))
+
+    return details
+
+
+def measure_throughput(parse_function, bodies, rounds):
+    """
+    Run parse_function over all bodies several times.
+
+    Args:
+        parse_function: Callable taking an SMS body
+        bodies (list): SMS message texts
+        rounds (int): Number of passes over the bodies
+
+    Returns:
+        float: Best observed throughput in messages per second
+    """
+    best = 0.0
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for body in bodies:
+            parse_function(body)
+        elapsed = time.perf_counter() - start
+
+        if elapsed > 0:
+            best = max(best, len(bodies) / elapsed)
+
+    return best
+
+
+def run_benchmark(xml_file, rounds=20):
+    """
+    Verify both implementations agree, then compare their throughput.
+
+    Args:
+        xml_file (str): Path to XML file
+        rounds (int): Number of timed passes per implementation
+    """
+    bodies = [sms.get('body', '') for sms in iter_sms_elements(xml_file)]
+    bodies = [body for body in bodies if body]
+
+    mismatches = sum(
+        1 for body in bodies
+        if parse_sms_body(body) != parse_sms_body_original(body)
+    )
+
+    original = measure_throughput(parse_sms_body_original, bodies, rounds)
+    compiled = measure_throughput(parse_sms_body, bodies, rounds)
+
+    print("\n" + "="*70)
+    print("SMS BODY CLASSIFIER BENCHMARK")
+    print("="*70)
+    print(f"Source file:     {xml_file}")
+    print(f"Messages:        {len(bodies)}")
+    print(f"Rounds:          {rounds} (best round reported)")
+    print(f"Mismatches:      {mismatches}")
+    print("-"*70)
+    print(f"  Original parse_sms_body:  {original:>12,.0f} msg/s")
+    print(f"  Compiled classifier:      {compiled:>12,.0f} msg/s")
+    if original > 0:
+        print(f"  Speedup:                  {compiled / original:>12.2f}x")
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(__file__), '..', 'modified_sms_v2.xml')
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    run_benchmark(xml_path, rounds)
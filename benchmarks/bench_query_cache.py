@@ -0,0 +1,108 @@
+"""
+Query Result Cache Benchmark
+============================
+
+Replays a dashboard-like workload of repeated GET /transactions filter
+combinations against the memory store, with the query result cache off
+and on, and with writes (PUT) mixed in that invalidate it:
+
+    off         every request queries the store and encodes the response
+    on          repeated queries are served from the LRU response cache
+    on + PUT    as "on", with one PUT every `write_every` requests
+
+Requests run through TransactionAPIHandler in-process.
+
+Usage:
+    python bench_query_cache.py [xml_file] [sizes] [requests] [write_every]
+
+Example:
+    python bench_query_cache.py ../modified_sms_v2.xml 10000,100000 2000 100
+"""
+
+import json
+import random
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from api.db import MemoryTransactionStore
+from api.query_cache import QueryCache
+from dsa.xml_parser import iter_transactions
+from bench_store_ops import build_records
+from bench_streaming import streamed
+
+# Popular queries, most frequent first (Zipf-like weights)
+QUERIES = (
+    '/transactions?limit=100',
+    '/transactions?type=payment&limit=100',
+    '/transactions?type=deposit&limit=100',
+    '/transactions?amount_min=10000&amount_max=50000&limit=100',
+    '/transactions?type=payment&amount_min=1000&limit=100',
+    '/transactions?recipient=jane&limit=100',
+    '/transactions?type=transfer&fields=id,amount,recipient&limit=1000',
+    '/transactions?type=airtime',
+)
+WEIGHTS = [1 / rank for rank in range(1, len(QUERIES) + 1)]
+
+
+def run_workload(paths, write_every, write_ids):
+    """Run the requests; return per-request latencies in seconds."""
+    latencies = []
+    for count, path in enumerate(paths, 1):
+        start = time.perf_counter()
+        streamed(path)
+        latencies.append(time.perf_counter() - start)
+
+        if write_every and count % write_every == 0:
+            transaction_id = random.choice(write_ids)
+            api_server.store.update(transaction_id, {'amount': random.randint(100, 100000)})
+    return latencies
+
+
+def run_benchmark(xml_file, sizes, requests, write_every):
+    templates = list(iter_transactions(xml_file))
+    random.seed(42)
+    paths = random.choices(QUERIES, WEIGHTS, k=requests)
+
+    print("\n" + "="*74)
+    print("QUERY RESULT CACHE BENCHMARK")
+    print("="*74)
+    print(f"{requests} requests over {len(QUERIES)} queries; PUT every {write_every} requests in 'on + PUT'")
+    print("-"*74)
+    print(f"  {'Records':>10} {'Mode':<9} {'Mean ms':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'Hit rate':>9} {'Evicted':>8}")
+
+    for size in sizes:
+        records = build_records(templates, size)
+        write_ids = [t['id'] for t in records]
+
+        for label, enabled, writes in (('off', False, 0),
+                                       ('on', True, 0),
+                                       ('on + PUT', True, write_every)):
+            api_server.store = MemoryTransactionStore(records)
+            api_server.query_cache = QueryCache() if enabled else QueryCache(max_entries=0)
+            latencies = sorted(run_workload(paths, writes, write_ids))
+
+            stats = api_server.query_cache.stats()
+            hit_rate = f"{stats['hit_rate']:.1%}" if enabled else '-'
+            print(f"  {size:>10,} {label:<9} {sum(latencies) / len(latencies) * 1000:>9.2f} "
+                  f"{latencies[len(latencies) // 2] * 1000:>8.2f} "
+                  f"{latencies[int(len(latencies) * 0.99)] * 1000:>8.2f} "
+                  f"{hit_rate:>9} {stats['evictions']:>8}")
+
+    print("="*74)
+    print(json.dumps(api_server.query_cache.stats()))
+    print()
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [10000, 100000]
+    request_count = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    write_interval = int(sys.argv[4]) if len(sys.argv) > 4 else 100
+
+    run_benchmark(xml_path, size_list, request_count, write_interval)
@@ -0,0 +1,129 @@
+"""
+Transaction Record Memory Benchmark
+===================================
+
+Measures the memory held by N parsed transactions in three layouts:
+
+    dict        the original parser output: a 12-key dictionary per SMS
+    slots       dsa.xml_parser.Transaction: a __slots__ record with the
+                repeated strings (type, sender, recipient, phone_number)
+                interned
+    lazy        slots, with raw_message kept in a memory-mapped BodyStore
+                file and decoded only when read
+
+Records are parsed from the SMS backup, re-reading the file as often as
+needed to reach N, so every record gets its own strings exactly as a
+backup of N messages would. Memory is what tracemalloc sees allocated by
+the list of records once parsing is done; for "lazy", "Body MB" is the
+size of the body file, which lives in the OS page cache instead.
+
+Usage:
+    python bench_record_memory.py [xml_file] [sizes]
+
+Example:
+    python bench_record_memory.py ../modified_sms_v2.xml 100000,1000000
+"""
+
+import functools
+import gc
+import sys
+import os
+import time
+import tracemalloc
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import BodyStore, build_transaction, iter_sms_elements, parse_sms_body
+
+
+def build_dict(transaction_id, body, date_timestamp, readable_date):
+    """The original build_transaction(), kept for comparison."""
+    details = parse_sms_body(body)
+    return {
+        'id': transaction_id,
+        'transaction_id': details['transaction_id'],
+        'type': details['type'],
+        'amount': details['amount'],
+        'sender': details['sender'],
+        'recipient': details['recipient'],
+        'phone_number': details['phone_number'],
+        'fee': details['fee'],
+        'new_balance': details['new_balance'],
+        'timestamp': date_timestamp,
+        'readable_date': readable_date,
+        'raw_message': body
+    }
+
+
+LAYOUTS = (
+    # label, builder, bodies in a BodyStore
+    ('dict', build_dict, False),
+    ('slots', build_transaction, False),
+    ('lazy', build_transaction, True),
+)
+
+
+def parse_records(xml_file, size, build):
+    """Build `size` transactions, cycling through the backup."""
+    records = []
+    while len(records) < size:
+        for sms in iter_sms_elements(xml_file):
+            body = sms.get('body', '')
+            if not body:
+                continue
+            records.append(build(len(records) + 1, body, sms.get('date', ''),
+                                 sms.get('readable_date', '')))
+            if len(records) == size:
+                break
+    return records
+
+
+def measure(xml_file, size, build, lazy):
+    """Return (bytes held by the records, body file bytes, seconds to build them)."""
+    body_store = BodyStore() if lazy else None
+    if lazy:
+        build = functools.partial(build, body_store=body_store)
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    records = parse_records(xml_file, size, build)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del records
+
+    body_bytes = 0
+    if body_store is not None:
+        body_bytes = body_store.size()
+        body_store.close()
+    return held, body_bytes, seconds
+
+
+def run_benchmark(xml_file, sizes):
+    print("\n" + "="*70)
+    print("TRANSACTION RECORD MEMORY BENCHMARK")
+    print("="*70)
+    print(f"  {'Records':>10} {'Layout':<7} {'MB':>9} {'Bytes/txn':>10} {'Body MB':>8} "
+          f"{'Parse s':>8} {'Saving':>7}")
+
+    for size in sizes:
+        baseline = None
+        for label, build, lazy in LAYOUTS:
+            held, body_bytes, seconds = measure(xml_file, size, build, lazy)
+            baseline = baseline or held
+            body = f"{body_bytes / 1e6:.1f}" if lazy else '-'
+            print(f"  {size:>10,} {label:<7} {held / 1e6:>9.1f} {held / size:>10,.0f} {body:>8} "
+                  f"{seconds:>8.1f} {1 - held / baseline:>7.0%}")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [100000, 1000000]
+
+    run_benchmark(xml_path, size_list)
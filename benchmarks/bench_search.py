@@ -0,0 +1,128 @@
+"""
+Search Benchmark
+================
+
+Times dsa/search_algorithms.py's linear search, dictionary lookup and
+binary search by transaction ID on datasets from 1k to 10M records, and
+writes the results as JSON so runs of different releases can be
+compared.
+
+Datasets are built in memory with synthetic.expand_transactions() from
+the parsed source backup (records 1..N, repeating its messages). Each
+size is searched for four IDs:
+
+    first       ID 1, the best case of a linear scan
+    middle      ID N/2
+    last        ID N, the worst case of a scan that finds its record
+    missing     ID N+1, a scan of the whole list that finds nothing
+
+Every search is timed with dsa.timing.measure(): warmup calls, a loop
+count calibrated so each sample lasts at least 0.2 ms, then up to
+`repeat` samples (fewer for scans slower than the per-search time
+limit), reported as the per-call median, p95 and standard deviation.
+
+Usage:
+    python bench_search.py [xml_file] [sizes] [json_file]
+
+Example:
+    python bench_search.py ../modified_sms_v2.xml 1000,10000,100000,1000000,10000000 search_benchmark.json
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.search_algorithms import binary_search, create_transaction_dict, dictionary_lookup, linear_search
+from dsa.timing import (DEFAULT_MIN_SAMPLE_NS, DEFAULT_REPEAT, DEFAULT_WARMUP, format_ns,
+                        measure)
+from dsa.xml_parser import parse_xml_to_json
+from synthetic import expand_transactions
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Sampling time limit per search; a 10M-record scan takes about a second
+MAX_SECONDS = 5
+
+
+def search_targets(size):
+    return (('first', 1), ('middle', size // 2), ('last', size), ('missing', size + 1))
+
+
+def benchmark_size(source, size):
+    """Return the result rows for one dataset size."""
+    transactions = expand_transactions(source, size)
+    methods = (
+        ('linear', linear_search, transactions),
+        ('dictionary', dictionary_lookup, create_transaction_dict(transactions)),
+        ('binary', binary_search, sorted(transactions, key=lambda t: t['id'])),
+    )
+
+    rows = []
+    for method, search, data in methods:
+        for target, search_id in search_targets(size):
+            found = search(data, search_id) is not None
+            if found != (target != 'missing'):
+                raise RuntimeError(f"{method} search returned a wrong result for ID {search_id}")
+            stats = measure(search, data, search_id, max_seconds=MAX_SECONDS)
+            rows.append({'size': size, 'method': method, 'target': target, 'id': search_id,
+                         'found': found, **stats})
+    return rows
+
+
+def run_benchmark(xml_file, sizes, json_file):
+    print("\n" + "="*78)
+    print("SEARCH BENCHMARK")
+    print("="*78)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # parser progress lines
+        source = parse_xml_to_json(xml_file)
+    print(f"  Source: {xml_file} ({len(source):,} transactions)")
+    print(f"  {'Records':>11} {'Method':<11} {'Target':<8} {'Median':>10} {'p95':>10} "
+          f"{'Stdev':>10} {'Samples':>13}")
+
+    results = []
+    for size in sizes:
+        rows = benchmark_size(source, size)
+        gc.collect()    # free the previous dataset before building the next one
+        for row in rows:
+            print(f"  {row['size']:>11,} {row['method']:<11} {row['target']:<8} "
+                  f"{format_ns(row['median_ns']):>10} {format_ns(row['p95_ns']):>10} "
+                  f"{format_ns(row['stdev_ns']):>10} {row['samples']:>4} x {row['loops']:<6}")
+        results.extend(rows)
+
+    report = {
+        'benchmark': 'search',
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': os.path.basename(xml_file),
+        'settings': {
+            'warmup': DEFAULT_WARMUP,
+            'repeat': DEFAULT_REPEAT,
+            'min_sample_ns': DEFAULT_MIN_SAMPLE_NS,
+            'max_seconds': MAX_SECONDS,
+        },
+        'results': results,
+    }
+    with open(json_file, 'w') as out:
+        json.dump(report, out, indent=2)
+
+    print("="*78)
+    print(f"  Results saved to {json_file}")
+    print("="*78 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else DEFAULT_SIZES
+    output = sys.argv[3] if len(sys.argv) > 3 else 'search_benchmark.json'
+
+    run_benchmark(xml_path, size_list, output)
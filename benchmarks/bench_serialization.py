@@ -0,0 +1,92 @@
+"""
+Response Serialization Benchmark
+================================
+
+Compares the size and encoding time of GET /transactions responses from
+the memory store:
+
+    indented    the original json.dumps(indent=2) output (?pretty=1)
+    compact     compact JSON, every record encoded on each request
+                (record cache disabled)
+    cached      compact JSON joined from the store's cached record bytes
+
+Each mode is run through TransactionAPIHandler for a 1000-record page
+and for a full (streamed) listing; the cache is warmed by one request
+before timing.
+
+Usage:
+    python bench_serialization.py [xml_file] [sizes] [repeats]
+
+Example:
+    python bench_serialization.py ../modified_sms_v2.xml 10000,100000 5
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from api.db import MemoryTransactionStore
+from api.query_cache import QueryCache
+from dsa.xml_parser import iter_transactions
+from bench_store_ops import build_records
+from bench_streaming import streamed
+
+# Measure encoding, not the response cache
+api_server.query_cache = QueryCache(max_entries=0)
+
+MODES = (
+    # label, cache size, query suffix
+    ('indented', 0, '&pretty=1'),
+    ('compact', 0, ''),
+    ('cached', None, ''),
+)
+
+
+def time_request(path, repeats):
+    """Return (best seconds, bytes sent) for GET `path`."""
+    body = streamed(path)  # Warm-up (fills the record cache)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        streamed(path)
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def run_benchmark(xml_file, sizes, repeats):
+    templates = list(iter_transactions(xml_file))
+
+    print("\n" + "="*70)
+    print("RESPONSE SERIALIZATION BENCHMARK")
+    print("="*70)
+    print(f"Memory store, best of {repeats} runs")
+    print("-"*70)
+    print(f"  {'Records':>10} {'Request':<10} {'Mode':<10} {'Body MB':>9} {'ms':>10} {'vs indented':>12}")
+
+    for size in sizes:
+        records = build_records(templates, size)
+
+        for request, path in (('page', '/transactions?limit=1000'),
+                              ('listing', '/transactions?')):
+            baseline = None
+            for label, cache_size, suffix in MODES:
+                api_server.store = MemoryTransactionStore(
+                    records, size if cache_size is None else cache_size)
+                seconds, body = time_request(path + suffix, repeats)
+                baseline = baseline or seconds
+                print(f"  {size:>10,} {request:<10} {label:<10} {body / 1e6:>9.2f} "
+                      f"{seconds * 1000:>10.1f} {baseline / seconds:>11.1f}x")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [10000, 100000]
+    repeat_count = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    run_benchmark(xml_path, size_list, repeat_count)
@@ -0,0 +1,139 @@
+"""
+Memory Store Operation Benchmark
+================================
+
+Measures per-operation latency of GET, PUT and DELETE by id (and POST)
+in api.db.MemoryTransactionStore at several dataset sizes, next to the
+original list-based store, which found records with a linear scan and
+rebuilt the list on every delete.
+
+Records are copies of the transactions parsed from an SMS backup.
+
+Usage:
+    python bench_store_ops.py [xml_file] [sizes]
+
+Example:
+    python bench_store_ops.py ../modified_sms_v2.xml 10000,100000,1000000
+"""
+
+import random
+import statistics
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api.db import MemoryTransactionStore
+from dsa.xml_parser import iter_transactions
+
+
+class ListTransactionStore:
+    """
+    The original list-based storage, kept for comparison.
+    """
+
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        self.next_id = len(self.transactions) + 1
+
+    def get(self, transaction_id):
+        return next((t for t in self.transactions if t['id'] == transaction_id), None)
+
+    def create(self, data):
+        transaction = dict(data)
+        transaction['id'] = self.next_id
+        self.next_id += 1
+        self.transactions.append(transaction)
+        return transaction
+
+    def update(self, transaction_id, data):
+        position = next((i for i, t in enumerate(self.transactions)
+                         if t['id'] == transaction_id), None)
+        if position is None:
+            return None
+        transaction = dict(self.transactions[position])
+        transaction.update((key, value) for key, value in data.items() if key != 'id')
+        self.transactions[position] = transaction
+        return transaction
+
+    def delete(self, transaction_id):
+        initial_count = len(self.transactions)
+        self.transactions = [t for t in self.transactions if t['id'] != transaction_id]
+        return len(self.transactions) < initial_count
+
+
+def build_records(templates, size):
+    """
+    Return `size` transactions with ids 1..size, cycling through templates.
+    """
+    records = []
+    for n in range(size):
+        record = dict(templates[n % len(templates)])
+        record['id'] = n + 1
+        records.append(record)
+    return records
+
+
+def time_ops(operation, ids):
+    """
+    Run operation(id) for each id and return the per-call latencies (seconds).
+    """
+    latencies = []
+    for transaction_id in ids:
+        start = time.perf_counter()
+        operation(transaction_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure(store, size, samples):
+    """
+    Median latency (microseconds) of each operation on a store of `size` records.
+    """
+    rng = random.Random(size)
+    ids = [rng.randint(1, size) for _ in range(samples)]
+    update = {'amount': 7500, 'fee': 150}
+
+    results = {
+        'GET': time_ops(store.get, ids),
+        'PUT': time_ops(lambda i: store.update(i, update), ids),
+        'POST': time_ops(lambda i: store.create({'type': 'payment', 'amount': 5000}), ids),
+        # Distinct ids so every delete removes a record
+        'DELETE': time_ops(store.delete, rng.sample(range(1, size + 1), samples)),
+    }
+    return {op: statistics.median(latencies) * 1e6 for op, latencies in results.items()}
+
+
+def run_benchmark(xml_file, sizes, samples=200, list_samples=5):
+    """
+    Print median per-operation latency for both stores at every size.
+    """
+    templates = list(iter_transactions(xml_file))
+
+    print("\n" + "="*70)
+    print("MEMORY STORE OPERATION BENCHMARK")
+    print("="*70)
+    print(f"Templates: {len(templates)} transactions from {xml_file}")
+    print("Median latency per operation (microseconds)")
+    print("-"*70)
+    print(f"  {'Records':>10} {'Store':<7} {'GET':>11} {'PUT':>11} {'DELETE':>11} {'POST':>9}")
+
+    for size in sizes:
+        records = build_records(templates, size)
+
+        for label, store_class, count in (('list', ListTransactionStore, list_samples),
+                                          ('dict', MemoryTransactionStore, samples)):
+            timings = measure(store_class(records), size, count)
+            print(f"  {size:>10,} {label:<7} {timings['GET']:>11,.1f} {timings['PUT']:>11,.1f} "
+                  f"{timings['DELETE']:>11,.1f} {timings['POST']:>9,.1f}")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [10000, 100000, 1000000]
+
+    run_benchmark(xml_path, size_list)
@@ -0,0 +1,128 @@
+"""
+Streaming Response Benchmark
+============================
+
+Compares the memory and time needed to produce a full GET /transactions
+listing:
+
+    buffered    original send_json_response: the whole json.dumps string,
+                then its encoded bytes, held in memory
+    streamed    the handler's chunked path (JSON and NDJSON), run through
+                TransactionAPIHandler into a sink that discards the bytes
+
+Peak memory is the largest amount allocated while the response is
+produced (tracemalloc), excluding the dataset itself.
+
+Usage:
+    python bench_streaming.py [xml_file] [sizes]
+
+Example:
+    python bench_streaming.py ../modified_sms_v2.xml 10000,100000
+
+The buffered mode needs roughly 2.6 KB of memory per record (about
+2.6 GB at 1M records), so keep sizes within the machine's RAM.
+"""
+
+import base64
+import contextlib
+import io
+import json
+import sys
+import os
+import time
+import tracemalloc
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from api.async_server import BufferedRequestHandler
+from api.db import MemoryTransactionStore
+from api.query_cache import QueryCache
+from dsa.xml_parser import iter_transactions
+from bench_store_ops import build_records
+
+# Measure encoding, not the response cache
+api_server.query_cache = QueryCache(max_entries=0)
+
+AUTHORIZATION = 'Basic ' + base64.b64encode(b'admin:password123').decode()
+
+
+class CountingSink:
+    """Write-only file that counts and discards bytes."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def buffered(transactions):
+    """The original full-listing response body."""
+    payload = json.dumps({
+        'success': True,
+        'count': len(transactions),
+        'total': len(transactions),
+        'filters': None,
+        'transactions': transactions,
+    }, indent=2, ensure_ascii=False).encode('utf-8')
+    return len(payload)
+
+
+def streamed(path):
+    """Run GET `path` through the API handler and return the bytes sent."""
+    request = f'GET {path} HTTP/1.1\r\nAuthorization: {AUTHORIZATION}\r\n\r\n'.encode()
+    sink = CountingSink()
+    with contextlib.redirect_stdout(io.StringIO()):  # request log line
+        BufferedRequestHandler(request, ('127.0.0.1', 0), sink)
+    return sink.bytes
+
+
+def measure(function, *args):
+    """Return (seconds, peak bytes allocated, result) for one call."""
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def run_benchmark(xml_file, sizes):
+    templates = list(iter_transactions(xml_file))
+
+    print("\n" + "="*70)
+    print("STREAMING RESPONSE BENCHMARK")
+    print("="*70)
+    print("Full GET /transactions listing from the memory store")
+    print("-"*70)
+    print(f"  {'Records':>10} {'Mode':<10} {'Body MB':>9} {'Seconds':>9} {'Peak MB':>9}")
+
+    for size in sizes:
+        records = build_records(templates, size)
+        api_server.store = MemoryTransactionStore(records)
+
+        for label, function, args in (
+            ('buffered', buffered, (records,)),
+            ('streamed', streamed, ('/transactions',)),
+            ('ndjson', streamed, ('/transactions?format=ndjson',)),
+        ):
+            seconds, peak, body = measure(function, *args)
+            print(f"  {size:>10,} {label:<10} {body / 1e6:>9.1f} {seconds:>9.2f} {peak / 1e6:>9.1f}")
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'modified_sms_v2.xml')
+    size_list = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [10000, 100000]
+
+    run_benchmark(xml_path, size_list)
@@ -0,0 +1,91 @@
+"""
+Synthetic SMS Backup Generator
+==============================
+
+Builds large SMS backups for benchmarking by repeating the messages of
+an existing backup. Each copy has its 'date' attributes shifted past the
+previous copy, so timestamps keep increasing through the file the way a
+real multi-year export does.
+
+expand_transactions() does the same for already parsed records, for
+benchmarks that need millions of records in memory but not the XML.
+
+Usage:
+    python synthetic.py <source_xml> <output_xml> <factor>
+
+Example:
+    python synthetic.py ../modified_sms_v2.xml /tmp/sms_x100.xml 100
+"""
+
+import sys
+import os
+import xml.etree.ElementTree as ET
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import TRANSACTION_FIELDS, Transaction, iter_sms_elements
+
+
+def expand_backup(source_xml, output_xml, factor):
+    """
+    Write a backup containing `factor` copies of every <sms> in source_xml.
+
+    Args:
+        source_xml (str): Path to the original XML backup
+        output_xml (str): Path of the file to create
+        factor (int): Number of copies of the original messages
+
+    Returns:
+        int: Number of <sms> elements written
+    """
+    dates = [int(sms.get('date') or 0) for sms in iter_sms_elements(source_xml)]
+    if not dates:
+        raise ValueError(f"No <sms> elements in {source_xml}")
+    span = max(dates) - min(dates) + 1
+
+    written = 0
+    with open(output_xml, 'w', encoding='utf-8') as out:
+        out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        out.write(f'<smses count="{len(dates) * factor}" type="full">\n')
+
+        for copy in range(factor):
+            for sms in iter_sms_elements(source_xml):
+                if copy and sms.get('date'):
+                    sms.set('date', str(int(sms.get('date')) + copy * span))
+                sms.tail = None
+                out.write('  ' + ET.tostring(sms, encoding='unicode') + '\n')
+                written += 1
+
+        out.write('</smses>\n')
+
+    return written
+
+
+def expand_transactions(transactions, count):
+    """
+    Build `count` records by repeating parsed transactions.
+
+    The records get sequential IDs from 1 and share every other value
+    (strings, message bodies) with the source records, so 10M of them
+    take about 1.5 GB.
+
+    Args:
+        transactions (list): Parsed transactions (records or dictionaries)
+        count (int): Number of records to build
+
+    Returns:
+        list: Transaction records with IDs 1..count
+    """
+    if not transactions:
+        raise ValueError("No transactions to expand")
+    sources = [tuple(t[field] for field in TRANSACTION_FIELDS[1:]) for t in transactions]
+    return [Transaction(number + 1, *sources[number % len(sources)]) for number in range(count)]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print(__doc__)
+        sys.exit(1)
+
+    count = expand_backup(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    print(f"Wrote {count} messages to {sys.argv[2]}")
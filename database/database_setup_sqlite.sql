@@ -0,0 +1,89 @@
+-- SQLite translation of database_setup.sql, used by etl/load_db.py and api/db.py.
+--
+-- Differences from the MySQL schema:
+--   * AUTO_INCREMENT/INT/VARCHAR/DECIMAL/ENUM become SQLite types and CHECKs
+--   * transactions keeps the parsed SMS fields next to the relational keys,
+--     because most SMS do not identify both parties by phone number;
+--     sender_id/receiver_id are therefore nullable
+--   * transactions.source_key is the upsert key: the Financial Transaction Id
+--     / TxId when the SMS has one, otherwise a timestamp + body checksum
+--   * transactions.extra holds any other fields set through the REST API,
+--     as a JSON object
+
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    phone_number TEXT NOT NULL UNIQUE,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    last_activity TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS transaction_categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category_name TEXT NOT NULL,
+    category_code TEXT NOT NULL UNIQUE,
+    category_fee INTEGER NOT NULL CHECK (category_fee IN (0, 1))
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_key TEXT NOT NULL UNIQUE,
+    transaction_id TEXT,
+    sender_id INTEGER REFERENCES customers(id),
+    receiver_id INTEGER REFERENCES customers(id),
+    category_id INTEGER REFERENCES transaction_categories(id),
+    type TEXT NOT NULL,
+    amount NUMERIC,
+    fee_amount NUMERIC,
+    balance_after NUMERIC,
+    sender TEXT,
+    recipient TEXT,
+    phone_number TEXT,
+    timestamp INTEGER,
+    readable_date TEXT,
+    raw_message TEXT,
+    extra TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS system_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_time TEXT DEFAULT CURRENT_TIMESTAMP,
+    log_type TEXT NOT NULL CHECK (log_type IN ('INFO', 'WARNING', 'ERROR', 'DEBUG')),
+    log_source TEXT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES customers(id)
+);
+
+CREATE TABLE IF NOT EXISTS sms_raw_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES customers(id),
+    data TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_relationships (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id1 INTEGER NOT NULL REFERENCES customers(id),
+    user_id2 INTEGER NOT NULL REFERENCES customers(id),
+    relationship_type TEXT NOT NULL CHECK (relationship_type IN ('SENDER', 'RECEIVER')),
+    UNIQUE (user_id1, user_id2, relationship_type)
+);
+
+-- Newest message loaded by the last successful ETL run (etl/parse_xml.py),
+-- one row per backup file (absolute path and a fingerprint of its first messages)
+CREATE TABLE IF NOT EXISTS etl_watermark (
+    source TEXT PRIMARY KEY,
+    last_timestamp INTEGER NOT NULL,
+    last_transaction_id TEXT,
+    fingerprint TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One category per transaction type produced by dsa/xml_parser.py
+INSERT OR IGNORE INTO transaction_categories (category_name, category_code, category_fee) VALUES
+    ('Money Received', 'received', 0),
+    ('Payment', 'payment', 1),
+    ('Transfer', 'transfer', 1),
+    ('Bank Deposit', 'deposit', 0),
+    ('Airtime', 'airtime', 0),
+    ('Unknown', 'unknown', 0);
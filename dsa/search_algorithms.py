@@ -1,6 +1,11 @@
-import time
 import json
-from xml_parser import parse_xml_to_json
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.timing import format_ns, measure
+from dsa.xml_parser import parse_xml_to_json
 
 
 def linear_search(transactions, target_id):
@@ -21,24 +26,20 @@ def linear_search(transactions, target_id):
         target_id (int): Transaction ID to find
         
     Returns:
-        tuple: (transaction_dict or None, search_time_in_seconds)
+        dict: The transaction, or None if not found
         
     Example:
-        result, time_taken = linear_search(transactions, 5)
+        result = linear_search(transactions, 5)
         if result:
             print(f"Found: {result['type']}")
     """
-    start_time = time.time()
-    
     # Iterate through each transaction one by one
     for transaction in transactions:
         if transaction['id'] == target_id:
-            end_time = time.time()
-            return transaction, end_time - start_time
+            return transaction
     
     # Not found
-    end_time = time.time()
-    return None, end_time - start_time
+    return None
 
 
 def dictionary_lookup(transaction_dict, target_id):
@@ -58,15 +59,10 @@ def dictionary_lookup(transaction_dict, target_id):
         target_id (int): Transaction ID to find
         
     Returns:
-        tuple: (transaction_dict or None, search_time_in_seconds)
+        dict: The transaction, or None if not found
     """
-    start_time = time.time()
-    
     # Direct key access - very fast!
-    result = transaction_dict.get(target_id)
-    
-    end_time = time.time()
-    return result, end_time - start_time
+    return transaction_dict.get(target_id)
 
 
 def create_transaction_dict(transactions):
@@ -117,10 +113,8 @@ def binary_search(sorted_transactions, target_id):
         target_id (int): Transaction ID to find
         
     Returns:
-        tuple: (transaction_dict or None, search_time_in_seconds)
+        dict: The transaction, or None if not found
     """
-    start_time = time.time()
-    
     left = 0
     right = len(sorted_transactions) - 1
     
@@ -131,8 +125,7 @@ def binary_search(sorted_transactions, target_id):
         
         if mid_transaction['id'] == target_id:
             # Found it!
-            end_time = time.time()
-            return mid_transaction, end_time - start_time
+            return mid_transaction
         
         elif mid_transaction['id'] < target_id:
             # Target is in right half
@@ -142,89 +135,88 @@ def binary_search(sorted_transactions, target_id):
             right = mid - 1
     
     # Not found
-    end_time = time.time()
-    return None, end_time - start_time
+    return None
 
 
-def compare_search_methods(transactions, search_ids):
+def compare_search_methods(transactions, search_ids, repeat=25, max_seconds=5):
     """
     Run all search methods and compare their performance.
     
+    Every search is timed with dsa.timing.measure(): warmed up, looped
+    until a sample is long enough to read, and repeated, so even a
+    dictionary hit gets a meaningful median.
+    
     Args:
         transactions (list): List of transactions
         search_ids (list): List of IDs to search for
+        repeat (int): Timed samples per search
+        max_seconds (float): Sampling time limit per search (slow scans
+            of large datasets stop after 3 samples past this)
         
     Returns:
-        dict: Results for each search method
+        dict: Per method, the number of IDs found, the median time per
+        search (median_ns) and the measure() statistics of every search
     """
     print("\n" + "="*70)
     print("SEARCH ALGORITHM COMPARISON")
     print("="*70)
     print(f"Dataset size: {len(transactions)} transactions")
     print(f"Number of searches: {len(search_ids)}")
+    print(f"Samples per search: up to {repeat} (median / p95 / stdev per call)")
     print("="*70)
     
     # Prepare data structures
     trans_dict = create_transaction_dict(transactions)
     sorted_trans = sorted(transactions, key=lambda x: x['id'])
     
-    results = {
-        'linear': {'times': [], 'found': 0},
-        'dictionary': {'times': [], 'found': 0},
-        'binary': {'times': [], 'found': 0}
-    }
+    methods = (
+        ('linear', 'Linear Search', linear_search, transactions),
+        ('dictionary', 'Dictionary Lookup', dictionary_lookup, trans_dict),
+        ('binary', 'Binary Search', binary_search, sorted_trans),
+    )
+    results = {method: {'searches': [], 'found': 0} for method, _, _, _ in methods}
     
     # Test each search ID
     for search_id in search_ids:
         print(f"\nSearching for ID: {search_id}")
         print("-" * 70)
         
-        # Linear Search
-        result_linear, time_linear = linear_search(transactions, search_id)
-        results['linear']['times'].append(time_linear)
-        if result_linear:
-            results['linear']['found'] += 1
-        print(f"  Linear Search:     {time_linear:.8f}s - {'Found' if result_linear else 'Not Found'}")
-        
-        # Dictionary Lookup
-        result_dict, time_dict = dictionary_lookup(trans_dict, search_id)
-        results['dictionary']['times'].append(time_dict)
-        if result_dict:
-            results['dictionary']['found'] += 1
-        print(f"  Dictionary Lookup: {time_dict:.8f}s - {'Found' if result_dict else 'Not Found'}")
-        
-        # Binary Search
-        result_binary, time_binary = binary_search(sorted_trans, search_id)
-        results['binary']['times'].append(time_binary)
-        if result_binary:
-            results['binary']['found'] += 1
-        print(f"  Binary Search:     {time_binary:.8f}s - {'Found' if result_binary else 'Not Found'}")
-    
-    # Calculate averages
+        for method, label, search, data in methods:
+            found = search(data, search_id) is not None
+            stats = measure(search, data, search_id, repeat=repeat, max_seconds=max_seconds)
+            results[method]['searches'].append({'id': search_id, 'found': found, **stats})
+            if found:
+                results[method]['found'] += 1
+            print(f"  {label + ':':<19}{format_ns(stats['median_ns']):>10} median "
+                  f"{format_ns(stats['p95_ns']):>10} p95 {format_ns(stats['stdev_ns']):>10} stdev"
+                  f" - {'Found' if found else 'Not Found'}")
+    
+    # Summarize each method by the median of its per-search medians
     print("\n" + "="*70)
     print("PERFORMANCE SUMMARY")
     print("="*70)
     
     for method, data in results.items():
-        avg_time = sum(data['times']) / len(data['times']) if data['times'] else 0
+        medians = sorted(search['median_ns'] for search in data['searches'])
+        data['median_ns'] = medians[len(medians) // 2] if medians else 0
         print(f"\n{method.upper()} SEARCH:")
-        print(f"  Average time:  {avg_time:.8f}s")
-        print(f"  Total time:    {sum(data['times']):.8f}s")
+        print(f"  Median time:   {format_ns(data['median_ns'])}")
+        if medians:
+            print(f"  Fastest/slowest search: {format_ns(medians[0])} / {format_ns(medians[-1])}")
         print(f"  Found:         {data['found']}/{len(search_ids)}")
     
     # Calculate speedup
-    linear_avg = sum(results['linear']['times']) / len(results['linear']['times'])
-    dict_avg = sum(results['dictionary']['times']) / len(results['dictionary']['times'])
-    binary_avg = sum(results['binary']['times']) / len(results['binary']['times'])
+    linear_median = results['linear']['median_ns']
+    dict_median = results['dictionary']['median_ns']
+    binary_median = results['binary']['median_ns']
     
     print("\n" + "="*70)
     print("SPEEDUP ANALYSIS")
     print("="*70)
-    if dict_avg > 0:
-        print(f"Dictionary is {linear_avg / dict_avg:.2f}x faster than Linear Search")
-    if binary_avg > 0:
-        print(f"Binary Search is {linear_avg / binary_avg:.2f}x faster than Linear Search")
-        print(f"Dictionary is {binary_avg / dict_avg:.2f}x faster than Binary Search")
+    if dict_median > 0 and binary_median > 0:
+        print(f"Dictionary is {linear_median / dict_median:.2f}x faster than Linear Search")
+        print(f"Binary Search is {linear_median / binary_median:.2f}x faster than Linear Search")
+        print(f"Dictionary is {binary_median / dict_median:.2f}x faster than Binary Search")
     print("="*70 + "\n")
     
     return results
@@ -310,9 +302,10 @@ def suggest_alternatives():
     print("   - Excellent for disk-based storage")
     print("   - O(log n) but fewer disk reads")
     
-    print("\n4. TRIE (for string searches):")
+    print("\n4. TRIE / N-GRAM INDEX (for string searches):")
     print("   - If searching by transaction_id as string")
     print("   - Fast prefix matching")
+    print("   - Substring search on names: see NameIndex in api/indexes.py")
     
     print("\n5. BLOOM FILTER:")
     print("   - Space-efficient for existence checking")
@@ -329,9 +322,6 @@ def suggest_alternatives():
 
 # Example usage and testing
 if __name__ == '__main__':
-    import sys
-    import os
-    
     # Get XML file path
     if len(sys.argv) > 1:
         xml_file = sys.argv[1]
@@ -341,7 +331,7 @@ if __name__ == '__main__':
     print(f"Loading transactions from: {xml_file}\n")
     
     # Parse transactions
-    transactions = parse_xml_to_json(xml_file)
+    transactions = parse_xml_to_json(xml_file, records=True, lazy_bodies=True)
     
     if not transactions:
         print("No transactions loaded. Please check the XML file path.")
@@ -0,0 +1,136 @@
+"""
+Micro-benchmark Timing
+======================
+
+Times a single operation (one search, one lookup) precisely enough to
+compare operations that take tens of nanoseconds with ones that take
+seconds.
+
+A single call timed with time.time() says almost nothing: the clock's
+resolution can be coarser than a dictionary hit, so the reading is
+either 0 or one clock tick. measure() instead:
+
+    1. calls the function `warmup` times (caches, branch predictors,
+       lazily built state)
+    2. picks a loop count so one sample lasts at least `min_sample_ns`
+       (about 0.2 ms by default: a dict hit is looped thousands of
+       times, a 10M-record scan runs once)
+    3. takes `repeat` samples of that loop with time.perf_counter_ns()
+       and garbage collection paused, as timeit does
+    4. reports the per-call median, 95th percentile and standard
+       deviation of those samples
+
+The per-call time includes the cost of the Python call itself (about
+30-60 ns), the same for every function measured.
+
+Usage:
+    stats = measure(dictionary_lookup, index, 42)
+    print(stats['median_ns'], stats['p95_ns'], stats['stdev_ns'])
+"""
+
+import gc
+import math
+import statistics
+from time import perf_counter_ns
+
+DEFAULT_WARMUP = 3
+DEFAULT_REPEAT = 25
+DEFAULT_MIN_SAMPLE_NS = 200_000
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list (fraction in 0..1)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples_ns, loops=1):
+    """
+    Statistics of per-call times.
+
+    Args:
+        samples_ns (list): Duration of each sample in nanoseconds
+        loops (int): Calls per sample
+
+    Returns:
+        dict: median_ns, p95_ns, stdev_ns, mean_ns, min_ns, max_ns (per
+        call), samples and loops
+    """
+    per_call = sorted(sample / loops for sample in samples_ns)
+    return {
+        'median_ns': statistics.median(per_call),
+        'p95_ns': percentile(per_call, 0.95),
+        'stdev_ns': statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        'mean_ns': statistics.fmean(per_call),
+        'min_ns': per_call[0],
+        'max_ns': per_call[-1],
+        'samples': len(per_call),
+        'loops': loops,
+    }
+
+
+def _time_loop(func, args, loops):
+    calls = range(loops)
+    start = perf_counter_ns()
+    for _ in calls:
+        func(*args)
+    return perf_counter_ns() - start
+
+
+def calibrate(func, args, min_sample_ns=DEFAULT_MIN_SAMPLE_NS):
+    """
+    Smallest loop count (1, 2, 5, 10, 20, 50, ...) whose run lasts at
+    least min_sample_ns.
+    """
+    scale = 1
+    while True:
+        for loops in (scale, 2 * scale, 5 * scale):
+            if _time_loop(func, args, loops) >= min_sample_ns:
+                return loops
+        scale *= 10
+
+
+def measure(func, *args, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT,
+            min_sample_ns=DEFAULT_MIN_SAMPLE_NS, max_seconds=None):
+    """
+    Time func(*args) per call.
+
+    Args:
+        func: Function to time
+        *args: Arguments passed on every call
+        warmup (int): Untimed calls before calibrating
+        repeat (int): Samples to take
+        min_sample_ns (int): Shortest acceptable sample
+        max_seconds (float): Stop taking samples after this long, once at
+            least 3 are taken (for operations that take seconds per call)
+
+    Returns:
+        dict: summarize() of the samples
+    """
+    for _ in range(warmup):
+        func(*args)
+    loops = calibrate(func, args, min_sample_ns)
+
+    budget_ns = None if max_seconds is None else max_seconds * 1e9
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(samples) < repeat:
+            samples.append(_time_loop(func, args, loops))
+            if budget_ns is not None and len(samples) >= 3 and sum(samples) >= budget_ns:
+                break
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return summarize(samples, loops)
+
+
+def format_ns(nanoseconds):
+    """Human-readable duration: 850 ns, 12.30 us, 4.56 ms, 1.23 s."""
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('us', 1e3)):
+        if nanoseconds >= scale:
+            return f'{nanoseconds / scale:.2f} {unit}'
+    return f'{nanoseconds:.0f} ns'
@@ -1,13 +1,114 @@
 import xml.etree.ElementTree as ET
 import re
+import hashlib
 import json
+import mmap
+import os
+import sys
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 
+# ============================================================================
+# SMS BODY CLASSIFIER
+# ============================================================================
+
+# Bump whenever the extraction logic below changes: stored parse results
+# (dataset snapshots, the parse cache) made by another version are
+# discarded. Edits to the patterns or dispatch keywords are also picked
+# up automatically through PARSER_KEY.
+PARSER_VERSION = 1
+
+# Patterns are compiled once at import time instead of on every message
+TXID_PATTERN = re.compile(r'TxId:?\s*(\d+)')
+FINANCIAL_TXID_PATTERN = re.compile(r'Financial Transaction Id:\s*(\d+)')
+AMOUNT_PATTERN = re.compile(r'(\d+(?:,\d+)*)\s*RWF')
+SENDER_PATTERN = re.compile(r'from\s+([A-Za-z\s]+)\s*\(')
+MASKED_PHONE_PATTERN = re.compile(r'\(\*+(\d+)\)')
+PAYMENT_RECIPIENT_PATTERN = re.compile(r'to\s+([A-Za-z\s]+)\s+\d+')
+TRANSFER_RECIPIENT_PATTERN = re.compile(r'transferred to\s+([A-Za-z\s]+)\s*\((\d+)\)')
+FEE_PATTERN = re.compile(r'Fee was:?\s*(\d+(?:,\d+)*)\s*RWF', re.IGNORECASE)
+BALANCE_PATTERN = re.compile(r'(?:new balance|NEW BALANCE)\s*:?\s*(\d+(?:,\d+)*)\s*RWF', re.IGNORECASE)
+
+
+def _extract_received(body, details):
+    """Money received: sender name and masked phone number."""
+    details['type'] = 'received'
+    # Extract sender name: "from Jane Smith (*********013)"
+    sender_match = SENDER_PATTERN.search(body)
+    if sender_match:
+        details['sender'] = sender_match.group(1).strip()
+    
+    # Extract partial phone number
+    phone_match = MASKED_PHONE_PATTERN.search(body)
+    if phone_match:
+        details['phone_number'] = '*' * 9 + phone_match.group(1)
+
+
+def _extract_payment(body, details):
+    """Payment to merchant/person, or airtime purchase."""
+    if 'Airtime' in body or 'airtime' in body:
+        details['type'] = 'airtime'
+        details['recipient'] = 'Airtime'
+    else:
+        details['type'] = 'payment'
+        # Extract recipient: "to Jane Smith 12845"
+        recipient_match = PAYMENT_RECIPIENT_PATTERN.search(body)
+        if recipient_match:
+            details['recipient'] = recipient_match.group(1).strip()
+
+
+def _extract_transfer(body, details):
+    """Direct transfer: recipient name and full phone number."""
+    details['type'] = 'transfer'
+    # Extract recipient and phone: "transferred to Samuel Carter (250791666666)"
+    recipient_match = TRANSFER_RECIPIENT_PATTERN.search(body)
+    if recipient_match:
+        details['recipient'] = recipient_match.group(1).strip()
+        details['phone_number'] = recipient_match.group(2)
+
+
+def _extract_deposit(body, details):
+    """Bank deposit to mobile money."""
+    details['type'] = 'deposit'
+    details['recipient'] = 'Bank Account'
+
+
+# Keyword dispatch table, checked in priority order against the lowercased
+# body. Only the extractor of the first matching keyword is run.
+TYPE_DISPATCH = (
+    ('received', _extract_received),
+    ('payment', _extract_payment),
+    ('transferred to', _extract_transfer),
+    ('deposit', _extract_deposit),
+)
+
+
+def _parser_key():
+    rules = [str(PARSER_VERSION)]
+    for name, value in sorted(globals().items()):
+        if name.endswith('_PATTERN'):
+            rules.append(f'{name}={value.pattern}/{value.flags}')
+    rules.extend(keyword for keyword, _ in TYPE_DISPATCH)
+    digest = hashlib.sha256('\n'.join(rules).encode('utf-8')).hexdigest()
+    return f'{PARSER_VERSION}-{digest[:16]}'
+
+
+# Version key of the extraction rules, stored with persisted parse results
+PARSER_KEY = _parser_key()
+
+
 def parse_sms_body(body):
     """
     Extract transaction details from SMS message body.
     
+    The body is lowercased once and classified with a single walk over
+    TYPE_DISPATCH; only the extractor for the detected type runs.
+    
     Args:
         body (str): SMS message text
         
@@ -26,138 +127,566 @@ def parse_sms_body(body):
         'amount': None,
         'recipient': None,
         'sender': None,
-        'type': None,
+        'type': 'unknown',
         'fee': None,
         'new_balance': None,
         'phone_number': None
     }
     
-    # Extract Transaction ID (multiple patterns)
-    # Pattern 1: "TxId: 73214484437" or "TxId:73214484437"
-    txid_match = re.search(r'TxId:?\s*(\d+)', body)
-    if txid_match:
-        details['transaction_id'] = txid_match.group(1)
-    
-    # Pattern 2: "Financial Transaction Id: 76662021700"
-    fin_txid = re.search(r'Financial Transaction Id:\s*(\d+)', body)
+    # Extract Transaction ID ("Financial Transaction Id" wins over "TxId")
+    fin_txid = FINANCIAL_TXID_PATTERN.search(body)
     if fin_txid:
         details['transaction_id'] = fin_txid.group(1)
+    else:
+        txid_match = TXID_PATTERN.search(body)
+        if txid_match:
+            details['transaction_id'] = txid_match.group(1)
     
     # Extract Amount (handles both "2000" and "2,000" formats)
-    amount_match = re.search(r'(\d+(?:,\d+)*)\s*RWF', body)
+    amount_match = AMOUNT_PATTERN.search(body)
     if amount_match:
-        # Remove commas and convert to integer
         details['amount'] = int(amount_match.group(1).replace(',', ''))
     
     # Determine transaction type and extract relevant parties
-    if 'received' in body.lower():
-        details['type'] = 'received'
-        # Extract sender name: "from Jane Smith (*********013)"
-        sender_match = re.search(r'from\s+([A-Za-z\s]+)\s*\(', body)
-        if sender_match:
-            details['sender'] = sender_match.group(1).strip()
-        
-        # Extract partial phone number
-        phone_match = re.search(r'\(\*+(\d+)\)', body)
-        if phone_match:
-            details['phone_number'] = '*' * 9 + phone_match.group(1)
-    
-    elif 'payment' in body.lower():
-        if 'Airtime' in body or 'airtime' in body:
-            details['type'] = 'airtime'
-            details['recipient'] = 'Airtime'
-        else:
-            details['type'] = 'payment'
-            # Extract recipient: "to Jane Smith 12845"
-            recipient_match = re.search(r'to\s+([A-Za-z\s]+)\s+\d+', body)
-            if recipient_match:
-                details['recipient'] = recipient_match.group(1).strip()
-    
-    elif 'transferred to' in body.lower():
-        details['type'] = 'transfer'
-        # Extract recipient and phone: "transferred to Samuel Carter (250791666666)"
-        recipient_match = re.search(r'transferred to\s+([A-Za-z\s]+)\s*\((\d+)\)', body)
-        if recipient_match:
-            details['recipient'] = recipient_match.group(1).strip()
-            details['phone_number'] = recipient_match.group(2)
-    
-    elif 'deposit' in body.lower():
-        details['type'] = 'deposit'
-        details['recipient'] = 'Bank Account'
-    
-    else:
-        details['type'] = 'unknown'
+    lowered = body.lower()
+    for keyword, extractor in TYPE_DISPATCH:
+        if keyword in lowered:
+            extractor(body, details)
+            break
     
     # Extract Fee (can be 0 or positive amount)
-    fee_match = re.search(r'Fee was:?\s*(\d+(?:,\d+)*)\s*RWF', body, re.IGNORECASE)
+    fee_match = FEE_PATTERN.search(body)
     if fee_match:
         details['fee'] = int(fee_match.group(1).replace(',', ''))
     
     # Extract New Balance
-    balance_match = re.search(r'(?:new balance|NEW BALANCE)\s*:?\s*(\d+(?:,\d+)*)\s*RWF', body, re.IGNORECASE)
+    balance_match = BALANCE_PATTERN.search(body)
     if balance_match:
         details['new_balance'] = int(balance_match.group(1).replace(',', ''))
     
     return details
 
 
-def parse_xml_to_json(xml_file_path):
+def _sms_date(sms):
+    """Numeric value of an <sms> 'date' attribute (0 if missing/invalid)."""
+    try:
+        return int(sms.get('date') or 0)
+    except ValueError:
+        return 0
+
+
+def iter_sms_elements(xml_file_path, min_date=None):
+    """
+    Stream <sms> elements from an SMS backup file one at a time.
+    
+    Uses incremental parsing (ET.iterparse) instead of building the whole
+    <smses> tree. Each element is cleared and detached from the root once
+    the caller has moved on, so memory stays flat regardless of file size.
+    
+    Args:
+        xml_file_path (str): Path to XML file (or binary file object)
+        min_date (int): Skip messages whose 'date' is older than this
+        
+    Yields:
+        Element: Fully parsed <sms> element (valid until the next iteration)
+    """
+    root = None
+    
+    for event, elem in ET.iterparse(xml_file_path, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            continue
+        
+        if elem.tag != 'sms':
+            continue
+        
+        # Older messages are dropped on the attribute alone, before any
+        # body parsing happens
+        if min_date is None or _sms_date(elem) >= min_date:
+            yield elem
+        
+        # Release the element and drop it from the root's child list
+        elem.clear()
+        root.clear()
+
+
+def read_declared_count(xml_file_path):
+    """
+    Read the 'count' attribute of the <smses> root without parsing the body.
+    
+    Args:
+        xml_file_path (str): Path to XML file
+        
+    Returns:
+        str: Declared message count, or 'unknown' if absent
+    """
+    for _, root in ET.iterparse(xml_file_path, events=('start',)):
+        return root.get('count', 'unknown')
+    return 'unknown'
+
+
+# ============================================================================
+# COMPACT TRANSACTION RECORDS
+# ============================================================================
+
+# Fields of a parsed transaction, in the order they are serialized
+TRANSACTION_FIELDS = (
+    'id', 'transaction_id', 'type', 'amount', 'sender', 'recipient', 'phone_number',
+    'fee', 'new_balance', 'timestamp', 'readable_date', 'raw_message',
+)
+_FIELD_SET = frozenset(TRANSACTION_FIELDS)
+
+
+def _intern(value):
+    """Share one copy of a repeated string (type, party names, phones)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class BodyStore:
+    """
+    Append-only file of SMS bodies, read back through a memory map.
+    
+    Keeping every raw_message as a Python string is most of a parsed
+    transaction's memory, yet the field is rarely read. add() writes a
+    body's UTF-8 bytes to the file and returns a single int reference
+    (offset and length packed together); read() decodes it again. The
+    bytes live in the page cache, not the Python heap.
+    
+    The file is an unnamed temporary file, removed when the store is
+    closed or the process exits; open() reads bodies already written to
+    another file (a dataset snapshot) instead.
+    """
+    
+    LENGTH_BITS = 24    # Bodies up to 16 MB
+    
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._base = 0
+        self._size = 0
+        self._map = None
+        self._mapped = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def open(cls, path, offset, size):
+        """
+        Read-only store over `size` bytes of body text at `offset` in an
+        existing file, addressed by references relative to `offset`.
+        """
+        store = cls.__new__(cls)
+        store._file = open(path, 'rb')
+        store._base = offset
+        store._size = size
+        store._map = mmap.mmap(store._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        store._mapped = size
+        store._lock = threading.Lock()
+        return store
+    
+    def add(self, body):
+        """
+        Append a body.
+        
+        Returns:
+            int: Reference to pass to read()
+        """
+        data = body.encode('utf-8')
+        if len(data) >> self.LENGTH_BITS:
+            raise ValueError(f"Message body too long ({len(data)} bytes)")
+        with self._lock:
+            offset = self._size
+            self._file.write(data)
+            self._size += len(data)
+        return offset << self.LENGTH_BITS | len(data)
+    
+    def read(self, reference):
+        """Return the body stored under a reference from add()."""
+        start = reference >> self.LENGTH_BITS
+        end = start + (reference & ((1 << self.LENGTH_BITS) - 1))
+        if end > self._mapped:
+            self._remap(end)
+        return self._map[self._base + start:self._base + end].decode('utf-8')
+    
+    def _remap(self, end):
+        # Map again after appends (normally once, after parsing finishes)
+        with self._lock:
+            if end > self._mapped:
+                self._file.flush()
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mapped = len(self._map)
+    
+    def size(self):
+        """Bytes of body text stored."""
+        return self._size
+    
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class Transaction(Mapping):
+    """
+    One parsed transaction, stored in slots instead of a dictionary.
+    
+    A 12-key dict costs ~460 bytes before its values; the slotted record
+    costs ~130. Values that repeat across messages (type, sender,
+    recipient, phone_number) are interned, so a million payments to the
+    same merchant share one name string.
+    
+    With a BodyStore, raw_message is kept as a reference into the body
+    file and decoded only when the field is read (for example when the
+    record is serialized with it).
+    
+    The record is a read-only Mapping with the dictionary's keys, so
+    t['amount'], t.get('sender'), 'fee' in t, dict(t) and iteration in
+    field order all work as before. json cannot encode it directly; pass
+    default=json_default (or use to_dict()).
+    """
+    
+    __slots__ = TRANSACTION_FIELDS[:-1] + ('_body', '_body_store')
+    
+    def __init__(self, id, transaction_id, type, amount, sender, recipient, phone_number,
+                 fee, new_balance, timestamp, readable_date, raw_message, body_store=None):
+        self.id = id
+        self.transaction_id = transaction_id
+        self.type = _intern(type)
+        self.amount = amount
+        self.sender = _intern(sender)
+        self.recipient = _intern(recipient)
+        self.phone_number = _intern(phone_number)
+        self.fee = fee
+        self.new_balance = new_balance
+        self.timestamp = timestamp
+        self.readable_date = readable_date
+        self._body = raw_message if body_store is None else body_store.add(raw_message)
+        self._body_store = body_store
+    
+    @classmethod
+    def with_body_reference(cls, fields, reference, body_store):
+        """
+        Record whose body is already in `body_store` under `reference`.
+        
+        Strings are taken as they are (not interned): this is for bulk
+        loads whose repeated values are already shared, such as a
+        snapshot's string table.
+        
+        Args:
+            fields: Values of every field but raw_message, in field order
+        """
+        record = cls.__new__(cls)
+        (record.id, record.transaction_id, record.type, record.amount, record.sender,
+         record.recipient, record.phone_number, record.fee, record.new_balance,
+         record.timestamp, record.readable_date) = fields
+        record._body = reference
+        record._body_store = body_store
+        return record
+    
+    @property
+    def raw_message(self):
+        if self._body_store is None:
+            return self._body
+        return self._body_store.read(self._body)
+    
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELD_SET else default
+    
+    def __contains__(self, key):
+        return key in _FIELD_SET
+    
+    def __iter__(self):
+        return iter(TRANSACTION_FIELDS)
+    
+    def __len__(self):
+        return len(TRANSACTION_FIELDS)
+    
+    def to_dict(self):
+        """Plain dictionary copy (the original parser output)."""
+        return {name: getattr(self, name) for name in TRANSACTION_FIELDS}
+    
+    def __reduce__(self):
+        return Transaction, tuple(getattr(self, name) for name in TRANSACTION_FIELDS)
+    
+    def __repr__(self):
+        return f'Transaction({self.to_dict()!r})'
+
+
+def json_default(obj):
+    """
+    `default` hook for json.dump(s) that encodes Transaction records.
+    
+    Example:
+        json.dumps(transactions, default=json_default)
+    """
+    if isinstance(obj, Transaction):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def build_transaction(transaction_id, body, date_timestamp, readable_date, details=None,
+                      body_store=None):
+    """
+    Create the structured transaction object for one SMS.
+    
+    Args:
+        transaction_id (int): Sequential ID assigned to the transaction
+        body (str): SMS message text
+        date_timestamp (str): Value of the 'date' attribute
+        readable_date (str): Value of the 'readable_date' attribute
+        details (dict): Pre-computed parse_sms_body() result (optional)
+        body_store (BodyStore): Keep the body there instead of in memory
+        
+    Returns:
+        Transaction: Compact, dict-like transaction record
+    """
+    if details is None:
+        details = parse_sms_body(body)
+    
+    return Transaction(
+        transaction_id,
+        details['transaction_id'],
+        details['type'],
+        details['amount'],
+        details['sender'],
+        details['recipient'],
+        details['phone_number'],
+        details['fee'],
+        details['new_balance'],
+        date_timestamp,
+        readable_date,
+        body,
+        body_store
+    )
+
+
+def iter_transactions(xml_file_path, start_id=1, min_date=None, body_store=None, parse_cache=None):
+    """
+    Parse an XML backup lazily, yielding one transaction at a time.
+    
+    Peak memory is independent of the number of <sms> elements, which
+    makes this the entry point for multi-million message backups.
+    Errors (missing file, malformed XML) propagate to the caller.
+    
+    Args:
+        xml_file_path (str): Path to XML file
+        start_id (int): ID assigned to the first yielded transaction
+        min_date (int): Skip messages whose 'date' is older than this
+        body_store (BodyStore): Keep message bodies there (optional)
+        parse_cache: Reuse stored parse_sms_body() results, e.g. an
+            etl.parse_cache.ParseCache (optional)
+        
+    Yields:
+        Transaction: Transaction record
+        
+    Example:
+        for trans in iter_transactions('modified_sms_v2.xml'):
+            print(trans['type'], trans['amount'])
+    """
+    transaction_id = start_id
+    
+    if parse_cache is not None:
+        # Bodies are looked up (and stored) a chunk at a time
+        for chunk in _iter_sms_chunks(xml_file_path, DEFAULT_CHUNK_SIZE, min_date=min_date):
+            bodies = [body for body, _, _ in chunk]
+            cached = parse_cache.get_many(bodies)
+            parsed = _parse_chunk([body for body, hit in zip(bodies, cached) if hit is None])
+            details = _merge_cached(bodies, cached, parsed, parse_cache)
+            yield from _build_chunk(chunk, details, transaction_id, body_store)
+            transaction_id += len(chunk)
+        return
+    
+    for sms in iter_sms_elements(xml_file_path, min_date=min_date):
+        body = sms.get('body', '')
+        
+        # Skip empty messages
+        if not body:
+            continue
+        
+        yield build_transaction(
+            transaction_id,
+            body,
+            sms.get('date', ''),
+            sms.get('readable_date', ''),
+            body_store=body_store
+        )
+        transaction_id += 1
+
+
+# ============================================================================
+# PARALLEL INGESTION
+# ============================================================================
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _parse_chunk(bodies):
+    """
+    Worker entry point: parse a chunk of SMS bodies in a child process.
+    
+    Args:
+        bodies (list): SMS message texts
+        
+    Returns:
+        list: parse_sms_body() result for each body, in the same order
+    """
+    return [parse_sms_body(body) for body in bodies]
+
+
+def _iter_sms_chunks(xml_file_path, chunk_size, min_date=None):
+    """
+    Group non-empty <sms> elements into lists of (body, date, readable_date).
+    """
+    chunk = []
+    
+    for sms in iter_sms_elements(xml_file_path, min_date=min_date):
+        body = sms.get('body', '')
+        if not body:
+            continue
+        
+        chunk.append((body, sms.get('date', ''), sms.get('readable_date', '')))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
+
+
+def iter_transactions_parallel(xml_file_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, start_id=1,
+                               min_date=None, body_store=None, parse_cache=None):
+    """
+    Parse an XML backup using a pool of worker processes.
+    
+    The main process streams <sms> elements and cuts them into chunks;
+    workers run parse_sms_body() on each chunk. Results are consumed in
+    submission order, so IDs are assigned exactly as iter_transactions()
+    would assign them. At most 2 * workers chunks are in flight, which
+    keeps memory bounded for arbitrarily large files.
+    
+    Args:
+        xml_file_path (str): Path to XML file
+        workers (int): Number of worker processes (default: CPU count)
+        chunk_size (int): Number of messages sent to a worker at once
+        start_id (int): ID assigned to the first yielded transaction
+        min_date (int): Skip messages whose 'date' is older than this
+        body_store (BodyStore): Keep message bodies there (optional)
+        parse_cache: Reuse stored parse_sms_body() results; only the
+            misses are sent to the workers (optional)
+        
+    Yields:
+        Transaction: Transaction record
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    if workers <= 1:
+        yield from iter_transactions(xml_file_path, start_id=start_id, min_date=min_date,
+                                     body_store=body_store, parse_cache=parse_cache)
+        return
+    
+    transaction_id = start_id
+    pending = deque()
+    
+    def finish(chunk, cached, future):
+        bodies = [body for body, _, _ in chunk]
+        details = future.result()
+        if parse_cache is not None:
+            details = _merge_cached(bodies, cached, details, parse_cache)
+        return _build_chunk(chunk, details, transaction_id, body_store)
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in _iter_sms_chunks(xml_file_path, chunk_size, min_date=min_date):
+            bodies = [body for body, _, _ in chunk]
+            cached = None
+            if parse_cache is not None:
+                cached = parse_cache.get_many(bodies)
+                bodies = [body for body, hit in zip(bodies, cached) if hit is None]
+            pending.append((chunk, cached, executor.submit(_parse_chunk, bodies)))
+            
+            # Backpressure: wait for the oldest chunk before reading further
+            if len(pending) >= 2 * workers:
+                chunk, cached, future = pending.popleft()
+                yield from finish(chunk, cached, future)
+                transaction_id += len(chunk)
+        
+        while pending:
+            chunk, cached, future = pending.popleft()
+            yield from finish(chunk, cached, future)
+            transaction_id += len(chunk)
+
+
+def _merge_cached(bodies, cached, parsed, parse_cache):
+    """
+    Fill the misses of a parse_cache.get_many() result with freshly
+    parsed details (in order) and store those in the cache.
+    """
+    parsed = iter(parsed)
+    details = []
+    fresh = []
+    for body, hit in zip(bodies, cached):
+        if hit is None:
+            hit = next(parsed)
+            fresh.append((body, hit))
+        details.append(hit)
+    if fresh:
+        parse_cache.put_many(fresh)
+    return details
+
+
+def _build_chunk(chunk, parsed_details, first_id, body_store=None):
+    """
+    Combine a chunk with its worker results into transaction records.
+    """
+    return [
+        build_transaction(first_id + offset, body, date_timestamp, readable_date, details,
+                          body_store)
+        for offset, ((body, date_timestamp, readable_date), details)
+        in enumerate(zip(chunk, parsed_details))
+    ]
+
+
+def parse_xml_to_json(xml_file_path, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, records=False,
+                      lazy_bodies=False, parse_cache=None):
     """
     Parse XML file and convert to JSON-compatible list of transactions.
     
+    Thin wrapper around iter_transactions() for callers that need the
+    full list in memory. With workers > 1 the messages are parsed in a
+    process pool via iter_transactions_parallel().
+    
     Args:
         xml_file_path (str): Path to XML file
+        workers (int): Number of parser processes (None = CPU count)
+        chunk_size (int): Messages per worker task in parallel mode
+        records (bool): Return compact Transaction records instead of
+            dictionaries (a third of the memory; encode them with
+            default=json_default)
+        lazy_bodies (bool): With records, keep message bodies in a
+            memory-mapped BodyStore and decode raw_message only when it
+            is read
+        parse_cache: Reuse stored parse_sms_body() results (optional)
         
     Returns:
-        list: List of transaction dictionaries
+        list: List of transaction dictionaries, or of Transaction records
+        if `records` is set
         
     Example:
         transactions = parse_xml_to_json('modified_sms_v2.xml')
         print(f"Loaded {len(transactions)} transactions")
     """
     try:
-        # Parse the XML file
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        
         print(f"Parsing XML file: {xml_file_path}")
-        print(f"Total SMS messages found: {root.get('count', 'unknown')}")
+        print(f"Total SMS messages found: {read_declared_count(xml_file_path)}")
         
-        transactions = []
-        transaction_id = 1
-        
-        # Iterate through each SMS element
-        for sms in root.findall('sms'):
-            # Get basic attributes
-            body = sms.get('body', '')
-            date_timestamp = sms.get('date', '')
-            readable_date = sms.get('readable_date', '')
-            
-            # Skip empty messages
-            if not body:
-                continue
-            
-            # Parse the SMS body for transaction details
-            details = parse_sms_body(body)
-            
-            # Create structured transaction object
-            transaction = {
-                'id': transaction_id,
-                'transaction_id': details['transaction_id'],
-                'type': details['type'],
-                'amount': details['amount'],
-                'sender': details['sender'],
-                'recipient': details['recipient'],
-                'phone_number': details['phone_number'],
-                'fee': details['fee'],
-                'new_balance': details['new_balance'],
-                'timestamp': date_timestamp,
-                'readable_date': readable_date,
-                'raw_message': body
-            }
-            
-            transactions.append(transaction)
-            transaction_id += 1
+        body_store = BodyStore() if lazy_bodies and records else None
+        parsed = iter_transactions_parallel(
+            xml_file_path, workers=workers, chunk_size=chunk_size, body_store=body_store,
+            parse_cache=parse_cache)
+        transactions = list(parsed) if records else [t.to_dict() for t in parsed]
         
         print(f"Successfully parsed {len(transactions)} transactions")
         return transactions
@@ -183,7 +712,7 @@ def save_to_json(transactions, output_file='transactions.json'):
     """
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(transactions, f, indent=2, ensure_ascii=False)
+            json.dump(transactions, f, indent=2, ensure_ascii=False, default=json_default)
         print(f"Saved {len(transactions)} transactions to {output_file}")
     except Exception as e:
         print(f"Error saving to JSON: {e}")
@@ -0,0 +1,73 @@
+"""
+Normalize Stage
+===============
+
+Cleans parsed transactions before they are loaded:
+    - collapses stray whitespace in party names
+    - lowercases the transaction type
+    - converts the SMS 'date' attribute to an integer timestamp (ms)
+"""
+
+
+def normalize_name(name):
+    """
+    Collapse internal whitespace in a party name.
+
+    Args:
+        name (str): Raw name extracted from the SMS body
+
+    Returns:
+        str: Cleaned name, or None if nothing is left
+    """
+    if not name:
+        return None
+    cleaned = ' '.join(name.split())
+    return cleaned or None
+
+
+def normalize_timestamp(value):
+    """
+    Convert an SMS 'date' attribute to milliseconds since the epoch.
+
+    Args:
+        value (str): Timestamp text from the XML
+
+    Returns:
+        int: Timestamp in milliseconds, or None if not numeric
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_transaction(transaction):
+    """
+    Return a cleaned copy of one parsed transaction.
+
+    Args:
+        transaction (dict): Transaction from the parse stage
+
+    Returns:
+        dict: Normalized transaction
+    """
+    cleaned = dict(transaction)
+    cleaned['type'] = (transaction.get('type') or 'unknown').lower()
+    cleaned['sender'] = normalize_name(transaction.get('sender'))
+    cleaned['recipient'] = normalize_name(transaction.get('recipient'))
+    cleaned['timestamp'] = normalize_timestamp(transaction.get('timestamp'))
+    return cleaned
+
+
+def normalize(transactions):
+    """
+    Normalize a stream of transactions lazily.
+
+    Args:
+        transactions: Iterable of parsed transactions
+
+    Yields:
+        dict: Normalized transaction
+    """
+    for transaction in transactions:
+        yield normalize_transaction(transaction)
@@ -0,0 +1,79 @@
+"""
+ETL Pipeline Configuration
+==========================
+
+Central settings for the parse -> normalize -> load pipeline.
+Every value can be overridden with the environment variable of the
+same name (see .env.example).
+"""
+
+import os
+
+# Project root (one level above etl/)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env_int(name, default):
+    """Read an integer setting from the environment."""
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name, default):
+    """Read a float setting from the environment."""
+    return float(os.environ.get(name, default))
+
+
+def _env_bool(name, default):
+    """Read an on/off setting (1/true/yes) from the environment."""
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ('1', 'true', 'yes')
+
+
+# ============================================================================
+# FILE LOCATIONS
+# ============================================================================
+
+XML_FILE = os.environ.get('ETL_XML_FILE', os.path.join(BASE_DIR, 'modified_sms_v2.xml'))
+DB_PATH = os.environ.get('ETL_DB_PATH', os.path.join(BASE_DIR, 'data', 'db.sqlite3'))
+LOG_FILE = os.environ.get('ETL_LOG_FILE', os.path.join(BASE_DIR, 'data', 'logs', 'etl_logs', 'etl.log'))
+SCHEMA_FILE = os.path.join(BASE_DIR, 'database', 'database_setup_sqlite.sql')
+
+# Derived data that can be rebuilt at any time lives in the user's cache
+# directory ($XDG_CACHE_HOME, ~/.cache by default), not in the source tree
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                         'momo-sms')
+PARSE_CACHE_PATH = os.environ.get('ETL_PARSE_CACHE_PATH', os.path.join(CACHE_DIR, 'parse_cache.sqlite3'))
+SNAPSHOT_PATH = os.environ.get('ETL_SNAPSHOT_PATH', os.path.join(CACHE_DIR, 'snapshot.bin'))
+
+# ============================================================================
+# PIPELINE TUNING
+# ============================================================================
+
+# Parser processes (1 = parse in the pipeline thread)
+PARSE_WORKERS = _env_int('ETL_PARSE_WORKERS', 1)
+
+# Messages handed to a parser process at once
+PARSE_CHUNK_SIZE = _env_int('ETL_PARSE_CHUNK_SIZE', 2000)
+
+# Reuse parse results across imports in etl/run.py and etl/snapshot.py
+# (off unless enabled here or with --parse-cache)
+PARSE_CACHE = _env_bool('ETL_PARSE_CACHE', False)
+
+# Start the API server's memory store from a dataset snapshot (off unless
+# enabled here or with --snapshot)
+SNAPSHOT = _env_bool('ETL_SNAPSHOT', False)
+
+# Distinct message bodies kept in the parse cache
+PARSE_CACHE_SIZE = _env_int('ETL_PARSE_CACHE_SIZE', 2000000)
+
+# Records per item passed between stages
+BATCH_SIZE = _env_int('ETL_BATCH_SIZE', 500)
+
+# Maximum batches waiting between two stages (backpressure bound)
+QUEUE_SIZE = _env_int('ETL_QUEUE_SIZE', 8)
+
+# Rows per executemany() call and per database transaction in the loader
+LOAD_BATCH_SIZE = _env_int('ETL_LOAD_BATCH_SIZE', 20000)
+
+# Seconds between queue depth samples in the log
+METRICS_INTERVAL = _env_float('ETL_METRICS_INTERVAL', 1.0)
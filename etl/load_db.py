@@ -0,0 +1,373 @@
+"""
+Load Stage
+==========
+
+Bulk-loads normalized transactions into the SQLite database
+(data/db.sqlite3).
+
+The schema comes from database/database_setup_sqlite.sql, the SQLite
+translation of database/database_setup.sql. Rows are written with large
+executemany() batches, each inside one explicit transaction, on a
+connection tuned for bulk writes (WAL journal, relaxed sync, big page
+cache). Every row is upserted on its source key, so re-running the ETL
+over the same backup updates rows in place instead of duplicating them.
+
+A database created by the first version of the loader (a transactions
+table without source_key) is migrated when it is opened: the missing
+columns are added, source_key is filled in for the existing rows and
+made unique.
+
+After a successful load the newest message (timestamp and transaction
+ID) is stored in etl_watermark; the parse stage uses it to skip messages
+that were already loaded. There is one watermark per backup file, keyed
+by its absolute path and checked against a hash of the file's first
+messages, so a replaced or different backup is read in full.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import sys
+import os
+import zlib
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from etl import config
+
+logger = logging.getLogger('etl')
+
+# Applied to every connection opened by the loader
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',       # 64 MB page cache
+    'PRAGMA mmap_size = 268435456',     # 256 MB memory-mapped I/O
+    'PRAGMA wal_autocheckpoint = 16384',  # checkpoint every ~64 MB of WAL
+    'PRAGMA foreign_keys = ON',
+)
+
+UPSERT_SQL = """
+INSERT INTO transactions (
+    source_key, transaction_id, category_id, type, amount, fee_amount,
+    balance_after, sender, recipient, phone_number, timestamp,
+    readable_date, raw_message
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_key) DO UPDATE SET
+    transaction_id = excluded.transaction_id,
+    category_id = excluded.category_id,
+    type = excluded.type,
+    amount = excluded.amount,
+    fee_amount = excluded.fee_amount,
+    balance_after = excluded.balance_after,
+    sender = excluded.sender,
+    recipient = excluded.recipient,
+    phone_number = excluded.phone_number,
+    timestamp = excluded.timestamp,
+    readable_date = excluded.readable_date,
+    raw_message = excluded.raw_message
+"""
+
+
+def connect(db_path, schema_file=config.SCHEMA_FILE):
+    """
+    Open the database with bulk-load pragmas and make sure the schema exists.
+
+    The connection runs in autocommit mode (isolation_level=None) so that
+    transactions are controlled explicitly with BEGIN/COMMIT.
+
+    Args:
+        db_path (str): Path to the SQLite file
+        schema_file (str): SQLite schema script
+
+    Returns:
+        sqlite3.Connection: Open connection
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+    with open(schema_file, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    migrate(conn)
+
+    return conn
+
+
+# Columns of database_setup_sqlite.sql's transactions table that older
+# databases may lack (added without the defaults ALTER TABLE cannot add)
+MIGRATED_COLUMNS = (
+    ('source_key', 'TEXT'),
+    ('sender_id', 'INTEGER REFERENCES customers(id)'),
+    ('receiver_id', 'INTEGER REFERENCES customers(id)'),
+    ('category_id', 'INTEGER REFERENCES transaction_categories(id)'),
+    ('extra', 'TEXT'),
+    ('created_at', 'TEXT'),
+)
+
+# Same for etl_watermark (rows written before watermarks were per file)
+MIGRATED_WATERMARK_COLUMNS = (
+    ('fingerprint', 'TEXT'),
+)
+
+SOURCE_KEY_INDEX = 'CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_source_key ON transactions(source_key)'
+
+
+def _missing_columns(conn, table, wanted):
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    return [(name, definition) for name, definition in wanted if name not in columns]
+
+
+def migrate(conn):
+    """
+    Bring older transactions and etl_watermark tables up to the current schema.
+
+    Adds the missing columns, computes source_key for rows loaded
+    without one and creates the unique index the upsert relies on. Does
+    nothing on a database created from the current schema.
+
+    Raises:
+        sqlite3.IntegrityError: If existing rows share a source key (the
+            same message stored twice); the message names the key
+    """
+    missing = _missing_columns(conn, 'transactions', MIGRATED_COLUMNS)
+    missing_watermark = _missing_columns(conn, 'etl_watermark', MIGRATED_WATERMARK_COLUMNS)
+    if not missing and not missing_watermark:
+        return
+
+    conn.execute('BEGIN')
+    try:
+        for name, definition in missing_watermark:
+            conn.execute(f'ALTER TABLE etl_watermark ADD COLUMN {name} {definition}')
+        for name, definition in missing:
+            conn.execute(f'ALTER TABLE transactions ADD COLUMN {name} {definition}')
+
+        if missing:
+            rows = conn.execute('SELECT id, transaction_id, timestamp, raw_message FROM transactions '
+                                'WHERE source_key IS NULL').fetchall()
+            keys = {}
+            for row_id, transaction_id, timestamp, raw_message in rows:
+                key = source_key({'transaction_id': transaction_id, 'timestamp': timestamp,
+                                  'raw_message': raw_message})
+                if key in keys:
+                    raise sqlite3.IntegrityError(
+                        f"Cannot migrate transactions: rows {keys[key]} and {row_id} are the same "
+                        f"message (source key {key!r}); delete one of them and run again")
+                keys[key] = row_id
+            conn.executemany('UPDATE transactions SET source_key = ? WHERE id = ?', keys.items())
+            conn.execute(SOURCE_KEY_INDEX)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+# Bytes after the <smses ...> start tag hashed to recognise a backup.
+# Backups only grow at the end, so these stay the same across exports,
+# while the start tag's count attribute does not.
+FINGERPRINT_BYTES = 64 * 1024
+
+# The watermark only moves backwards when the file behind it was replaced
+SAVE_WATERMARK_SQL = """
+INSERT INTO etl_watermark (source, last_timestamp, last_transaction_id, fingerprint, updated_at)
+VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT(source) DO UPDATE SET
+    last_timestamp = excluded.last_timestamp,
+    last_transaction_id = excluded.last_transaction_id,
+    fingerprint = excluded.fingerprint,
+    updated_at = excluded.updated_at
+WHERE excluded.last_timestamp >= etl_watermark.last_timestamp
+   OR excluded.fingerprint IS NOT etl_watermark.fingerprint
+"""
+
+
+def fingerprint(xml_file, length=FINGERPRINT_BYTES):
+    """
+    Hash the first `length` bytes of messages in a backup: the bytes after
+    the <smses ...> start tag, up to the closing tag at most.
+
+    Args:
+        xml_file (str): Path to the SMS backup
+        length (int): Bytes to hash (fewer if the file is shorter)
+
+    Returns:
+        str: '<bytes hashed>:<sha256 hex digest>'
+    """
+    with open(xml_file, 'rb') as f:
+        head = f.read(4096)
+        root_start = head.find(b'<smses')
+        f.seek(head.find(b'>', root_start) + 1 if root_start >= 0 else 0)
+        data = f.read(length)
+    root_end = data.find(b'</smses')
+    if root_end >= 0:
+        data = data[:root_end]
+    return f'{len(data)}:{hashlib.sha256(data).hexdigest()}'
+
+
+def source_identity(xml_file):
+    """
+    Identify a backup file for its watermark.
+
+    Args:
+        xml_file (str): Path to the SMS backup
+
+    Returns:
+        dict: {'source': absolute path, 'fingerprint': str}
+    """
+    return {'source': os.path.abspath(xml_file), 'fingerprint': fingerprint(xml_file)}
+
+
+def read_watermark(db_path, xml_file):
+    """
+    Return the newest message loaded so far from this backup file.
+
+    The stored watermark is ignored when the file is no longer the one it
+    was taken from, i.e. the messages it started with have changed.
+
+    Args:
+        db_path (str): Path to the SQLite file
+        xml_file (str): Path to the SMS backup about to be parsed
+
+    Returns:
+        dict: {'timestamp': int, 'transaction_id': str or None}, or None
+        if nothing has been loaded from this file yet
+    """
+    conn = connect(db_path)
+    try:
+        row = conn.execute(
+            'SELECT last_timestamp, last_transaction_id, fingerprint FROM etl_watermark WHERE source = ?',
+            (os.path.abspath(xml_file),)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if row is None:
+        return None
+
+    timestamp, transaction_id, stored = row
+    # Compare the same number of bytes the stored fingerprint covers
+    if stored is None or fingerprint(xml_file, int(stored.split(':', 1)[0])) != stored:
+        logger.info("%s changed since its last load, ignoring watermark %s", xml_file, timestamp)
+        return None
+    return {'timestamp': timestamp, 'transaction_id': transaction_id}
+
+
+def save_watermark(conn, identity, timestamp, transaction_id):
+    """
+    Advance a file's watermark (never moves it backwards for the same file).
+
+    Args:
+        conn (sqlite3.Connection): Open connection
+        identity (dict): source_identity() of the backup the rows came from
+        timestamp (int): Newest message's timestamp
+        transaction_id (str): Newest message's transaction ID, or None
+    """
+    conn.execute(SAVE_WATERMARK_SQL, (identity['source'], timestamp, transaction_id,
+                                      identity['fingerprint']))
+
+
+def load_categories(conn):
+    """
+    Map category codes (transaction types) to transaction_categories ids.
+    """
+    return dict(conn.execute('SELECT category_code, id FROM transaction_categories'))
+
+
+def source_key(transaction):
+    """
+    Stable upsert key for a transaction.
+
+    Uses the SMS transaction ID when there is one. Messages without an ID
+    (transfers, bank deposits) fall back to their timestamp plus a CRC32 of
+    the body, which is identical across re-imports of the same message.
+    """
+    if transaction.get('transaction_id'):
+        return transaction['transaction_id']
+
+    body = transaction.get('raw_message') or ''
+    checksum = zlib.crc32(body.encode('utf-8'))
+    return f"sms:{transaction.get('timestamp')}:{checksum:08x}"
+
+
+def to_row(transaction, categories):
+    """
+    Convert a normalized transaction to an UPSERT_SQL parameter tuple.
+    """
+    trans_type = transaction.get('type') or 'unknown'
+    return (
+        source_key(transaction),
+        transaction.get('transaction_id'),
+        categories.get(trans_type),
+        trans_type,
+        transaction.get('amount'),
+        transaction.get('fee'),
+        transaction.get('new_balance'),
+        transaction.get('sender'),
+        transaction.get('recipient'),
+        transaction.get('phone_number'),
+        transaction.get('timestamp'),
+        transaction.get('readable_date'),
+        transaction.get('raw_message'),
+    )
+
+
+def write_batch(conn, rows):
+    """
+    Upsert one batch of rows inside a single explicit transaction.
+    """
+    conn.execute('BEGIN')
+    try:
+        conn.executemany(UPSERT_SQL, rows)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def load(transactions, db_path, batch_size=config.LOAD_BATCH_SIZE, source=None):
+    """
+    Upsert a stream of transactions in large batches.
+
+    Args:
+        transactions: Iterable of normalized transactions
+        db_path (str): Path to the SQLite file
+        batch_size (int): Rows per executemany call / transaction
+        source (dict): source_identity() of the backup being loaded; its
+            watermark is advanced after the load (None = no watermark)
+
+    Returns:
+        int: Number of rows written (inserted or updated)
+    """
+    conn = connect(db_path)
+    categories = load_categories(conn)
+    written = 0
+    batch = []
+    newest = None
+
+    try:
+        for transaction in transactions:
+            batch.append(to_row(transaction, categories))
+
+            timestamp = transaction.get('timestamp')
+            if timestamp is not None and (newest is None or timestamp >= newest[0]):
+                newest = (timestamp, transaction.get('transaction_id'))
+
+            if len(batch) >= batch_size:
+                write_batch(conn, batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            write_batch(conn, batch)
+            written += len(batch)
+
+        if newest is not None and source is not None:
+            save_watermark(conn, source, *newest)
+
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('PRAGMA optimize')
+    finally:
+        conn.close()
+
+    return written
@@ -0,0 +1,198 @@
+"""
+Parse Cache
+===========
+
+Persistent cache of parse_sms_body() results, keyed by a hash of the SMS
+body, so a message seen by an earlier import (an overlapping backup, a
+full re-run, a snapshot rebuild) skips regex extraction.
+
+Entries live in a small SQLite database (parse_cache.sqlite3 in the
+user's cache directory, see etl/config.py), one row per distinct body: a
+16-byte BLAKE2b digest of the text and the extracted fields as columns.
+Lookups and inserts are batched per parser chunk. etl/run.py and
+etl/snapshot.py only use the cache when it is enabled (ETL_PARSE_CACHE=1,
+or run.py --parse-cache).
+
+The database stores the PARSER_KEY it was filled with; opening it with a
+parser whose rules changed empties it. It holds at most `max_entries`
+rows: each open starts a new generation that new rows are stamped with,
+and close() evicts rows from the oldest generations first. Once the
+cache is full, hits also move their rows to the current generation; below
+the bound nothing is written for hits, since rewriting a row costs more
+than the regexes it saves. Every chunk's writes are committed as it is
+processed, so a long import never holds one open write transaction and a
+crash keeps the chunks already stored.
+
+Usage (see dsa.xml_parser.iter_transactions):
+    with ParseCache() as cache:
+        for trans in iter_transactions(xml_file, parse_cache=cache):
+            ...
+"""
+
+import hashlib
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from etl import config
+from dsa.xml_parser import PARSER_KEY
+
+# parse_sms_body() result keys, stored one per column
+DETAIL_FIELDS = ('transaction_id', 'amount', 'recipient', 'sender', 'type', 'fee',
+                 'new_balance', 'phone_number')
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS parse_cache_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    """
+    CREATE TABLE IF NOT EXISTS parse_cache (
+        digest BLOB PRIMARY KEY,
+        transaction_id TEXT,
+        amount INTEGER,
+        recipient TEXT,
+        sender TEXT,
+        type TEXT,
+        fee INTEGER,
+        new_balance INTEGER,
+        phone_number TEXT,
+        used INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+)
+
+SELECT_SQL = 'SELECT digest, %s FROM parse_cache WHERE digest IN (%%s)' % ', '.join(DETAIL_FIELDS)
+TOUCH_SQL = 'UPDATE parse_cache SET used = ? WHERE digest = ? AND used < ?'
+INSERT_SQL = 'INSERT OR REPLACE INTO parse_cache (digest, %s, used) VALUES (%s)' % (
+    ', '.join(DETAIL_FIELDS), ', '.join('?' * (len(DETAIL_FIELDS) + 2)))
+
+# Digests per SELECT/UPDATE (below SQLite's default bound-parameter limit)
+LOOKUP_BATCH = 500
+
+
+def body_digest(body):
+    """Cache key of an SMS body."""
+    return hashlib.blake2b(body.encode('utf-8'), digest_size=16).digest()
+
+
+class ParseCache:
+    """
+    SQLite-backed cache of parse_sms_body() results.
+
+    A connection belongs to the thread that opened the cache, so open it
+    where the parsing runs (the ETL parse stage thread).
+
+    Args:
+        path (str): Cache database file
+        max_entries (int): Rows kept after close()
+    """
+
+    def __init__(self, path=config.PARSE_CACHE_PATH, max_entries=config.PARSE_CACHE_SIZE):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with self.conn:
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            meta = dict(self.conn.execute('SELECT key, value FROM parse_cache_meta'))
+            if meta.get('parser') != PARSER_KEY:
+                self.conn.execute('DELETE FROM parse_cache')
+                meta = {}
+            self.generation = int(meta.get('generation', 0)) + 1
+            (self.count,) = self.conn.execute('SELECT COUNT(*) FROM parse_cache').fetchone()
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO parse_cache_meta (key, value) VALUES (?, ?)',
+                (('parser', PARSER_KEY), ('generation', str(self.generation))))
+
+    def get_many(self, bodies):
+        """
+        Look up the parse results of many bodies.
+
+        Returns:
+            list: parse_sms_body()-style dict per body, or None for a miss
+        """
+        digests = [body_digest(body) for body in bodies]
+        found = {}
+        for start in range(0, len(digests), LOOKUP_BATCH):
+            batch = digests[start:start + LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            found.update((row[0], row[1:])
+                         for row in self.conn.execute(SELECT_SQL % placeholders, batch))
+
+        if found and self.count >= self.max_entries:
+            # Rows from earlier sessions become the newest (once per session)
+            with self.conn:
+                self.conn.executemany(TOUCH_SQL, ((self.generation, digest, self.generation)
+                                                  for digest in found))
+        self.hits += len(found)
+        self.misses += len(digests) - len(found)
+        fields = DETAIL_FIELDS
+        return [None if row is None else dict(zip(fields, row))
+                for row in map(found.get, digests)]
+
+    def put_many(self, parsed):
+        """
+        Store parse results (committed before returning).
+
+        Args:
+            parsed: Iterable of (body, parse_sms_body() result) pairs
+        """
+        with self.conn:
+            self.count += self.conn.executemany(INSERT_SQL, (
+                (body_digest(body),) + tuple(details[field] for field in DETAIL_FIELDS)
+                + (self.generation,)
+                for body, details in parsed)).rowcount
+
+    def evict(self):
+        """Trim the cache to max_entries rows, oldest generation first."""
+        (count,) = self.conn.execute('SELECT COUNT(*) FROM parse_cache').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                'DELETE FROM parse_cache WHERE digest IN '
+                '(SELECT digest FROM parse_cache ORDER BY used LIMIT ?)', (excess,))
+            self.evictions += excess
+        self.count = min(count, self.max_entries)
+
+    def stats(self):
+        """Return the hit/miss counters of this session."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        """Evict, commit and close the connection."""
+        with self.conn:
+            self.evict()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_parse_cache(path):
+    """
+    Open a parse cache if one is configured.
+
+    Args:
+        path (str): Cache database file, or None for no cache
+
+    Returns:
+        ParseCache: The cache, or None
+    """
+    return ParseCache(path) if path else None
@@ -0,0 +1,146 @@
+"""
+Parse Stage
+===========
+
+Streams transactions out of the SMS backup. Wraps the incremental
+parser in dsa/xml_parser.py so the stage never holds the whole file.
+
+Incremental runs
+----------------
+Phone backups only grow at the end, so when a watermark from a previous
+run is available the stage does not re-read the old messages:
+
+    1. The raw file is memory-mapped and searched (at memory speed) for the
+       watermark's date attribute. If found, and the watermark's transaction
+       ID sits in that same element, XML parsing starts at that element,
+       behind a copy of the original <smses ...> start tag.
+    2. Otherwise the whole file is parsed, but messages older than the
+       watermark are dropped on their 'date' attribute before any regex
+       extraction runs.
+
+The watermark message itself is re-emitted; the loader's upsert makes
+that harmless.
+
+Bodies already parsed by an earlier run come from the parse cache
+(etl/parse_cache.py) instead of being run through the regexes again.
+"""
+
+import logging
+import mmap
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import iter_transactions_parallel
+from etl import config
+
+logger = logging.getLogger('etl')
+
+
+class ResumedBackup:
+    """
+    Read-only binary file object presenting the backup's prolog (XML
+    declaration and <smses> start tag) followed by the file from `offset`.
+    """
+
+    def __init__(self, xml_file, prolog, offset):
+        self._prolog = prolog
+        self._file = open(xml_file, 'rb')
+        self._file.seek(offset)
+
+    def read(self, size=-1):
+        if self._prolog:
+            if size is None or size < 0:
+                data, self._prolog = self._prolog + self._file.read(), b''
+                return data
+            data, self._prolog = self._prolog[:size], self._prolog[size:]
+            return data
+        return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+
+def find_resume_point(xml_file, watermark):
+    """
+    Locate the watermark message in the raw backup bytes.
+
+    Args:
+        xml_file (str): Path to XML file
+        watermark (dict): {'timestamp': int, 'transaction_id': str or None}
+
+    Returns:
+        tuple: (prolog_bytes, element_offset), or None if the watermark
+        message cannot be found
+    """
+    with open(xml_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            root_start = mm.find(b'<smses')
+            root_end = mm.find(b'>', root_start) + 1
+            if root_start < 0 or root_end <= 0:
+                return None
+
+            # Leading space keeps readable_date="..." from matching
+            marker = b' date="%d"' % watermark['timestamp']
+            position = mm.find(marker, root_end)
+            if position < 0:
+                return None
+
+            element_start = mm.rfind(b'<sms', root_end, position)
+            element_end = mm.find(b'<sms', position)
+            if element_start < 0:
+                return None
+            if element_end < 0:
+                element_end = len(mm)
+
+            txid = watermark.get('transaction_id')
+            if txid and mm.find(txid.encode('utf-8'), element_start, element_end) < 0:
+                return None
+
+            return mm[:root_end], element_start
+
+
+def extract(xml_file, watermark=None, workers=config.PARSE_WORKERS,
+            chunk_size=config.PARSE_CHUNK_SIZE, parse_cache=None):
+    """
+    Yield parsed transactions from an XML backup, one at a time.
+
+    Args:
+        xml_file (str): Path to XML file
+        watermark (dict): Newest message of the previous run, or None to
+            process the whole backup
+        workers (int): Parser processes (1 = parse in the calling thread)
+        chunk_size (int): Messages per parser task in parallel mode
+        parse_cache (ParseCache): Stored parse results to reuse (optional)
+
+    Yields:
+        Transaction: Transaction record as built by dsa.xml_parser
+    """
+    if not watermark or watermark.get('timestamp') is None:
+        yield from iter_transactions_parallel(xml_file, workers=workers, chunk_size=chunk_size,
+                                              parse_cache=parse_cache)
+        return
+
+    min_date = watermark['timestamp']
+    resume = find_resume_point(xml_file, watermark)
+
+    if resume is None:
+        logger.info("watermark %s not found in %s, scanning full file", min_date, xml_file)
+        yield from iter_transactions_parallel(
+            xml_file, workers=workers, chunk_size=chunk_size, min_date=min_date,
+            parse_cache=parse_cache)
+        return
+
+    prolog, offset = resume
+    logger.info("resuming %s at byte %d (watermark %s)", xml_file, offset, min_date)
+    source = ResumedBackup(xml_file, prolog, offset)
+    try:
+        yield from iter_transactions_parallel(
+            source, workers=workers, chunk_size=chunk_size, min_date=min_date,
+            parse_cache=parse_cache)
+    finally:
+        source.close()
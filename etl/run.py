@@ -0,0 +1,294 @@
+"""
+ETL Pipeline Entry Point
+========================
+
+Runs the parse -> normalize -> load stages concurrently. Stages are
+connected by bounded queues carrying small batches of records, so a slow
+stage applies backpressure upstream instead of letting data pile up in
+memory. Per-stage throughput and queue depth are written to
+data/logs/etl_logs/etl.log.
+
+Runs are incremental: only messages at or after the watermark stored by
+the previous run over the same backup file are parsed and loaded. Pass
+--full to reprocess the whole backup, and --snapshot to also rebuild the
+dataset snapshot the API server's memory store starts from
+(etl/snapshot.py), if stale. --parse-cache reuses the fields extracted by
+earlier imports (etl/parse_cache.py, kept in the user's cache directory).
+
+Usage:
+    python run.py [--full] [--snapshot] [--parse-cache] [xml_file] [db_path]
+
+Example:
+    python run.py ../modified_sms_v2.xml ../data/db.sqlite3
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from etl import config
+from etl.parse_xml import extract
+from etl.clean_narmalize import normalize
+from etl.load_db import load, read_watermark, source_identity
+from etl.parse_cache import open_parse_cache
+from etl.snapshot import refresh_snapshot
+
+# Marks the end of a stage's output on its queue
+_END = object()
+
+logger = logging.getLogger('etl')
+
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class StageMetrics:
+    """
+    Record count and timing for one pipeline stage.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self):
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# ============================================================================
+# QUEUE PLUMBING
+# ============================================================================
+
+def _put(out_queue, item, stop_event):
+    """Blocking put that gives up if the pipeline is aborted."""
+    while True:
+        if stop_event.is_set():
+            raise PipelineAborted()
+        try:
+            out_queue.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _drain(in_queue, stop_event):
+    """Yield records from an upstream queue until its end marker."""
+    while True:
+        try:
+            batch = in_queue.get(timeout=0.1)
+        except queue.Empty:
+            if stop_event.is_set():
+                raise PipelineAborted()
+            continue
+
+        if batch is _END:
+            return
+        yield from batch
+
+
+def _counted(records, metrics):
+    """Pass records through while counting them."""
+    for record in records:
+        metrics.count += 1
+        yield record
+
+
+def _feed(records, out_queue, batch_size, stop_event):
+    """Push records downstream in batches, then the end marker."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _put(out_queue, batch, stop_event)
+            batch = []
+
+    if batch:
+        _put(out_queue, batch, stop_event)
+    _put(out_queue, _END, stop_event)
+
+
+def _run_stage(metrics, work, stop_event, errors):
+    """Thread target: run one stage and record any failure."""
+    metrics.started = time.perf_counter()
+    try:
+        work()
+    except PipelineAborted:
+        pass
+    except Exception as e:
+        logger.exception("Stage %s failed", metrics.name)
+        errors.append(e)
+        stop_event.set()
+    finally:
+        metrics.finished = time.perf_counter()
+
+
+def _monitor(queues, stages, peaks, done_event, interval):
+    """Periodically log queue depth and running record counts."""
+    while not done_event.wait(interval):
+        for name, q in queues:
+            peaks[name] = max(peaks[name], q.qsize())
+        depths = ' '.join(f"{name}={q.qsize()}/{q.maxsize}" for name, q in queues)
+        counts = ' '.join(f"{s.name}={s.count}" for s in stages)
+        logger.info("queue depth: %s | records: %s", depths, counts)
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def setup_logging(log_file=config.LOG_FILE):
+    """
+    Send pipeline logs to the ETL log file and the console.
+    """
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    logger.handlers = [file_handler, console_handler]
+    logger.setLevel(logging.INFO)
+
+
+def run_pipeline(xml_file=config.XML_FILE, db_path=config.DB_PATH,
+                 batch_size=config.BATCH_SIZE, queue_size=config.QUEUE_SIZE,
+                 incremental=True, parse_cache=None):
+    """
+    Run the full ETL pipeline.
+
+    Args:
+        xml_file (str): Path to the SMS backup
+        db_path (str): Path to the SQLite database
+        batch_size (int): Records per queue item
+        queue_size (int): Maximum batches buffered between two stages
+        incremental (bool): Skip messages older than the stored watermark
+        parse_cache (str): Parse cache file to reuse results of earlier
+            imports from (None = no cache)
+
+    Returns:
+        dict: Per-stage record counts, durations and throughput
+
+    Raises:
+        Exception: The first error raised by any stage
+    """
+    stop_event = threading.Event()
+    done_event = threading.Event()
+    errors = []
+
+    parsed_queue = queue.Queue(maxsize=queue_size)
+    normalized_queue = queue.Queue(maxsize=queue_size)
+
+    parse_metrics = StageMetrics('parse')
+    normalize_metrics = StageMetrics('normalize')
+    load_metrics = StageMetrics('load')
+    stages = [parse_metrics, normalize_metrics, load_metrics]
+    queues = [('parse->normalize', parsed_queue), ('normalize->load', normalized_queue)]
+    peaks = {name: 0 for name, _ in queues}
+
+    # Taken before parsing: rows appended while the ETL runs are picked up next time
+    identity = source_identity(xml_file)
+    watermark = read_watermark(db_path, xml_file) if incremental else None
+    cache_stats = {}
+
+    def parse_stage():
+        # Opened here: the cache's SQLite connection belongs to this thread
+        cache = open_parse_cache(parse_cache)
+        try:
+            records = _counted(extract(xml_file, watermark, parse_cache=cache), parse_metrics)
+            _feed(records, parsed_queue, batch_size, stop_event)
+        finally:
+            if cache is not None:
+                cache.close()
+                cache_stats.update(cache.stats())
+
+    def normalize_stage():
+        records = _counted(normalize(_drain(parsed_queue, stop_event)), normalize_metrics)
+        _feed(records, normalized_queue, batch_size, stop_event)
+
+    def load_stage():
+        load(_counted(_drain(normalized_queue, stop_event), load_metrics), db_path,
+             source=identity)
+
+    logger.info("ETL started: %s -> %s (batch=%d, queue=%d, watermark=%s)",
+                xml_file, db_path, batch_size, queue_size,
+                watermark['timestamp'] if watermark else None)
+
+    threads = [
+        threading.Thread(target=_run_stage, args=(metrics, work, stop_event, errors),
+                         name=f"etl-{metrics.name}")
+        for metrics, work in zip(stages, (parse_stage, normalize_stage, load_stage))
+    ]
+    monitor = threading.Thread(
+        target=_monitor,
+        args=(queues, stages, peaks, done_event, config.METRICS_INTERVAL),
+        daemon=True
+    )
+
+    started = time.perf_counter()
+    monitor.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done_event.set()
+    elapsed = time.perf_counter() - started
+
+    summary = {'elapsed': elapsed, 'stages': {}, 'peak_queue_depth': peaks,
+               'parse_cache': cache_stats or None}
+    for metrics in stages:
+        logger.info("stage %-9s %8d records in %6.2fs (%10.0f rec/s)",
+                    metrics.name, metrics.count, metrics.elapsed, metrics.throughput)
+        summary['stages'][metrics.name] = {
+            'records': metrics.count,
+            'seconds': metrics.elapsed,
+            'records_per_second': metrics.throughput,
+        }
+
+    for name, _ in queues:
+        logger.info("queue %-16s peak depth %d/%d", name, peaks[name], queue_size)
+    if cache_stats:
+        logger.info("parse cache %d hits, %d misses, %d evicted",
+                    cache_stats['hits'], cache_stats['misses'], cache_stats['evictions'])
+
+    if errors:
+        logger.error("ETL aborted after %.2fs", elapsed)
+        raise errors[0]
+
+    logger.info("ETL finished in %.2fs", elapsed)
+    return summary
+
+
+if __name__ == '__main__':
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    full_run = '--full' in options
+    cache_path = config.PARSE_CACHE_PATH if '--parse-cache' in options or config.PARSE_CACHE else None
+
+    xml_path = args[0] if len(args) > 0 else config.XML_FILE
+    db_file = args[1] if len(args) > 1 else config.DB_PATH
+
+    setup_logging()
+    try:
+        run_pipeline(xml_path, db_file, incremental=not full_run, parse_cache=cache_path)
+        if '--snapshot' in options and refresh_snapshot(xml_path, parse_cache=cache_path):
+            logger.info("Snapshot written: %s", config.SNAPSHOT_PATH)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
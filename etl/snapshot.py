@@ -0,0 +1,387 @@
+"""
+Dataset Snapshot
+================
+
+Binary snapshot of a parsed SMS backup, so the API server's memory store
+(--memory) starts without re-parsing the XML and re-running every regex.
+
+File layout:
+
+    b'SMSSNAP\\0'              magic
+    u32 + JSON header          format and parser versions, byte order,
+                               record count, source file signature
+    sections                   each a u64 length followed by its bytes:
+                                 string table text
+                                 string end offsets (int64)
+                                 one array per field but raw_message
+                                 message body text
+                                 body references (int64)
+
+Integer fields are int64 arrays (INT_NULL for None). String fields are
+int32 indexes into one shared string table (-1 for None), so a type or
+merchant name repeated a million times is stored once. Message bodies
+are not loaded: the records read them through a BodyStore mapped over
+the body section, decoding raw_message only when it is read.
+
+A snapshot is used only if its format and the parser's PARSER_KEY match
+and the source XML is unchanged: same size and modification time or,
+when only the time differs, the same SHA-256. Otherwise
+load_transactions() parses the XML and writes a fresh snapshot for the
+next start.
+
+Usage:
+    python snapshot.py [xml_file] [snapshot_path]
+"""
+
+import gc
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+from itertools import chain
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from etl import config
+from etl.parse_cache import open_parse_cache
+from dsa.xml_parser import (BodyStore, PARSER_KEY, TRANSACTION_FIELDS, Transaction,
+                            parse_xml_to_json)
+
+MAGIC = b'SMSSNAP\0'
+FORMAT_VERSION = 1
+
+INT_FIELDS = frozenset(('id', 'amount', 'fee', 'new_balance'))
+COLUMN_FIELDS = TRANSACTION_FIELDS[:-1]     # raw_message is stored as body text
+INT_NULL = -2 ** 63
+
+_LENGTH = struct.Struct('<Q')
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_signature(xml_file):
+    """
+    Identify the content of a source file.
+
+    Returns:
+        dict: size, mtime_ns and sha256 of the file
+    """
+    stat = os.stat(xml_file)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _file_sha256(xml_file)}
+
+
+def _write_section(out, data):
+    out.write(_LENGTH.pack(len(data)))
+    out.write(data)
+
+
+def write_snapshot(transactions, path, signature):
+    """
+    Write parsed transactions to a snapshot file.
+
+    The file is written next to `path` and renamed into place, so a
+    server reading the previous snapshot is never handed a partial one.
+
+    Args:
+        transactions (list): Transaction records (or dictionaries) from the parser
+        path (str): Snapshot file to create
+        signature (dict): source_signature() of the XML they were parsed
+            from, taken before parsing
+
+    Returns:
+        int: Size of the snapshot in bytes
+
+    Raises:
+        ValueError: If a field does not have the parser's value types
+    """
+    header = {
+        'format': FORMAT_VERSION,
+        'parser': PARSER_KEY,
+        'byteorder': sys.byteorder,
+        'count': len(transactions),
+        'source': signature,
+        'created': time.time(),
+    }
+
+    strings = []
+    string_ids = {}
+
+    def string_id(value):
+        if value is None:
+            return -1
+        if not isinstance(value, str):
+            raise ValueError(f"Expected a string or None, got {value!r}")
+        number = string_ids.get(value)
+        if number is None:
+            number = string_ids[value] = len(strings)
+            strings.append(value)
+        return number
+
+    columns = []
+    for field in COLUMN_FIELDS:
+        values = [t[field] for t in transactions]
+        try:
+            if field in INT_FIELDS:
+                columns.append(array('q', [INT_NULL if v is None else v for v in values]))
+            else:
+                columns.append(array('i', map(string_id, values)))
+        except (OverflowError, TypeError) as e:
+            raise ValueError(f"Cannot store field '{field}': {e}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = path + '.tmp'
+
+    with open(temporary, 'wb') as out:
+        encoded_header = json.dumps(header).encode('utf-8')
+        out.write(MAGIC)
+        out.write(_HEADER_LENGTH.pack(len(encoded_header)))
+        out.write(encoded_header)
+
+        _write_section(out, ''.join(strings).encode('utf-8'))
+        ends = array('q')
+        end = 0
+        for string in strings:
+            end += len(string)
+            ends.append(end)
+        _write_section(out, ends.tobytes())
+        for column in columns:
+            _write_section(out, column.tobytes())
+
+        # Body text is streamed; its length is filled in afterwards
+        length_at = out.tell()
+        out.write(_LENGTH.pack(0))
+        references = array('q')
+        offset = 0
+        for transaction in transactions:
+            body = (transaction['raw_message'] or '').encode('utf-8')
+            if len(body) >> BodyStore.LENGTH_BITS:
+                raise ValueError(f"Message body too long ({len(body)} bytes)")
+            references.append(offset << BodyStore.LENGTH_BITS | len(body))
+            out.write(body)
+            offset += len(body)
+        after_bodies = out.tell()
+        out.seek(length_at)
+        out.write(_LENGTH.pack(offset))
+        out.seek(after_bodies)
+        _write_section(out, references.tobytes())
+        size = out.tell()
+
+    os.replace(temporary, path)
+    return size
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Suspend cyclic garbage collection while building millions of records.
+
+    Every allocation batch would otherwise trigger collections that walk
+    all the records built so far without freeing any of them (about half
+    the load time at 1M records).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_section(source):
+    (length,) = _LENGTH.unpack(source.read(_LENGTH.size))
+    data = source.read(length)
+    if len(data) != length:
+        raise ValueError("Truncated snapshot")
+    return data
+
+
+def _read_array(source, typecode, header):
+    values = array(typecode)
+    values.frombytes(_read_section(source))
+    if header['byteorder'] != sys.byteorder:
+        values.byteswap()
+    if len(values) != header['count']:
+        raise ValueError("Snapshot column has the wrong length")
+    return values
+
+
+def read_header(path):
+    """
+    Read a snapshot's header.
+
+    Returns:
+        dict: The header, or None if the file is not a snapshot of this
+        format and parser version
+    """
+    try:
+        with open(path, 'rb') as source:
+            if source.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = _HEADER_LENGTH.unpack(source.read(_HEADER_LENGTH.size))
+            header = json.loads(source.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+    if header.get('format') != FORMAT_VERSION or header.get('parser') != PARSER_KEY:
+        return None
+    return header
+
+
+def is_fresh(header, xml_file):
+    """
+    Check that a snapshot was made from the current content of xml_file.
+
+    Size and modification time are compared first; the file is hashed
+    only when the size matches but the time does not (a copy or touch).
+    """
+    source = header['source']
+    try:
+        stat = os.stat(xml_file)
+        if stat.st_size != source['size']:
+            return False
+        return stat.st_mtime_ns == source['mtime_ns'] or _file_sha256(xml_file) == source['sha256']
+    except OSError:
+        return False
+
+
+def load_snapshot(path, xml_file=None):
+    """
+    Load the transactions stored in a snapshot.
+
+    Args:
+        path (str): Snapshot file
+        xml_file (str): Source XML the snapshot must still match (optional)
+
+    Returns:
+        list: Transaction records, or None if the snapshot is missing,
+        stale, from another format or parser version, or damaged
+    """
+    header = read_header(path)
+    if header is None or (xml_file is not None and not is_fresh(header, xml_file)):
+        return None
+
+    try:
+        with open(path, 'rb') as source, _gc_paused():
+            source.seek(len(MAGIC))
+            (length,) = _HEADER_LENGTH.unpack(source.read(_HEADER_LENGTH.size))
+            source.seek(length, os.SEEK_CUR)
+
+            text = _read_section(source).decode('utf-8')
+            ends = array('q')
+            ends.frombytes(_read_section(source))
+            if header['byteorder'] != sys.byteorder:
+                ends.byteswap()
+            strings = [text[start:end] for start, end in zip(chain((0,), ends), ends)]
+            strings.append(None)    # index -1
+
+            columns = []
+            for field in COLUMN_FIELDS:
+                if field in INT_FIELDS:
+                    values = _read_array(source, 'q', header)
+                    columns.append([None if v == INT_NULL else v for v in values])
+                else:
+                    columns.append([strings[i] for i in _read_array(source, 'i', header)])
+
+            (body_size,) = _LENGTH.unpack(source.read(_LENGTH.size))
+            body_offset = source.tell()
+            source.seek(body_size, os.SEEK_CUR)
+            references = _read_array(source, 'q', header)
+    except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError):
+        return None
+
+    body_store = BodyStore.open(path, body_offset, body_size)
+    with _gc_paused():
+        return [Transaction.with_body_reference(values, reference, body_store)
+                for values, reference in zip(zip(*columns), references)]
+
+
+def _parse(xml_file, parse_cache=None):
+    """Parse a backup with lazy bodies, through a parse cache file if given."""
+    cache = open_parse_cache(parse_cache)
+    try:
+        return parse_xml_to_json(xml_file, records=True, lazy_bodies=True, parse_cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def load_transactions(xml_file, snapshot_path=None):
+    """
+    Load a backup's transactions from its snapshot, or parse the XML.
+
+    After a parse the snapshot is rewritten, so the next start is fast.
+
+    Args:
+        xml_file (str): SMS backup
+        snapshot_path (str): Snapshot file (None = always parse the XML)
+
+    Returns:
+        tuple: (list of Transaction records, True if read from the snapshot)
+    """
+    if snapshot_path:
+        transactions = load_snapshot(snapshot_path, xml_file)
+        if transactions is not None:
+            return transactions, True
+
+    signature = source_signature(xml_file) if snapshot_path else None
+    transactions = _parse(xml_file)
+    if snapshot_path and transactions:
+        try:
+            write_snapshot(transactions, snapshot_path, signature)
+        except (OSError, ValueError) as e:
+            print(f"Snapshot not written: {e}")
+    return transactions, False
+
+
+def refresh_snapshot(xml_file=config.XML_FILE, snapshot_path=config.SNAPSHOT_PATH,
+                     parse_cache=None):
+    """
+    Rebuild the snapshot unless it is already up to date.
+
+    Args:
+        xml_file (str): SMS backup
+        snapshot_path (str): Snapshot file
+        parse_cache (str): Parse cache file to reuse results from (None = no cache)
+
+    Returns:
+        bool: True if a new snapshot was written
+
+    Raises:
+        ValueError: If the XML yields no transactions
+    """
+    header = read_header(snapshot_path)
+    if header is not None and is_fresh(header, xml_file):
+        return False
+    signature = source_signature(xml_file)
+    transactions = _parse(xml_file, parse_cache)
+    if not transactions:
+        raise ValueError(f"No transactions parsed from {xml_file}")
+    write_snapshot(transactions, snapshot_path, signature)
+    return True
+
+
+if __name__ == '__main__':
+    xml_path = sys.argv[1] if len(sys.argv) > 1 else config.XML_FILE
+    snapshot_file = sys.argv[2] if len(sys.argv) > 2 else config.SNAPSHOT_PATH
+    cache_path = config.PARSE_CACHE_PATH if config.PARSE_CACHE else None
+
+    try:
+        if refresh_snapshot(xml_path, snapshot_file, cache_path):
+            print(f"Wrote snapshot: {snapshot_file}")
+        else:
+            print(f"Snapshot is up to date: {snapshot_file}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
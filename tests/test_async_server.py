@@ -0,0 +1,149 @@
+"""
+Asyncio Server Tests
+====================
+
+Tests for api/async_server.py, served on an ephemeral port inside the
+test's own event loop.
+
+Usage:
+    python -m pytest tests/test_async_server.py
+"""
+
+import asyncio
+import base64
+import os
+import sys
+import threading
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import async_server
+from api import rest_api_server as api_server
+from api.auth import Authenticator, hash_password
+from api.db import MemoryTransactionStore
+from api.query_cache import QueryCache
+
+USERS = {'alice': hash_password('secret', iterations=1000)}
+AUTHORIZATION = 'Basic ' + base64.b64encode(b'alice:secret').decode('ascii')
+
+
+def serve(monkeypatch, workers, client):
+    """
+    Run `client(port)` against an AsyncAPIServer with a small memory store.
+
+    Returns:
+        The client coroutine's result
+    """
+    monkeypatch.setattr(api_server, 'store',
+                        MemoryTransactionStore([{'id': 1, 'type': 'payment', 'amount': 500}]))
+    monkeypatch.setattr(api_server, 'query_cache', QueryCache())
+
+    async def main():
+        server = async_server.AsyncAPIServer(workers=workers)
+        listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0,
+                                              limit=async_server.MAX_HEADER_BYTES)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await client(port)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+
+    return asyncio.run(main())
+
+
+async def request(port, raw):
+    """Send raw request bytes and return the response's status code and body."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 10)
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), body
+
+
+def get(path, authorization=AUTHORIZATION):
+    return (f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+            f'Authorization: {authorization}\r\n\r\n').encode('latin-1')
+
+
+def test_password_hash_never_runs_on_the_event_loop(monkeypatch):
+    verifying_threads = []
+
+    class RecordingAuthenticator(Authenticator):
+        def _verify(self, header):
+            verifying_threads.append(threading.current_thread().name)
+            return super()._verify(header)
+
+    monkeypatch.setattr(api_server, 'authenticator', RecordingAuthenticator(USERS))
+
+    async def client(port):
+        return [await request(port, get('/transactions/1')),
+                await request(port, get('/transactions/1')),
+                await request(port, get('/transactions/1', 'Basic YWxpY2U6d3Jvbmc='))]
+
+    statuses = [status for status, _ in serve(monkeypatch, 0, client)]
+
+    assert statuses == [200, 200, 401]
+    assert len(verifying_threads) == 2      # the repeated header came from the cache
+    assert all(name.startswith('api-auth') for name in verifying_threads)
+
+
+def test_handler_threads_serve_requests(monkeypatch):
+    monkeypatch.setattr(api_server, 'authenticator', Authenticator(USERS))
+
+    async def client(port):
+        return await request(port, get('/transactions/1'))
+
+    status, body = serve(monkeypatch, 2, client)
+    assert status == 200
+    assert b'"payment"' in body
+
+
+def post(path, body, length=None):
+    return (f'POST {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: {AUTHORIZATION}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body) if length is None else length}\r\n\r\n').encode('latin-1') + body
+
+
+def test_request_body_is_read(monkeypatch):
+    monkeypatch.setattr(api_server, 'authenticator', Authenticator(USERS))
+
+    async def client(port):
+        return await request(port, post('/transactions', b'{"type": "payment", "amount": 700}')
+                             + get('/transactions?amount_min=600'))
+
+    status, body = serve(monkeypatch, 0, client)
+    assert status == 201
+    assert body.count(b'"amount":700') == 2     # created, then listed on the same connection
+
+
+def test_oversized_body_is_refused_unread(monkeypatch):
+    monkeypatch.setattr(api_server, 'authenticator', Authenticator(USERS))
+    monkeypatch.setattr(async_server, 'MAX_BODY_BYTES', 100)
+
+    async def client(port):
+        # Nothing after the head is sent: the server must answer without the body
+        return await request(port, post('/transactions', b'', length=101))
+
+    status, body = serve(monkeypatch, 0, client)
+    assert status == 413
+    assert b'Payload Too Large' in body
+    assert api_server.store.count() == 1
+
+
+def test_stalled_body_is_dropped(monkeypatch):
+    monkeypatch.setattr(api_server, 'authenticator', Authenticator(USERS))
+    monkeypatch.setattr(async_server, 'KEEPALIVE_TIMEOUT', 0.2)
+
+    async def client(port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(post('/transactions', b'{"ty', length=50))
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+
+    assert serve(monkeypatch, 2, client) == b''
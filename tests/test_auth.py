@@ -0,0 +1,135 @@
+"""
+Authentication Tests
+====================
+
+Tests for api/auth.py: password hashing, the verified-header cache, the
+rejected-header cache and the per-client failure throttle.
+
+Usage:
+    python -m pytest tests/test_auth.py
+"""
+
+import base64
+import os
+import sys
+import threading
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import auth
+from api.auth import Authenticator, hash_password, parse_users, verify_password
+
+# Few rounds: the tests check the logic, not the hash's cost
+USERS = {'alice': hash_password('secret', iterations=1000)}
+
+
+def basic(username, password):
+    token = base64.b64encode(f'{username}:{password}'.encode('utf-8')).decode('ascii')
+    return f'Basic {token}'
+
+
+class CountingAuthenticator(Authenticator):
+    """Authenticator that counts full verifications (password hashes)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.verifications = 0
+
+    def _verify(self, header):
+        self.verifications += 1
+        return super()._verify(header)
+
+
+def test_hash_round_trip():
+    encoded = hash_password('password123', iterations=1000)
+    assert encoded.startswith('pbkdf2_sha256$1000$')
+    assert verify_password('password123', encoded)
+    assert not verify_password('password124', encoded)
+    assert not verify_password('password123', 'md5$1$x$y')
+
+
+def test_default_account_hash_matches_its_password():
+    assert verify_password(auth.DEFAULT_PASSWORD, auth.DEFAULT_USERS[auth.DEFAULT_USERNAME])
+
+
+def test_parse_users_rejects_plain_passwords():
+    assert parse_users(['# comment', '', f"bob:{USERS['alice']}"]) == {'bob': USERS['alice']}
+    try:
+        parse_users(['bob:hunter2'])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('plain-text password accepted')
+
+
+def test_verified_header_is_hashed_once():
+    authenticator = CountingAuthenticator(USERS)
+    header = basic('alice', 'secret')
+    assert [authenticator.authenticate(header) for _ in range(5)] == ['alice'] * 5
+    assert authenticator.verifications == 1
+    assert authenticator.stats()['hits'] == 4
+
+
+def test_rejected_header_is_hashed_once():
+    authenticator = CountingAuthenticator(USERS)
+    header = basic('alice', 'wrong')
+    assert [authenticator.authenticate(header) for _ in range(5)] == [None] * 5
+    assert authenticator.verifications == 1
+    assert authenticator.stats()['rejected_hits'] == 4
+
+
+def test_unknown_user_is_rejected():
+    authenticator = Authenticator(USERS)
+    assert authenticator.authenticate(basic('mallory', 'secret')) is None
+    assert authenticator.authenticate('Bearer abc') is None
+    assert authenticator.authenticate(None) is None
+
+
+def test_client_is_throttled_after_repeated_failures():
+    authenticator = CountingAuthenticator(USERS, max_failures=3)
+    for attempt in range(3):
+        assert authenticator.authenticate(basic('alice', f'guess{attempt}'), '10.0.0.1') is None
+    assert authenticator.verifications == 3
+
+    # Even the right password is refused, without a hash, until the window ends
+    assert authenticator.authenticate(basic('alice', 'secret'), '10.0.0.1') is None
+    assert authenticator.verifications == 3
+    assert authenticator.stats()['throttled'] == 1
+
+    # Other clients are not affected
+    assert authenticator.authenticate(basic('alice', 'secret'), '10.0.0.2') == 'alice'
+
+
+def test_throttle_window_expires_and_success_resets():
+    authenticator = Authenticator(USERS, max_failures=2, failure_window=0)
+    for attempt in range(4):
+        assert authenticator.authenticate(basic('alice', f'guess{attempt}'), 'client') is None
+    assert authenticator.authenticate(basic('alice', 'secret'), 'client') == 'alice'
+    assert 'client' not in authenticator._failures
+
+
+def test_caches_are_bounded():
+    authenticator = Authenticator(USERS, failure_cache_size=10, max_failures=0)
+    for attempt in range(50):
+        authenticator.authenticate(basic('alice', f'guess{attempt}'))
+    assert authenticator.stats()['rejected_entries'] == 10
+
+
+def test_stats_are_exact_under_concurrency():
+    authenticator = Authenticator(USERS)
+    header = basic('alice', 'secret')
+    authenticator.authenticate(header)
+
+    def worker():
+        for _ in range(500):
+            authenticator.authenticate(header)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = authenticator.stats()
+    assert stats['hits'] == 8 * 500
+    assert stats['misses'] == 1
@@ -0,0 +1,219 @@
+"""
+ETL Tests
+=========
+
+Tests for the ETL pipeline (etl/run.py) and loader (etl/load_db.py):
+stage plumbing and failures, upserts, migration of databases created by
+older versions of the loader, and the per-file watermark that
+incremental runs resume from.
+
+Usage:
+    python -m pytest tests/test_etl.py
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from etl import load_db, run
+from etl.clean_narmalize import normalize_transaction
+from etl.run import run_pipeline
+from tests.test_xml_parser import SAMPLE_XML, SMSES, write_backup
+
+# transactions table written by the first ETL loader (no source_key)
+OLD_SCHEMA = """
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY,
+    transaction_id TEXT,
+    type TEXT NOT NULL,
+    amount INTEGER,
+    sender TEXT,
+    recipient TEXT,
+    phone_number TEXT,
+    fee_amount INTEGER,
+    balance_after INTEGER,
+    timestamp INTEGER,
+    readable_date TEXT,
+    raw_message TEXT
+)
+"""
+
+
+def transaction(number, transaction_id=None, amount=1000):
+    return {'transaction_id': transaction_id, 'type': 'payment', 'amount': amount, 'fee': 0,
+            'new_balance': 5000, 'sender': None, 'recipient': f'Shop {number}',
+            'phone_number': None, 'timestamp': 1715351458000 + number,
+            'readable_date': '10 May 2024 4:30:58 PM', 'raw_message': f'Payment {number}'}
+
+
+def rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT source_key, amount FROM transactions ORDER BY timestamp').fetchall()
+    finally:
+        conn.close()
+
+
+def test_pipeline_loads_every_message_through_small_queues(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    summary = run_pipeline(SAMPLE_XML, db_path, batch_size=64, queue_size=2)
+
+    assert [summary['stages'][name]['records'] for name in ('parse', 'normalize', 'load')] == \
+        [1691, 1691, 1691]
+    assert all(depth <= 2 for depth in summary['peak_queue_depth'].values())
+    assert len(rows(db_path)) == 1691
+
+
+def test_normalize_cleans_names_types_and_timestamps():
+    cleaned = normalize_transaction({'type': 'PAYMENT', 'sender': '  Jane \n Smith ',
+                                     'recipient': '   ', 'timestamp': '1715351458724'})
+    assert cleaned == {'type': 'payment', 'sender': 'Jane Smith', 'recipient': None,
+                       'timestamp': 1715351458724}
+    assert normalize_transaction({'timestamp': 'n/a'})['type'] == 'unknown'
+
+
+def test_stage_failure_stops_the_pipeline(tmp_path, monkeypatch):
+    def failing_normalize(transactions):
+        for number, transaction in enumerate(transactions):
+            if number == 100:
+                raise ValueError('bad record')
+            yield transaction
+
+    monkeypatch.setattr(run, 'normalize', failing_normalize)
+    db_path = str(tmp_path / 'db.sqlite3')
+    with pytest.raises(ValueError, match='bad record'):
+        run_pipeline(SAMPLE_XML, db_path, batch_size=10, queue_size=1)
+
+    # The loader was aborted before its first batch: no rows, and no
+    # watermark that would make the next run skip the file
+    assert load_db.read_watermark(db_path, SAMPLE_XML) is None
+    assert rows(db_path) == []
+
+
+def test_reloading_upserts_instead_of_duplicating(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    batch = [transaction(1, '111'), transaction(2, '222'), transaction(3)]
+
+    assert load_db.load(batch, db_path) == 3
+    assert load_db.load(batch[:2] + [transaction(3, amount=2500)], db_path) == 3
+
+    assert [amount for _, amount in rows(db_path)] == [1000, 1000, 2500]
+    assert [key for key, _ in rows(db_path)][:2] == ['111', '222']
+
+
+def test_old_database_is_migrated(tmp_path):
+    db_path = str(tmp_path / 'old.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.execute(OLD_SCHEMA)
+    conn.execute("INSERT INTO transactions (id, transaction_id, type, amount, timestamp, raw_message) "
+                 "VALUES (1, '111', 'payment', 1000, 1715351458001, 'Payment 1')")
+    conn.execute("INSERT INTO transactions (id, transaction_id, type, amount, timestamp, raw_message) "
+                 "VALUES (2, NULL, 'transfer', 700, 1715351458002, 'Payment 2')")
+    conn.commit()
+    conn.close()
+
+    # The same two messages again plus a new one
+    load_db.load([transaction(1, '111', amount=1500), transaction(2, amount=700),
+                  transaction(4, '444')], db_path)
+
+    loaded = rows(db_path)
+    assert len(loaded) == 3
+    assert loaded[0] == ('111', 1500)
+    assert loaded[1][0] == load_db.source_key(transaction(2))
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(transactions)')}
+    conn.close()
+    assert {'source_key', 'category_id', 'extra'} <= columns
+
+
+def test_migration_reports_duplicate_messages(tmp_path):
+    db_path = str(tmp_path / 'old.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.execute(OLD_SCHEMA)
+    conn.executemany("INSERT INTO transactions (id, transaction_id, type) VALUES (?, '111', 'payment')",
+                     [(1,), (2,)])
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(sqlite3.IntegrityError, match="rows 1 and 2"):
+        load_db.connect(db_path)
+
+    # Nothing was changed, so the database can be fixed and migrated again
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(transactions)')}
+    conn.close()
+    assert 'source_key' not in columns
+
+
+def loaded_timestamps(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute('SELECT timestamp FROM transactions ORDER BY timestamp')]
+    finally:
+        conn.close()
+
+
+def test_watermark_is_kept_per_backup_file(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    newer = write_backup(tmp_path / 'newer.xml', SMSES[1:])
+    older = write_backup(tmp_path / 'older.xml', SMSES[:1])
+
+    run_pipeline(newer, db_path)
+    assert load_db.read_watermark(db_path, newer)['timestamp'] == int(SMSES[2][1])
+    assert load_db.read_watermark(db_path, older) is None
+
+    # An older backup is not cut off by the newer file's watermark
+    run_pipeline(older, db_path)
+    assert loaded_timestamps(db_path) == [int(date) for _, date in SMSES]
+    assert load_db.read_watermark(db_path, older)['timestamp'] == int(SMSES[0][1])
+
+
+def test_grown_backup_resumes_from_its_watermark(tmp_path, caplog):
+    db_path = str(tmp_path / 'db.sqlite3')
+    xml_file = write_backup(tmp_path / 'sms.xml', SMSES[:2])
+    run_pipeline(xml_file, db_path)
+
+    # The phone exports the same backup with one more message at the end
+    # (and a new count in the <smses> start tag)
+    write_backup(xml_file, SMSES)
+
+    with caplog.at_level('INFO', logger='etl'):
+        summary = run_pipeline(xml_file, db_path)
+    assert 'resuming' in caplog.text
+    assert summary['stages']['parse']['records'] == 2      # watermark message + new one
+    assert len(loaded_timestamps(db_path)) == 3
+
+
+def test_replaced_backup_is_read_in_full(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    xml_file = write_backup(tmp_path / 'sms.xml', SMSES[1:])
+    run_pipeline(xml_file, db_path)
+
+    # A different backup at the same path, older than the stored watermark
+    write_backup(xml_file, SMSES[:1])
+    assert load_db.read_watermark(db_path, xml_file) is None
+    summary = run_pipeline(xml_file, db_path)
+
+    assert summary['stages']['parse']['records'] == 1
+    assert load_db.read_watermark(db_path, xml_file)['timestamp'] == int(SMSES[0][1])
+
+
+def test_old_watermark_table_is_migrated(tmp_path):
+    db_path = str(tmp_path / 'old.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE etl_watermark (source TEXT PRIMARY KEY, last_timestamp INTEGER NOT NULL, '
+                 'last_transaction_id TEXT, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)')
+    conn.execute("INSERT INTO etl_watermark (source, last_timestamp) VALUES ('sms_backup', 1715445936412)")
+    conn.commit()
+    conn.close()
+
+    # The global watermark of the old loader does not apply to any file
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    assert load_db.read_watermark(db_path, xml_file) is None
+    run_pipeline(xml_file, db_path)
+    assert len(loaded_timestamps(db_path)) == 3
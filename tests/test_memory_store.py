@@ -0,0 +1,104 @@
+"""
+Memory Store Tests
+==================
+
+Tests for api.db.MemoryTransactionStore and its secondary indexes
+(api/indexes.py).
+
+Usage:
+    python -m pytest tests/test_memory_store.py
+"""
+
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api.db import MemoryTransactionStore
+
+
+def make_transactions(count):
+    types = ('payment', 'deposit', 'withdrawal')
+    return [{'id': i, 'type': types[i % 3], 'amount': (i * 7919) % 5000,
+             'sender': f'Sender {i % 11}', 'recipient': f'Shop {i % 13}'}
+            for i in range(1, count + 1)]
+
+
+def pages(store, filters, limit, after=None):
+    """Read a filtered listing page by page with the keyset cursor."""
+    while True:
+        page, _ = store.query(filters, limit=limit, after=after)
+        if not page:
+            return
+        yield page
+        after = page[-1]['id']
+
+
+def test_amount_range_pages_are_complete_and_in_order():
+    store = MemoryTransactionStore(make_transactions(5000))
+    filters = {'amount_min': 100, 'amount_max': 4900}
+    expected = [t['id'] for t in store.filter(filters)]
+
+    seen = [t['id'] for page in pages(store, filters, limit=37) for t in page]
+
+    assert seen == expected
+    assert len(seen) == len(set(seen))
+    assert seen == sorted(seen)
+    assert all(100 <= store.get(i)['amount'] <= 4900 for i in seen)
+
+
+def test_amount_range_is_sorted_once_per_listing():
+    store = MemoryTransactionStore(make_transactions(2000))
+    index = store._by_amount
+    first = index.sorted_ids(10, 4000)
+    for _ in pages(store, {'amount_min': 10, 'amount_max': 4000}, limit=50):
+        pass
+    assert index.sorted_ids(10, 4000) is first
+
+
+def test_amount_range_pages_follow_writes():
+    store = MemoryTransactionStore(make_transactions(500))
+    filters = {'amount_min': 0, 'amount_max': 2500}
+    page, _ = store.query(filters, limit=20)
+
+    created = store.create({'type': 'payment', 'amount': 1000})
+    store.update(page[-1]['id'] + 1, {'amount': 4999})
+    rest = [t['id'] for p in pages(store, filters, 20, after=page[-1]['id']) for t in p]
+
+    assert created['id'] in rest
+    assert page[-1]['id'] + 1 not in rest
+    assert rest == sorted(set(rest))
+
+
+def test_combined_filters_match_a_scan():
+    transactions = make_transactions(3000)
+    store = MemoryTransactionStore(transactions)
+    filters = {'type': 'deposit', 'amount_min': 1000, 'amount_max': 3000, 'sender': 'sender 1'}
+
+    expected = [t['id'] for t in transactions
+                if t['type'] == 'deposit' and 1000 <= t['amount'] <= 3000
+                and 'sender 1' in t['sender'].lower()]
+
+    assert [t['id'] for t in store.filter(filters)] == expected
+    assert [t['id'] for page in pages(store, filters, limit=7) for t in page] == expected
+
+
+def test_encoded_records_are_cached_until_replaced():
+    store = MemoryTransactionStore(make_transactions(3))
+    transaction = store.get(1)
+    encoded = store.encode(transaction)
+    assert encoded == json.dumps(transaction, separators=(',', ':')).encode('utf-8')
+    assert store.encode(transaction) is encoded
+
+    store.update(1, {'amount': 123})
+    assert json.loads(store.encode(store.get(1)))['amount'] == 123
+    # A record handed out before the update still encodes as it was
+    assert json.loads(store.encode(transaction))['amount'] == transaction['amount']
+
+
+def test_encode_cache_is_bounded():
+    store = MemoryTransactionStore(make_transactions(5), cache_size=2)
+    for transaction_id in range(1, 6):
+        store.encode(store.get(transaction_id))
+    assert list(store._encoded) == [4, 5]
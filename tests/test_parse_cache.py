@@ -0,0 +1,111 @@
+"""
+Parse Cache Tests
+=================
+
+Tests for etl/parse_cache.py: reuse of parse results across imports,
+the size bound, invalidation when the parser changes, and the pipeline
+leaving the cache off unless it is enabled.
+
+Usage:
+    python -m pytest tests/test_parse_cache.py
+"""
+
+import os
+import sqlite3
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.xml_parser import parse_xml_to_json
+from etl import config, parse_cache
+from etl.parse_cache import ParseCache, open_parse_cache
+from etl.run import run_pipeline
+from tests.test_xml_parser import SMSES, write_backup
+
+
+def parse(xml_file, cache_path, **kwargs):
+    """Parse a backup through a cache; returns (transactions, cache stats)."""
+    with ParseCache(cache_path, **kwargs) as cache:
+        transactions = parse_xml_to_json(xml_file, parse_cache=cache)
+    return transactions, cache.stats()
+
+
+def test_second_import_is_served_from_the_cache(tmp_path):
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    cache_path = str(tmp_path / 'cache.sqlite3')
+
+    first, stats = parse(xml_file, cache_path)
+    assert (stats['hits'], stats['misses']) == (0, 3)
+
+    second, stats = parse(xml_file, cache_path)
+    assert (stats['hits'], stats['misses']) == (3, 0)
+    assert second == first == parse_xml_to_json(xml_file)
+
+
+def test_cache_is_trimmed_to_its_bound_oldest_first(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite3')
+    parse(write_backup(tmp_path / 'old.xml', SMSES[:2]), cache_path, max_entries=2)
+
+    # One new body: the old body that was not seen again is evicted
+    _, stats = parse(write_backup(tmp_path / 'new.xml', SMSES[1:]), cache_path, max_entries=2)
+    assert stats['evictions'] == 1
+
+    _, stats = parse(write_backup(tmp_path / 'again.xml', SMSES), cache_path, max_entries=3)
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+
+def hit_generations(cache_path, bodies):
+    """`used` generation of each body's row, read through another connection."""
+    with sqlite3.connect(cache_path) as other:
+        used = dict(other.execute('SELECT digest, used FROM parse_cache'))
+    return len(used), [used.get(parse_cache.body_digest(body)) for body in bodies]
+
+
+def test_each_chunk_is_committed_as_it_is_parsed(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite3')
+    parse(write_backup(tmp_path / 'sms.xml'), cache_path)
+    smses = SMSES[:1] + [('Unknown message', '1715351458999')]
+    bodies = [SMSES[0][0], SMSES[1][0]]
+
+    # Below the bound, hits are not rewritten
+    cache = ParseCache(cache_path, max_entries=10)
+    parse_xml_to_json(write_backup(tmp_path / 'new.xml', smses), parse_cache=cache)
+    assert not cache.conn.in_transaction
+    assert hit_generations(cache_path, bodies) == (4, [1, 1])
+    cache.close()
+
+    # A full cache records the hit's recency before close()
+    cache = ParseCache(cache_path, max_entries=4)
+    parse_xml_to_json(write_backup(tmp_path / 'again.xml', smses), parse_cache=cache)
+    assert not cache.conn.in_transaction
+    assert hit_generations(cache_path, bodies) == (4, [3, 1])
+    cache.close()
+
+
+def test_parser_change_empties_the_cache(tmp_path, monkeypatch):
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    cache_path = str(tmp_path / 'cache.sqlite3')
+    parse(xml_file, cache_path)
+
+    monkeypatch.setattr(parse_cache, 'PARSER_KEY', 'changed-rules')
+    _, stats = parse(xml_file, cache_path)
+    assert (stats['hits'], stats['misses']) == (0, 3)
+
+
+def test_cache_is_off_by_default_and_outside_the_tree(tmp_path):
+    assert open_parse_cache(None) is None
+    if 'ETL_PARSE_CACHE_PATH' not in os.environ:
+        assert not os.path.abspath(config.PARSE_CACHE_PATH).startswith(config.BASE_DIR + os.sep)
+
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    assert run_pipeline(xml_file, str(tmp_path / 'db.sqlite3'))['parse_cache'] is None
+
+
+def test_pipeline_uses_the_cache_when_enabled(tmp_path):
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    db_path = str(tmp_path / 'db.sqlite3')
+    cache_path = str(tmp_path / 'cache' / 'parse_cache.sqlite3')
+
+    run_pipeline(xml_file, db_path, parse_cache=cache_path)
+    summary = run_pipeline(xml_file, db_path, incremental=False, parse_cache=cache_path)
+    assert summary['parse_cache']['hits'] == 3
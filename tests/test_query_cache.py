@@ -0,0 +1,65 @@
+"""
+Query Cache Tests
+=================
+
+Tests for api/query_cache.py: LRU hits, invalidation when the dataset
+version moves, and the entry and byte bounds.
+
+Usage:
+    python -m pytest tests/test_query_cache.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api.query_cache import QueryCache
+
+
+def test_hit_at_the_same_version():
+    cache = QueryCache()
+    assert cache.get('a', 1) is None
+    cache.put('a', 1, b'[1]', 'application/json', {'X-Total-Count': '1'})
+    assert cache.get('a', 1) == (b'[1]', 'application/json', {'X-Total-Count': '1'})
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (1, 1, 1, 3)
+
+
+def test_version_bump_drops_every_entry():
+    cache = QueryCache()
+    cache.put('a', 1, b'old a', 'application/json')
+    cache.put('b', 1, b'old b', 'application/json')
+
+    assert cache.get('a', 2) is None
+    assert cache.get('b', 2) is None
+    assert cache.stats()['invalidations'] == 1
+
+    # A response computed before the write is not cached afterwards
+    cache.put('a', 1, b'stale', 'application/json')
+    assert cache.get('a', 2) is None
+    cache.put('a', 2, b'new a', 'application/json')
+    assert cache.get('a', 2)[0] == b'new a'
+
+
+def test_bounds_evict_least_recently_used():
+    cache = QueryCache(max_entries=3, max_bytes=10, max_entry_bytes=6)
+    for key in 'abc':
+        cache.put(key, 1, key.encode() * 3, 'text/plain')
+    cache.get('a', 1)
+    cache.put('d', 1, b'dd', 'text/plain')          # over max_entries: b goes
+    cache.put('e', 1, b'eeeeee', 'text/plain')      # c goes, then a for max_bytes
+    assert cache.stats()['evictions'] == 3
+    assert (cache.stats()['entries'], cache.stats()['bytes']) == (2, 8)
+    assert [key for key in 'abcde' if cache.get(key, 1)] == ['d', 'e']
+
+    cache.put('f', 1, b'fffffff', 'text/plain')     # above max_entry_bytes
+    assert cache.get('f', 1) is None
+
+
+def test_zero_entries_disables_the_cache():
+    cache = QueryCache(max_entries=0)
+    assert not cache.enabled
+    cache.put('a', 1, b'a', 'text/plain')
+    assert cache.get('a', 1) is None
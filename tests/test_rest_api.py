@@ -0,0 +1,429 @@
+"""
+REST API Tests
+==============
+
+Tests for api/rest_api_server.py, served in-process on an ephemeral port
+from a small memory store.
+
+Usage:
+    python -m pytest tests/test_rest_api.py
+"""
+
+import base64
+import http.client
+import json
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from api.auth import Authenticator, hash_password
+from api.db import MemoryTransactionStore, SQLiteTransactionStore
+from api.query_cache import QueryCache
+
+AUTHORIZATION = 'Basic ' + base64.b64encode(b'alice:secret').decode('ascii')
+
+TRANSACTIONS = [
+    {'id': n, 'type': ('payment', 'received', 'transfer')[n % 3], 'amount': n * 100,
+     'sender': None, 'recipient': f'Shop {n}', 'raw_message': f'Message {n}'}
+    for n in range(1, 31)
+]
+
+
+class Client:
+    """Keep-alive connection to the test server."""
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Returns:
+            tuple: (status, headers, body bytes)
+        """
+        headers = {'Authorization': AUTHORIZATION, **(headers or {})}
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json')
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, response.headers, response.read()
+
+    def get(self, path, headers=None):
+        return self.request('GET', path, headers=headers)
+
+    def get_json(self, path):
+        status, _, body = self.get(path)
+        assert status == 200, body
+        return json.loads(body)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """
+    Start servers for TransactionAPIHandler over a fresh memory store.
+
+    Returns:
+        A function taking an optional server factory (called with the
+        address) and returning a Client connected to a new server
+    """
+    monkeypatch.setattr(api_server, 'store', MemoryTransactionStore([dict(t) for t in TRANSACTIONS]))
+    monkeypatch.setattr(api_server, 'query_cache', QueryCache())
+    monkeypatch.setattr(api_server, 'authenticator',
+                        Authenticator({'alice': hash_password('secret', iterations=1000)}))
+    monkeypatch.setattr(api_server.TransactionAPIHandler, 'log_message', lambda *args: None)
+    running = []
+
+    def start(make_server=None):
+        if make_server is None:
+            httpd = ThreadingHTTPServer(('127.0.0.1', 0), api_server.TransactionAPIHandler)
+        else:
+            httpd = make_server(('127.0.0.1', 0))
+        threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+        client = Client(httpd.server_address[1])
+        running.append((httpd, client))
+        return client
+
+    yield start
+    for httpd, client in running:
+        client.connection.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture
+def client(serve):
+    return serve()
+
+
+def test_matching_etag_gets_304(client):
+    status, headers, _ = client.get('/transactions?type=payment')
+    etag = headers['ETag']
+    assert status == 200 and etag
+
+    status, headers, body = client.get('/transactions?type=payment', {'If-None-Match': etag})
+    assert status == 304 and body == b''
+    assert headers['ETag'] == etag
+
+    status, _, _ = client.get('/transactions/3', {'If-None-Match': etag})
+    assert status == 304
+
+
+def test_validators_and_if_none_match_forms(client):
+    _, headers, _ = client.get('/transactions/1')
+    etag = headers['ETag']
+    assert etag.startswith('W/"')
+    assert headers['Last-Modified'].endswith(' GMT')
+    assert headers['Cache-Control'] == 'private, no-cache'
+
+    assert api_server.etag_matches(f'"other", {etag[2:]}', etag)    # list, strong form
+    assert api_server.etag_matches('*', etag)
+    assert not api_server.etag_matches('"other"', etag)
+    assert client.get('/transactions/1', {'If-None-Match': '"other", ' + etag})[0] == 304
+
+
+@pytest.mark.parametrize('if_none_match', ['*', 'current'])
+def test_missing_transaction_is_404_whatever_the_etag(client, if_none_match):
+    etag = client.get('/transactions')[1]['ETag']
+    header = etag if if_none_match == 'current' else if_none_match
+    status, headers, body = client.get('/transactions/999999', {'If-None-Match': header})
+    assert status == 404
+    assert json.loads(body)['error'] == 'Not Found'
+    assert 'ETag' not in headers
+
+
+def test_write_changes_the_etag(client):
+    etag = client.get('/transactions')[1]['ETag']
+    status, _, _ = client.request('PUT', '/transactions/1', {'amount': 999})
+    assert status == 200
+
+    status, headers, _ = client.get('/transactions', {'If-None-Match': etag})
+    assert status == 200
+    assert headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('query', ['amount_min=abc', 'amount_max=1.5', 'limit=0', 'limit=x', 'cursor=next'])
+def test_invalid_parameters_get_400_even_with_a_matching_etag(client, query):
+    etag = client.get('/transactions')[1]['ETag']
+    status, _, body = client.get(f'/transactions?{query}', {'If-None-Match': etag})
+    assert status == 400
+    assert json.loads(body)['error'] == 'Bad Request'
+
+
+def test_cursor_pages_cover_every_match_once(client):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = '/transactions?type=payment&limit=4' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get_json(query)
+        assert page['count'] == len(page['transactions']) <= 4
+        assert page['total'] == len(TRANSACTIONS)
+        ids += [t['id'] for t in page['transactions']]
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+        assert cursor == ids[-1]
+
+    assert ids == [t['id'] for t in TRANSACTIONS if t['type'] == 'payment']
+    assert pages == 3
+
+
+def test_fields_projection_always_keeps_the_id(client):
+    page = client.get_json('/transactions?limit=2&fields=amount,type')
+    assert page['transactions'] == [{'id': 1, 'amount': 100, 'type': 'received'},
+                                    {'id': 2, 'amount': 200, 'type': 'transfer'}]
+    assert page['next_cursor'] == 2
+
+
+@pytest.mark.parametrize('query', [f'limit={api_server.MAX_PAGE_SIZE + 1}', 'limit=-1'])
+def test_page_size_is_bounded(client, query):
+    status, _, body = client.get(f'/transactions?{query}')
+    assert status == 400
+    assert str(api_server.MAX_PAGE_SIZE) in json.loads(body)['message']
+
+
+def test_unpaginated_listing_is_streamed(client):
+    status, headers, body = client.get('/transactions?amount_min=2500')
+    assert status == 200
+    assert headers['Transfer-Encoding'] == 'chunked'
+    assert 'Content-Length' not in headers
+
+    listing = json.loads(body)
+    assert [t['id'] for t in listing['transactions']] == [25, 26, 27, 28, 29, 30]
+    assert (listing['count'], listing['total'], listing['next_cursor']) == (6, 30, None)
+    assert listing['filters'] == {'amount_min': ['2500']}
+
+    # The connection stays usable after a chunked body
+    assert client.get_json('/transactions/1')['transaction']['id'] == 1
+
+
+@pytest.mark.parametrize('query, headers', [
+    ('?format=ndjson', {}),
+    ('', {'Accept': api_server.NDJSON_TYPE}),
+])
+def test_ndjson_listing(client, query, headers):
+    status, response, body = client.get('/transactions' + query, headers)
+    assert status == 200
+    assert response['Content-Type'] == api_server.NDJSON_TYPE
+    assert response['X-Total-Count'] == '30'
+    lines = body.decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == TRANSACTIONS
+
+
+def test_ndjson_pages_carry_the_cursor_in_a_header(client):
+    status, headers, body = client.get('/transactions?format=ndjson&limit=5&cursor=20')
+    assert status == 200
+    assert [json.loads(line)['id'] for line in body.splitlines()] == [21, 22, 23, 24, 25]
+    assert headers['X-Next-Cursor'] == '25'
+
+    _, headers, body = client.get('/transactions?format=ndjson&limit=5&cursor=25')
+    assert len(body.splitlines()) == 5
+    assert 'X-Next-Cursor' not in headers
+
+    # ?format=json wins over the Accept header
+    _, headers, _ = client.get('/transactions?format=json&limit=1',
+                               {'Accept': api_server.NDJSON_TYPE})
+    assert headers['Content-Type'] == 'application/json'
+
+
+def test_responses_are_compact_unless_pretty(client):
+    _, _, body = client.get('/transactions?limit=3&type=transfer')
+    listing = json.loads(body)
+    assert body == json.dumps(listing, separators=(',', ':')).encode('utf-8')
+
+    _, _, pretty = client.get('/transactions?limit=3&type=transfer&pretty=1')
+    assert json.loads(pretty)['transactions'] == listing['transactions']
+    assert pretty.startswith(b'{\n  "success": true')
+
+    _, _, body = client.get('/transactions/2?pretty=true')
+    assert b'\n    "amount": 200' in body
+
+
+@pytest.mark.parametrize('accept, encoding, wbits', [
+    ('gzip', 'gzip', 31),
+    ('deflate', 'deflate', 15),
+    ('deflate;q=0.5, gzip;q=0.8', 'gzip', 31),
+    ('gzip;q=0, deflate', 'deflate', 15),
+])
+def test_large_bodies_are_compressed(client, accept, encoding, wbits):
+    _, _, plain = client.get('/transactions?limit=30')
+    assert len(plain) >= api_server.COMPRESS_MIN_SIZE
+
+    status, headers, body = client.get('/transactions?limit=30', {'Accept-Encoding': accept})
+    assert status == 200
+    assert headers['Content-Encoding'] == encoding
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert int(headers['Content-Length']) == len(body) < len(plain)
+    assert zlib.decompress(body, wbits) == plain
+
+
+def test_small_and_unaccepted_bodies_are_sent_as_is(client):
+    status, headers, body = client.get('/transactions/1', {'Accept-Encoding': 'gzip'})
+    assert status == 200 and len(body) < api_server.COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in headers
+    assert headers['Vary'] == 'Accept-Encoding'
+
+    _, headers, _ = client.get('/transactions?limit=30', {'Accept-Encoding': 'br, gzip;q=0'})
+    assert 'Content-Encoding' not in headers
+
+
+def test_streams_are_compressed_when_accepted(client):
+    _, headers, body = client.get('/transactions', {'Accept-Encoding': 'gzip'})
+    assert headers['Transfer-Encoding'] == 'chunked'
+    assert headers['Content-Encoding'] == 'gzip'
+
+    _, headers, plain = client.get('/transactions')
+    assert 'Content-Encoding' not in headers
+    assert zlib.decompress(body, 31) == plain
+
+
+def test_repeated_listings_come_from_the_query_cache(client):
+    first = client.get('/transactions?type=transfer&limit=5')[2]
+    assert client.get('/transactions?limit=5&type=transfer')[2] == first   # order is ignored
+    stats = client.get_json('/stats')['query_cache']
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+    status, _, _ = client.request('DELETE', '/transactions/2')
+    assert status == 200
+    listing = client.get_json('/transactions?type=transfer&limit=5')
+    assert 2 not in [t['id'] for t in listing['transactions']]
+    stats = client.get_json('/stats')['query_cache']
+    assert (stats['hits'], stats['invalidations']) == (1, 1)
+
+
+def test_bulk_operations_report_each_item(client):
+    version = api_server.store.version()
+    status, _, body = client.request('POST', '/transactions/bulk', [
+        {'op': 'create', 'data': {'type': 'deposit', 'amount': 10}},
+        {'op': 'update', 'id': 1, 'data': {'amount': 11}},
+        {'op': 'delete', 'id': 2},
+        {'op': 'delete', 'id': 999},
+        {'op': 'create', 'data': {'amount': 12}},
+        {'op': 'merge', 'id': 3},
+    ])
+    assert status == 200
+    response = json.loads(body)
+    assert (response['success'], response['count'], response['errors']) == (False, 6, 3)
+    assert [(r['index'], r['status']) for r in response['results']] == [
+        (0, 201), (1, 200), (2, 200), (3, 404), (4, 400), (5, 400)]
+    assert response['results'][0]['id'] == 31
+
+    assert api_server.store.version() == version + 1
+    assert api_server.store.get(31)['amount'] == 10
+    assert api_server.store.get(1)['amount'] == 11
+    assert api_server.store.get(2) is None
+
+
+def test_bulk_accepts_ndjson(client):
+    lines = [json.dumps({'op': 'update', 'id': n, 'data': {'amount': 0}}) for n in (1, 2)]
+    body = '\n'.join(lines + ['{not json'] + ['']).encode('utf-8')
+    status, _, response = client.request('POST', '/transactions/bulk', body,
+                                         {'Content-Type': api_server.NDJSON_TYPE})
+    assert status == 200
+    assert [r['status'] for r in json.loads(response)['results']] == [200, 200, 400]
+    assert api_server.store.get(2)['amount'] == 0
+
+
+def test_bulk_rejects_oversized_and_malformed_requests(client, monkeypatch):
+    monkeypatch.setattr(api_server, 'MAX_BULK_OPERATIONS', 2)
+    version = api_server.store.version()
+    status, _, _ = client.request('POST', '/transactions/bulk', [{'op': 'delete', 'id': 1}] * 3)
+    assert status == 413
+
+    status, _, _ = client.request('POST', '/transactions/bulk', b'[{"op": "delete"')
+    assert status == 400
+    assert api_server.store.version() == version
+    assert api_server.store.get(1) is not None
+
+
+@pytest.fixture
+def sqlite_client(client, monkeypatch, tmp_path):
+    """The test server, serving a SQLite store holding TRANSACTIONS."""
+    store = SQLiteTransactionStore(str(tmp_path / 'db.sqlite3'))
+    store.bulk([('create', None, {k: v for k, v in t.items() if k != 'id'}) for t in TRANSACTIONS])
+    monkeypatch.setattr(api_server, 'store', store)
+    yield client
+    store.close()
+
+
+@pytest.mark.parametrize('method, path', [('POST', '/transactions'), ('PUT', '/transactions/1')])
+@pytest.mark.parametrize('body', [{'type': None}, {'type': 5, 'amount': 1}, [1, 2]])
+def test_invalid_writes_get_400_on_the_sqlite_store(sqlite_client, method, path, body):
+    status, _, response = sqlite_client.request(method, path, body)
+    assert status == 400
+    assert json.loads(response)['error'] == 'Bad Request'
+    assert api_server.store.get(1)['type'] == 'received'
+
+    # The connection survives the rejected write
+    assert sqlite_client.get_json('/transactions/1')['transaction']['amount'] == 100
+
+
+def test_constraint_errors_never_drop_the_connection(sqlite_client, monkeypatch):
+    def refuse(*args):
+        raise sqlite3.IntegrityError('NOT NULL constraint failed: transactions.type')
+
+    monkeypatch.setattr(api_server.store, 'create', refuse)
+    monkeypatch.setattr(api_server.store, 'update', refuse)
+    for method, path in (('POST', '/transactions'), ('PUT', '/transactions/1')):
+        status, _, body = sqlite_client.request(method, path, {'type': 'payment'})
+        assert status == 400
+        assert b'NOT NULL' not in body
+    assert sqlite_client.get_json('/transactions/2')['transaction']['id'] == 2
+
+
+def worker_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('api-worker')]
+
+
+def test_pooled_server_reuses_connections_on_a_fixed_pool(serve):
+    before = worker_threads()
+    client = serve(lambda address: api_server.create_server(address, workers=2, backlog=8))
+    pool = [thread for thread in worker_threads() if thread not in before]
+    assert sorted(thread.name for thread in pool) == ['api-worker-0', 'api-worker-1']
+
+    # Many requests over one HTTP/1.1 connection
+    for transaction_id in (1, 2, 3):
+        status, headers, body = client.get(f'/transactions/{transaction_id}')
+        assert status == 200
+        assert headers.get('Connection', '').lower() != 'close'
+        assert json.loads(body)['transaction']['id'] == transaction_id
+    client.connection.close()
+
+    # More clients than workers are all served, by the same two threads
+    others = [Client(client.connection.port) for _ in range(4)]
+    results = []
+
+    def fetch(other):
+        results.append(other.get('/transactions/4')[0])
+        other.connection.close()
+
+    threads = [threading.Thread(target=fetch, args=(other,)) for other in others]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == [200] * 4
+    assert len(worker_threads()) == len(before) + 2
+
+
+def test_single_worker_server_closes_each_connection(serve):
+    client = serve(lambda address: api_server.create_server(address, workers=1))
+    assert client.get_json('/transactions/1')['transaction']['id'] == 1
+    assert client.connection.sock is None           # closed by the server
+
+    # An idle client no longer holds the only thread
+    idle = Client(client.connection.port)
+    idle.get('/transactions/1')
+    other = Client(client.connection.port)
+    other.connection.timeout = 2
+    listing = other.get_json('/transactions')          # streamed without chunking
+    assert len(listing['transactions']) == len(TRANSACTIONS)
+    idle.connection.close()
+    other.connection.close()
@@ -0,0 +1,78 @@
+"""
+Search and Timing Tests
+=======================
+
+Tests for dsa/search_algorithms.py (all three searches agree and return
+just the record) and the dsa/timing.py measurement helpers.
+
+Usage:
+    python -m pytest tests/test_search.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa.search_algorithms import (binary_search, compare_search_methods, create_transaction_dict,
+                                   dictionary_lookup, linear_search)
+from dsa.timing import calibrate, format_ns, measure, percentile, summarize
+
+TRANSACTIONS = [{'id': n, 'type': 'payment', 'amount': n * 10} for n in range(1, 101)]
+
+
+def test_searches_return_the_record_or_none():
+    index = create_transaction_dict(TRANSACTIONS)
+    ordered = sorted(TRANSACTIONS, key=lambda t: t['id'])
+    for target in (1, 50, 100):
+        expected = TRANSACTIONS[target - 1]
+        assert linear_search(TRANSACTIONS, target) is expected
+        assert dictionary_lookup(index, target) is expected
+        assert binary_search(ordered, target) is expected
+    for missing in (0, 101):
+        assert linear_search(TRANSACTIONS, missing) is None
+        assert dictionary_lookup(index, missing) is None
+        assert binary_search(ordered, missing) is None
+
+
+def test_compare_search_methods_counts_hits(capsys):
+    results = compare_search_methods(TRANSACTIONS, [1, 60, 500], repeat=3)
+    for method in ('linear', 'dictionary', 'binary'):
+        assert results[method]['found'] == 2
+        assert results[method]['median_ns'] > 0
+    assert 'SEARCH ALGORITHM COMPARISON' in capsys.readouterr().out
+
+
+def test_percentile_and_summarize():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 0.95) == 10
+    assert percentile([], 0.5) == 0.0
+
+    stats = summarize([400, 200, 300], loops=100)
+    assert (stats['min_ns'], stats['median_ns'], stats['max_ns']) == (2, 3, 4)
+    assert stats['samples'] == 3 and stats['loops'] == 100
+    assert summarize([50])['stdev_ns'] == 0.0
+
+
+def test_measure_loops_fast_calls_and_respects_its_budget():
+    calls = []
+
+    def fast():
+        calls.append(None)
+
+    stats = measure(fast, warmup=2, repeat=5, min_sample_ns=100_000)
+    assert stats['samples'] == 5
+    assert stats['loops'] > 1                   # one call is far below 0.1 ms
+    assert 0 < stats['median_ns'] < 100_000
+    assert calibrate(fast, (), 0) == 1
+
+    stats = measure(sum, range(10_000), repeat=1000, min_sample_ns=0, max_seconds=0)
+    assert stats['samples'] == 3
+
+
+def test_format_ns():
+    assert format_ns(850) == '850 ns'
+    assert format_ns(12_300) == '12.30 us'
+    assert format_ns(4_560_000) == '4.56 ms'
+    assert format_ns(1_230_000_000) == '1.23 s'
@@ -0,0 +1,69 @@
+"""
+Dataset Snapshot Tests
+======================
+
+Tests for etl/snapshot.py: round trips, staleness checks, and the API
+server leaving the snapshot off unless it is enabled.
+
+Usage:
+    python -m pytest tests/test_snapshot.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api import rest_api_server as api_server
+from dsa.xml_parser import parse_xml_to_json
+from etl import config, snapshot
+from etl.snapshot import load_snapshot, load_transactions, refresh_snapshot
+from tests.test_xml_parser import SMSES, SAMPLE_XML, write_backup
+
+
+def test_round_trip_matches_the_parser(tmp_path):
+    snapshot_path = str(tmp_path / 'cache' / 'snapshot.bin')
+    expected = parse_xml_to_json(SAMPLE_XML)
+
+    parsed, from_snapshot = load_transactions(SAMPLE_XML, snapshot_path)
+    assert not from_snapshot and os.path.exists(snapshot_path)
+
+    loaded, from_snapshot = load_transactions(SAMPLE_XML, snapshot_path)
+    assert from_snapshot
+    assert [t.to_dict() for t in loaded] == [t.to_dict() for t in parsed] == expected
+
+
+def test_changed_backup_makes_the_snapshot_stale(tmp_path):
+    xml_file = write_backup(tmp_path / 'sms.xml', SMSES[:2])
+    snapshot_path = str(tmp_path / 'snapshot.bin')
+    assert refresh_snapshot(xml_file, snapshot_path)
+    assert not refresh_snapshot(xml_file, snapshot_path)
+    assert len(load_snapshot(snapshot_path, xml_file)) == 2
+
+    write_backup(xml_file, SMSES)
+    assert load_snapshot(snapshot_path, xml_file) is None
+    transactions, from_snapshot = load_transactions(xml_file, snapshot_path)
+    assert not from_snapshot and len(transactions) == 3
+
+
+def test_parser_change_makes_the_snapshot_stale(tmp_path, monkeypatch):
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    snapshot_path = str(tmp_path / 'snapshot.bin')
+    refresh_snapshot(xml_file, snapshot_path)
+
+    monkeypatch.setattr(snapshot, 'PARSER_KEY', 'changed-rules')
+    assert load_snapshot(snapshot_path, xml_file) is None
+
+
+def test_snapshot_is_off_unless_enabled(monkeypatch):
+    monkeypatch.setattr(config, 'SNAPSHOT', False)
+    assert api_server.parse_command_line(['--memory'])['snapshot_path'] is None
+    assert api_server.parse_command_line(['--snapshot'])['snapshot_path'] == config.SNAPSHOT_PATH
+    assert api_server.parse_command_line(['--snapshot=x.bin'])['snapshot_path'] == 'x.bin'
+
+    monkeypatch.setattr(config, 'SNAPSHOT', True)
+    assert api_server.parse_command_line([])['snapshot_path'] == config.SNAPSHOT_PATH
+    assert api_server.parse_command_line(['--no-snapshot'])['snapshot_path'] is None
+
+    if 'ETL_SNAPSHOT_PATH' not in os.environ:
+        assert not os.path.abspath(config.SNAPSHOT_PATH).startswith(config.BASE_DIR + os.sep)
@@ -0,0 +1,197 @@
+"""
+Transaction Store Tests
+=======================
+
+Tests for the two storage backends in api/db.py, run against both
+wherever they promise the same behaviour.
+
+Usage:
+    python -m pytest tests/test_stores.py
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from api.db import MemoryTransactionStore, SQLiteTransactionStore
+from etl import load_db
+
+RECORDS = [
+    {'type': 'payment', 'amount': 1000, 'recipient': 'Jane Smith', 'sender': None,
+     'timestamp': '1715351506754', 'raw_message': 'Payment 1'},
+    {'type': 'received', 'amount': 2000, 'sender': 'Samuel Carter', 'recipient': None,
+     'timestamp': '1715351458724', 'raw_message': 'Received 2'},
+    {'type': 'transfer', 'amount': 500, 'recipient': 'Alex Doe', 'sender': None,
+     'timestamp': '1715445936412', 'raw_message': 'Transfer 3'},
+]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """An empty store of each kind, filled with RECORDS through create()."""
+    if request.param == 'memory':
+        store = MemoryTransactionStore()
+    else:
+        store = SQLiteTransactionStore(str(tmp_path / 'db.sqlite3'))
+    for record in RECORDS:
+        store.create(dict(record))
+    yield store
+    store.close()
+
+
+def test_create_get_update_delete(store):
+    created = store.create({'type': 'airtime', 'amount': 300, 'note': 'top-up', 'id': 99})
+    assert created['id'] == 4                       # ids are assigned, never taken from the body
+    assert store.get(4) == created
+    assert (created['amount'], created['note']) == (300, 'top-up')
+
+    updated = store.update(4, {'amount': 350, 'tags': ['phone']})
+    assert (updated['amount'], updated['note'], updated['tags']) == (350, 'top-up', ['phone'])
+    assert store.get(4) == updated
+
+    assert store.delete(4)
+    assert store.get(4) is None
+    assert not store.delete(4)
+    assert store.update(4, {'amount': 1}) is None
+    assert store.count() == 3
+
+
+def test_every_write_moves_the_version(store):
+    versions = [store.version()]
+    store.create({'type': 'payment', 'amount': 1})
+    versions.append(store.version())
+    store.update(1, {'amount': 2})
+    versions.append(store.version())
+    store.delete(1)
+    versions.append(store.version())
+    assert versions == sorted(set(versions))
+
+    store.delete(1)                                 # nothing deleted: no new version
+    assert store.version() == versions[-1]
+
+
+def test_query_returns_matches_and_total(store):
+    matches, total = store.query({'amount_min': 800})
+    assert [t['id'] for t in matches] == [1, 2]
+    assert total == 3
+    assert [t['id'] for t in store.filter({'type': 'transfer'})] == [3]
+
+
+def test_bulk_applies_in_order_with_one_version_bump(store):
+    version = store.version()
+    results = store.bulk([
+        ('create', None, {'type': 'deposit', 'amount': 50}),
+        ('update', 4, {'amount': 60}),                  # the row created just before
+        ('delete', 2, None),
+        ('update', 2, {'amount': 1}),                   # deleted earlier in the batch
+        ('delete', 99, None),
+    ])
+    assert results == [4, 4, 2, None, None]
+    assert store.get(4)['amount'] == 60
+    assert store.get(2) is None
+    assert store.version() > version
+    version = store.version()
+
+    assert store.bulk([('delete', 99, None)]) == [None]
+    assert store.version() == version
+
+
+def test_sqlite_bulk_is_all_or_nothing(tmp_path):
+    store = SQLiteTransactionStore(str(tmp_path / 'db.sqlite3'))
+    store.create({'type': 'payment', 'amount': 1})
+    with pytest.raises(sqlite3.IntegrityError):
+        store.bulk([('update', 1, {'amount': 2}),
+                    ('create', None, {'type': None, 'amount': 3})])   # type is NOT NULL
+    assert store.get(1)['amount'] == 1
+    assert store.count() == 1
+    store.close()
+
+
+@pytest.mark.parametrize('field, substring, expected', [
+    ('recipient', 'smith', [1]),                    # longer than GRAM_SIZE
+    ('recipient', 'e', [1, 3]),                     # shorter than GRAM_SIZE
+    ('recipient', 'x d', [3]),
+    ('sender', 'carter', [2]),
+    ('recipient', 'carter', []),
+    ('recipient', 'jane smith!', []),
+])
+def test_name_filters_match_substrings(store, field, substring, expected):
+    assert [t['id'] for t in store.filter({field: substring})] == expected
+
+
+@pytest.mark.parametrize('field, substring', [
+    ('recipient', 'éric'), ('recipient', 'ric mu'), ('sender', 'zoë'), ('sender', 'ë'),
+])
+def test_name_filters_fold_non_ascii_case(store, field, substring):
+    created = store.create({'type': 'transfer', 'amount': 5, 'recipient': 'ÉRIC Mugisha',
+                            'sender': 'ZOË Uwase'})
+    assert [t['id'] for t in store.filter({field: substring})] == [created['id']]
+
+
+def test_name_index_follows_writes(store):
+    store.update(1, {'recipient': 'John Brown'})
+    store.delete(3)
+    store.create({'type': 'payment', 'amount': 10, 'recipient': 'Jane Smithson'})
+    assert [t['id'] for t in store.filter({'recipient': 'smith'})] == [4]
+    assert [t['id'] for t in store.filter({'recipient': 'brown'})] == [1]
+    assert store.filter({'recipient': 'doe'}) == []
+
+
+def test_sqlite_name_index_covers_etl_loads(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    store = SQLiteTransactionStore(db_path)
+    assert store.name_index
+
+    load_db.load([{'transaction_id': '111', 'type': 'payment', 'amount': 700,
+                   'recipient': 'Linda Green', 'timestamp': 1715351458000,
+                   'raw_message': 'Payment 111'}], db_path)
+    with store.pool.connection() as conn:
+        (indexed,) = conn.execute('SELECT COUNT(*) FROM transaction_names').fetchone()
+    assert indexed == 1
+    assert [t['transaction_id'] for t in store.filter({'recipient': 'a gre'})] == ['111']
+    store.close()
+
+
+def test_memory_store_keeps_loaded_ids_in_order():
+    store = MemoryTransactionStore([{'id': i, 'type': 'payment', 'amount': i} for i in (2, 5, 9)])
+    assert store.get(5)['amount'] == 5
+    assert store.get(3) is None
+
+    assert store.delete(5)
+    assert store.create({'type': 'payment', 'amount': 1})['id'] == 10   # after the largest id
+    assert [t['id'] for t in store.filter({})] == [2, 9, 10]
+    assert store.count() == 3
+
+    old = store.get(9)
+    store.update(9, {'amount': 90})
+    assert old['amount'] == 9                       # handed-out records are never mutated
+    assert [t['amount'] for t in store.filter({})] == [2, 90, 1]
+
+
+def test_sqlite_store_reads_etl_loads_and_persists(tmp_path):
+    db_path = str(tmp_path / 'db.sqlite3')
+    load_db.load([{'transaction_id': '111', 'type': 'payment', 'amount': 700, 'fee': 10,
+                   'new_balance': 300, 'recipient': 'Shop', 'timestamp': 1715351458000,
+                   'raw_message': 'Payment 111'}], db_path)
+
+    store = SQLiteTransactionStore(db_path)
+    loaded = store.get(1)
+    assert (loaded['transaction_id'], loaded['fee'], loaded['new_balance']) == ('111', 10, 300)
+    assert loaded['timestamp'] == '1715351458000'   # served as in the XML
+    store.create({'type': 'deposit', 'amount': 5})
+    store.close()
+
+    store = SQLiteTransactionStore(db_path)
+    assert store.count() == 2
+    version = store.version()
+
+    # An ETL run behind the server's back is noticed without a query
+    load_db.load([{'transaction_id': '222', 'type': 'payment', 'amount': 1,
+                   'timestamp': 1715351459000, 'raw_message': 'Payment 222'}], db_path)
+    assert store.version() > version
+    assert store.count() == 3
+    store.close()
@@ -0,0 +1,222 @@
+"""
+XML Parser Tests
+================
+
+Tests for dsa/xml_parser.py: the parse_xml_to_json() contract, the
+streaming and parallel parsers, SMS body classification and the compact
+Transaction records.
+
+Usage:
+    python -m pytest tests/test_xml_parser.py
+"""
+
+import json
+import os
+import pickle
+import re
+import sys
+import types
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dsa import xml_parser
+from dsa.xml_parser import (PARSER_KEY, TRANSACTION_FIELDS, BodyStore, Transaction,
+                            iter_sms_elements, iter_transactions, iter_transactions_parallel,
+                            json_default, parse_sms_body, parse_xml_to_json, read_declared_count)
+
+SAMPLE_XML = os.path.join(os.path.dirname(__file__), '..', 'modified_sms_v2.xml')
+
+SMSES = [
+    ('You have received 2000 RWF from Jane Smith (*********013) on your mobile money account '
+     'at 2024-05-10 16:30:51. Message from sender: . Your new balance:2000 RWF. '
+     'Financial Transaction Id: 76662021700.', '1715351458724'),
+    ('TxId: 73214484437. Your payment of 1,000 RWF to Jane Smith 12845 has been completed '
+     'at 2024-05-10 16:31:39. Your new balance: 1,000 RWF. Fee was 0 RWF.', '1715351506754'),
+    ('*113*R*A bank deposit of 40000 RWF has been added to your mobile money account at '
+     '2024-05-11 18:43:49. Your NEW BALANCE :40400 RWF. Cash Deposit::CASH::::0::250795963036.'
+     'Thank you for using MTN MobileMoney.*EN#', '1715445936412'),
+]
+
+
+def write_backup(path, smses=SMSES):
+    """Write a small SMS backup with the given (body, date) messages."""
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write("<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>\n")
+        out.write(f'<smses count="{len(smses)}">\n')
+        for body, date in smses:
+            body = body.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;')
+            out.write(f'  <sms protocol="0" address="M-Money" date="{date}" type="1" '
+                      f'body="{body}" readable_date="10 May 2024 4:30:58 PM" />\n')
+        out.write('</smses>\n')
+    return str(path)
+
+
+def test_parse_xml_to_json_returns_json_ready_dicts(tmp_path):
+    transactions = parse_xml_to_json(write_backup(tmp_path / 'sms.xml'))
+
+    assert len(transactions) == 3
+    assert all(type(t) is dict for t in transactions)
+    assert list(transactions[0]) == list(TRANSACTION_FIELDS)
+    decoded = json.loads(json.dumps(transactions))
+    assert decoded == transactions
+    assert [t['type'] for t in transactions] == ['received', 'payment', 'deposit']
+
+
+def test_records_are_opt_in_and_equal_the_dicts(tmp_path):
+    xml_file = write_backup(tmp_path / 'sms.xml')
+    dicts = parse_xml_to_json(xml_file)
+    records = parse_xml_to_json(xml_file, records=True)
+    lazy = parse_xml_to_json(xml_file, records=True, lazy_bodies=True)
+
+    assert all(isinstance(t, Transaction) for t in records + lazy)
+    assert [dict(t) for t in records] == dicts
+    assert [t.to_dict() for t in lazy] == dicts
+    assert json.loads(json.dumps(records, default=json_default)) == dicts
+
+
+def test_transaction_behaves_like_a_read_only_mapping(tmp_path):
+    record = parse_xml_to_json(write_backup(tmp_path / 'sms.xml'), records=True)[1]
+
+    assert record['amount'] == 1000
+    assert record.get('fee') == 0
+    assert record.get('unknown', 'default') == 'default'
+    assert 'raw_message' in record and 'unknown' not in record
+    assert len(record) == len(TRANSACTION_FIELDS)
+    assert pickle.loads(pickle.dumps(record)).to_dict() == record.to_dict()
+    try:
+        record['unknown']
+    except KeyError:
+        pass
+    else:
+        raise AssertionError('unknown field did not raise KeyError')
+
+
+def test_body_store_round_trips_bodies():
+    store = BodyStore()
+    bodies = ['You have received 2000 RWF.', '', 'Murakoze — 5 000 RWF']
+    references = [store.add(body) for body in bodies]
+    assert [store.read(reference) for reference in references] == bodies
+
+    # Reads between appends see the new bodies
+    later = store.add('Your payment of 1,000 RWF')
+    assert store.read(later) == 'Your payment of 1,000 RWF'
+    assert store.read(references[2]) == bodies[2]
+    assert store.size() == sum(len(body.encode('utf-8')) for body in bodies) + 25
+
+    with pytest.raises(ValueError):
+        store.add('x' * (1 << BodyStore.LENGTH_BITS))
+    store.close()
+
+
+def test_body_store_opens_bodies_inside_another_file(tmp_path):
+    path = tmp_path / 'bodies.bin'
+    path.write_bytes(b'HEADER' + 'abcdé'.encode('utf-8') + b'TRAILER')
+    store = BodyStore.open(str(path), 6, 6)
+    assert store.read(0 << BodyStore.LENGTH_BITS | 6) == 'abcdé'
+    assert store.read(3 << BodyStore.LENGTH_BITS | 3) == 'dé'
+    store.close()
+
+
+def test_lazy_records_keep_only_a_body_reference(tmp_path):
+    record = parse_xml_to_json(write_backup(tmp_path / 'sms.xml'), records=True,
+                               lazy_bodies=True)[0]
+    assert isinstance(record._body, int)
+    assert record['raw_message'] == record.raw_message == SMSES[0][0]
+
+
+def test_sample_backup_parses():
+    transactions = parse_xml_to_json(SAMPLE_XML)
+    assert len(transactions) == 1691
+    assert [t['id'] for t in transactions] == list(range(1, 1692))
+    json.dumps(transactions)
+
+
+def test_iter_transactions_streams_the_same_records():
+    stream = iter_transactions(SAMPLE_XML)
+    assert isinstance(stream, types.GeneratorType)
+    assert [t.to_dict() for t in stream] == parse_xml_to_json(SAMPLE_XML)
+
+
+def test_elements_are_released_once_the_parser_moves_on(tmp_path):
+    seen = []
+    for element in iter_sms_elements(write_backup(tmp_path / 'sms.xml')):
+        assert element.get('body')          # complete while it is current
+        seen.append(element)
+    assert len(seen) == 3
+    assert all(not element.attrib for element in seen)
+
+
+def test_min_date_and_empty_bodies_are_skipped(tmp_path):
+    xml_file = write_backup(tmp_path / 'sms.xml', SMSES + [('', '1715445936999')])
+    assert read_declared_count(xml_file) == '4'
+    assert len(list(iter_transactions(xml_file))) == 3
+
+    newer = list(iter_transactions(xml_file, start_id=10, min_date=int(SMSES[1][1])))
+    assert [(t['id'], t['type']) for t in newer] == [(10, 'payment'), (11, 'deposit')]
+
+
+def test_malformed_backup_raises(tmp_path):
+    path = tmp_path / 'broken.xml'
+    path.write_text('<smses count="1"><sms body="x" date="1"')
+    with pytest.raises(ET.ParseError):
+        list(iter_transactions(str(path)))
+
+
+def test_each_message_type_is_classified_and_extracted():
+    received, payment, deposit = (parse_sms_body(body) for body, _ in SMSES)
+    assert received == {'transaction_id': '76662021700', 'amount': 2000, 'recipient': None,
+                        'sender': 'Jane Smith', 'type': 'received', 'fee': None,
+                        'new_balance': 2000, 'phone_number': '*********013'}
+    assert (payment['type'], payment['transaction_id'], payment['recipient']) == \
+        ('payment', '73214484437', 'Jane Smith')
+    assert (payment['amount'], payment['fee'], payment['new_balance']) == (1000, 0, 1000)
+    assert (deposit['type'], deposit['recipient'], deposit['new_balance']) == \
+        ('deposit', 'Bank Account', 40400)
+
+    transfer = parse_sms_body('*165*S*10000 RWF transferred to Samuel Carter (250791666666) '
+                              'from 36521838 at 2024-05-11 20:34:47 . Fee was: 100 RWF. '
+                              'New balance: 28300 RWF.')
+    assert (transfer['type'], transfer['recipient'], transfer['phone_number']) == \
+        ('transfer', 'Samuel Carter', '250791666666')
+    assert (transfer['amount'], transfer['fee']) == (10000, 100)
+
+    airtime = parse_sms_body('*162*TxId:13913173274*S*Your payment of 3000 RWF to Airtime '
+                             'with token  has been completed. Fee was 0 RWF.')
+    assert (airtime['type'], airtime['recipient']) == ('airtime', 'Airtime')
+    assert parse_sms_body('Your one-time code is 1234')['type'] == 'unknown'
+
+
+def test_first_matching_keyword_wins():
+    # "received" is checked before "payment", whatever their order in the text
+    details = parse_sms_body('Your payment of 500 RWF was received from Ann Lee (*****123)')
+    assert (details['type'], details['sender']) == ('received', 'Ann Lee')
+
+
+def test_sample_backup_type_counts():
+    bodies = [sms.get('body') for sms in iter_sms_elements(SAMPLE_XML) if sms.get('body')]
+    assert Counter(parse_sms_body(body)['type'] for body in bodies) == {
+        'payment': 702, 'transfer': 585, 'deposit': 249, 'unknown': 77,
+        'received': 63, 'airtime': 15}
+
+
+def test_parser_key_follows_the_extraction_rules(monkeypatch):
+    assert xml_parser._parser_key() == PARSER_KEY
+    monkeypatch.setattr(xml_parser, 'FEE_PATTERN', re.compile(r'Fee:\s*(\d+)'))
+    assert xml_parser._parser_key() != PARSER_KEY
+
+
+def test_parallel_parse_matches_the_serial_parse():
+    serial = parse_xml_to_json(SAMPLE_XML)
+    # Small chunks: many tasks in flight, results must come back in order
+    assert parse_xml_to_json(SAMPLE_XML, workers=2, chunk_size=97) == serial
+
+    min_date = int(serial[1000]['timestamp'])
+    later = list(iter_transactions_parallel(SAMPLE_XML, workers=2, chunk_size=50, start_id=5,
+                                            min_date=min_date))
+    expected = [t for t in serial if int(t['timestamp']) >= min_date]
+    assert [t['id'] for t in later] == list(range(5, 5 + len(expected)))
+    assert [t['raw_message'] for t in later] == [t['raw_message'] for t in expected]